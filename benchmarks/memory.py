@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+Measures the memory used by a population of randomly generated genomes, in
+order to compare the overhead of the core objects between revisions.
+"""
+import argparse
+import sys
+import tracemalloc
+from random import randrange
+
+from evored.gene_pool import RandomGenePool
+from evored.genome import Chromosome, Genome
+from evored.lang import pack_instruction, unpack_instruction
+
+
+def measure(genomes, chromosomes, duplicates):
+    """
+    Creates the specified number of genomes with the specified number of
+    chromosomes each and measures the memory they occupy.
+
+    Genes are either drawn independently or, to model populations read from
+    a corpus or decoded from packed arrays, decoded afresh from a pool of
+    distinct instructions of the specified size, so that equal instructions
+    are separate objects unless they are interned.
+
+    :param genomes: The number of genomes to create.
+    :param chromosomes: The number of chromosomes per genome.
+    :param duplicates: The number of distinct instructions to draw from, or
+    zero to draw every instruction independently.
+    :return: The number of bytes allocated for the population.
+    """
+    pool = RandomGenePool(core_size=8000)
+    packed = [pack_instruction(ins) for ins in pool.extract(duplicates)]
+
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+
+    population = []
+    for x in range(genomes):
+        if packed:
+            ins_list = [unpack_instruction(packed[randrange(len(packed))])
+                        for _ in range(chromosomes)]
+        else:
+            ins_list = pool.extract(chromosomes)
+        population.append(Genome([Chromosome(ins) for ins in ins_list]))
+
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return used
+
+
+def main():
+    """
+    The application entry point.
+
+    :return: An exit code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--genomes", type=int, default=2000)
+    parser.add_argument("--chromosomes", type=int, default=50)
+    parser.add_argument("--duplicates", type=int, default=0)
+    args = parser.parse_args()
+
+    used = measure(args.genomes, args.chromosomes, args.duplicates)
+    count = args.genomes * args.chromosomes
+
+    print("genomes: %i, chromosomes: %i, distinct instructions: %s" %
+          (args.genomes, count, args.duplicates or "all"))
+    print("total: %.1f MiB, per chromosome: %.0f bytes" %
+          (used / 2 ** 20, used / count))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
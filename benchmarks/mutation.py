@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+Measures the cost of a single heap-down mutation of genomes of various
+sizes, and how far each mode gets them towards heap order, in order to
+compare the modes of HeapDownMutator between revisions.
+"""
+import argparse
+import sys
+import time
+from random import random
+
+from evored.algorithm.mutation import HeapDownMutator
+from evored.genome import Chromosome, Genome
+
+
+def disorder(genome):
+    """
+    Computes the fraction of parent-child pairs of the specified genome that
+    violate heap order.
+
+    :param genome: The genome to inspect.
+    :return: The fraction of pairs out of order.
+    """
+    pairs = violations = 0
+    for node in genome:
+        for child in (node.left, node.right):
+            if child is not None:
+                pairs += 1
+                violations += node.item < child.item
+    return violations / pairs if pairs else 0.0
+
+
+def measure(genomes, chromosomes, params):
+    """
+    Mutates the specified number of random genomes with the specified number
+    of chromosomes each, once, and measures the time taken.
+
+    :param genomes: The number of genomes to mutate.
+    :param chromosomes: The number of chromosomes per genome.
+    :param params: The dictionary of mutator parameters.
+    :return: The mean time per mutation in seconds and the mean fraction of
+    parent-child pairs still out of order afterwards.
+    """
+    mutator = HeapDownMutator()
+    population = [Genome([Chromosome(None, random())
+                          for _ in range(chromosomes)])
+                  for _ in range(genomes)]
+
+    start = time.perf_counter()
+    for genome in population:
+        mutator.mutate(genome, params)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / genomes, \
+        sum(disorder(genome) for genome in population) / genomes
+
+
+def main():
+    """
+    The application entry point.
+
+    :return: An exit code.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--genomes", type=int, default=200)
+    parser.add_argument("--chromosomes", type=int, nargs="+",
+                        default=[15, 63, 255, 1023])
+    args = parser.parse_args()
+
+    modes = [("single pass", {}),
+             ("heapify", {"mutator.heapify": True}),
+             ("heapify, 2 levels", {"mutator.heapify": True,
+                                    "mutator.sift_levels": 2})]
+
+    print("%-20s %12s %14s %12s" % ("mode", "chromosomes", "us/mutation",
+                                    "disorder"))
+    for chromosomes in args.chromosomes:
+        for name, params in modes:
+            params = dict(params, **{"mutator.rate": 1.0})
+            cost, remaining = measure(args.genomes, chromosomes, params)
+            print("%-20s %12i %14.1f %11.1f%%" % (name, chromosomes,
+                                                  cost * 1e6,
+                                                  remaining * 100))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,8 @@ performing different evolutionary operations on a list of genomes.
 """
 from abc import abstractmethod, ABCMeta
 
+from evored.population import Population
+
 
 class EvolvingAlgorithm(metaclass=ABCMeta):
     """
@@ -44,3 +46,21 @@ class EvolvingAlgorithm(metaclass=ABCMeta):
         :return: A new list of modified genomes.
         """
         pass
+
+    def evolve_population(self, population, pool, params):
+        """
+        Performs the same evolutionary logic as evolve() on the specified
+        population.
+
+        By default, every genome of the population is materialized, evolved
+        with evolve(), and packed into a new population.  Implementations
+        that can work on the arrays of a population directly should override
+        this function.
+
+        :param population: The population to evolve in some way.
+        :param pool: The pool of processes to use for work.
+        :param params: The dictionary of user-specified parameters.
+        :return: A new or modified population.
+        """
+        return Population.from_genomes(self.evolve(population.to_genomes(),
+                                                   pool, params))
@@ -5,7 +5,11 @@ from abc import abstractmethod
 from functools import partial
 from random import random, shuffle
 
+import numpy as np
+
 from evored.algorithm import EvolvingAlgorithm
+from evored.genome import Lineage
+from evored.tree import PersistentTree
 from evored.utils import flatten
 
 
@@ -41,24 +45,46 @@ class Crossover(EvolvingAlgorithm):
         not each pair therein will be subjected to crossover according to a
         user-specified rate.
 
+        Crossing genomes are removed from the specified list, which keeps the
+        remaining genomes in their original order.
+
         :param genomes: The list of genomes to extract crossover pairs from.
         :param params: The dictionary of user-specified parameters.
         :return: Two lists of genomes to facilitate element-wise crossover.
         """
+        crossing_pairs, remaining = [], []
 
-        crossing_pairs = []
-        current = 0
-
-        while current < len(genomes) and len(genomes) > 1:
+        for current in range(0, len(genomes) - 1, 2):
             if random() < params["crossover.rate"]:
-                crossing_pairs.append(genomes.pop(current))
-                crossing_pairs.append(genomes.pop(current))
+                crossing_pairs.extend(genomes[current:current + 2])
             else:
-                current += 2
+                remaining.extend(genomes[current:current + 2])
+
+        remaining.extend(genomes[len(genomes) - len(genomes) % 2:])
+        genomes[:] = remaining
 
         half_width = len(crossing_pairs) // 2
         return [crossing_pairs[:half_width], crossing_pairs[half_width:]]
 
+    def record_lineage(self, offspring, parents, fractions):
+        """
+        Records on each of the specified offspring that it was created by
+        crossing the specified parents (see Lineage).
+
+        :param offspring: The two genomes created by crossover, in the same
+        order as their parents.
+        :param parents: The structural hash and fitness of each parent.
+        :param fractions: The fraction of the chromosomes of each offspring
+        that came from its own parent.
+        :return: The offspring.
+        """
+        (hash_a, score_a), (hash_b, score_b) = parents
+        offspring[0].lineage = Lineage((hash_a, hash_b), (score_a, score_b),
+                                       fractions[0])
+        offspring[1].lineage = Lineage((hash_b, hash_a), (score_b, score_a),
+                                       fractions[1])
+        return offspring
+
 
 class NoCrossover(Crossover):
     """
@@ -68,16 +94,216 @@ class NoCrossover(Crossover):
     def cross(self, genome_a, genome_b, params):
         return [genome_a, genome_b]
 
+    def evolve_population(self, population, pool, params):
+        return population
+
 
 class UniformCrossover(Crossover):
     """
     Represents an implementation of Crossover that exchanges genetic
     information between two genomes chromosome by chromosome using a uniform
     probability.
+
+    Persistent genomes are not altered; instead, each receives a new version
+    in which only the exchanged chromosomes (and the paths to them) differ.
+
+    Populations are crossed in bulk: pairs and the chromosomes they exchange
+    are drawn at once, and chromosomes are exchanged between rows of the
+    packed arrays at the same breadth-first positions.
     """
 
     def cross(self, genome_a, genome_b, params):
+        if isinstance(genome_a, PersistentTree):
+            return self.cross_persistent(genome_a, genome_b, params)
+
+        parents = [(hash(genome_a), genome_a.fitness),
+                   (hash(genome_b), genome_b.fitness)]
+        sizes = [genome_a.root.subtree_size(), genome_b.root.subtree_size()]
+        swapped = 0
+
         for a, b in zip(genome_a, genome_b):
             if random() < params["crossover.uniform_rate"]:
                 a.swap_items(b)
+                swapped += 1
+        return self.record_lineage([genome_a, genome_b], parents,
+                                   [1 - swapped / size for size in sizes])
+
+    def cross_persistent(self, genome_a, genome_b, params):
+        """
+        Crosses the specified persistent genomes, exchanging chromosomes at
+        the same breadth-first positions as cross() would.
+
+        :param genome_a: A persistent genome to perform crossover upon.
+        :param genome_b: Another persistent genome to perform crossover upon.
+        :param params: A dictionary of parameters.
+        :return: A list containing new versions of the genomes.
+        """
+        items_a, items_b = {}, {}
+
+        for (path_a, a), (path_b, b) in zip(genome_a.paths(),
+                                            genome_b.paths()):
+            if random() < params["crossover.uniform_rate"]:
+                items_a[path_a] = b.item
+                items_b[path_b] = a.item
+        return self.record_lineage(
+            [genome_a.with_items(items_a), genome_b.with_items(items_b)],
+            [(hash(genome_a), genome_a.fitness),
+             (hash(genome_b), genome_b.fitness)],
+            [1 - len(items_a) / len(genome_a),
+             1 - len(items_b) / len(genome_b)])
+
+    def evolve_population(self, population, pool, params):
+        rng = np.random.default_rng()
+        order = rng.permutation(len(population))
+        pairs = len(order) // 2
+
+        crossing = rng.random(pairs) < params["crossover.rate"]
+        pair_a = order[:2 * pairs:2][crossing]
+        pair_b = order[1:2 * pairs:2][crossing]
+        remaining = np.concatenate([order[:2 * pairs:2][~crossing],
+                                    order[1:2 * pairs:2][~crossing],
+                                    order[2 * pairs:]])
+
+        result = population.take(np.concatenate(
+            [remaining, np.column_stack([pair_a, pair_b]).ravel()]))
+        crossed = np.arange(len(remaining), len(result))
+        counts = np.minimum(result.sizes[crossed[::2]],
+                            result.sizes[crossed[1::2]])
+
+        rows_a = result.rows(crossed[::2], counts)
+        rows_b = result.rows(crossed[1::2], counts)
+        swap = rng.random(len(rows_a)) < params["crossover.uniform_rate"]
+        rows_a, rows_b = rows_a[swap], rows_b[swap]
+
+        for column in [result.instructions, result.chromosome_fitness]:
+            column[rows_a], column[rows_b] = column[rows_b], column[rows_a]
+        return result
+
+
+class SubtreeCrossover(Crossover):
+    """
+    Represents an implementation of Crossover that exchanges a randomly chosen
+    branch of one genome with a randomly chosen branch of another, within
+    limits on the height and size of the resulting genomes.
+
+    Crossover points are chosen uniformly from the nodes of each genome by a
+    descent weighted by cached subtree sizes (see Tree.choose_node()), which
+    costs O(depth) rather than O(n).  An exchange that would make either
+    genome taller than crossover.max_height nodes (the length of the longest
+    possible walk, and hence warrior) or larger than crossover.max_size nodes
+    is discarded and another pair of points is tried, up to
+    crossover.attempts times, after which both genomes are left unchanged.
+    Parsimony pressure (crossover.parsimony) additionally rejects, with that
+    probability, any exchange that would grow a genome.
+
+    Persistent genomes are not altered; instead, each receives a new version
+    that shares everything but the exchanged branch and the path to it.
+    """
+
+    DEFAULT_ATTEMPTS = 5
+    """
+    The default number of pairs of crossover points to try.
+    """
+
+    DEFAULT_MAX_HEIGHT = 17
+    """
+    The default maximum height of a genome after crossover.
+    """
+
+    DEFAULT_MAX_SIZE = 512
+    """
+    The default maximum number of chromosomes in a genome after crossover.
+    """
+
+    DEFAULT_PARSIMONY = 0.0
+    """
+    The default probability of rejecting an exchange that grows a genome.
+    """
+
+    def cross(self, genome_a, genome_b, params):
+        if genome_a is genome_b or genome_a.is_empty() or \
+                genome_b.is_empty():
+            return [genome_a, genome_b]
+
+        if isinstance(genome_a, PersistentTree):
+            return self.cross_persistent(genome_a, genome_b, params)
+
+        size_a = genome_a.root.subtree_size()
+        size_b = genome_b.root.subtree_size()
+
+        for _ in range(params.get("crossover.attempts",
+                                  SubtreeCrossover.DEFAULT_ATTEMPTS)):
+            a, b = genome_a.choose_node(), genome_b.choose_node()
+            branch_a = a.subtree_size(), a.subtree_height()
+            branch_b = b.subtree_size(), b.subtree_height()
+
+            if self.fits(size_a, a.depth(), branch_a, branch_b, params) and \
+                    self.fits(size_b, b.depth(), branch_b, branch_a, params):
+                parents = [(hash(genome_a), genome_a.fitness),
+                           (hash(genome_b), genome_b.fitness)]
+
+                a.swap_places(b)
+                if genome_a.root is a:
+                    genome_a.root = b
+                if genome_b.root is b:
+                    genome_b.root = a
+                return self.record_lineage(
+                    [genome_a, genome_b], parents,
+                    [(size_a - branch_a[0]) / genome_a.root.subtree_size(),
+                     (size_b - branch_b[0]) / genome_b.root.subtree_size()])
         return [genome_a, genome_b]
+
+    def cross_persistent(self, genome_a, genome_b, params):
+        """
+        Crosses the specified persistent genomes, exchanging branches subject
+        to the same limits as cross().
+
+        :param genome_a: A persistent genome to perform crossover upon.
+        :param genome_b: Another persistent genome to perform crossover upon.
+        :param params: A dictionary of parameters.
+        :return: A list containing new versions of the genomes, or the
+        genomes themselves if no exchange was allowed.
+        """
+        for _ in range(params.get("crossover.attempts",
+                                  SubtreeCrossover.DEFAULT_ATTEMPTS)):
+            path_a, path_b = genome_a.choose_path(), genome_b.choose_path()
+            a, b = genome_a.node_at(path_a), genome_b.node_at(path_b)
+
+            if self.fits(len(genome_a), len(path_a), (a.size, a.height),
+                         (b.size, b.height), params) and \
+                    self.fits(len(genome_b), len(path_b), (b.size, b.height),
+                              (a.size, a.height), params):
+                return self.record_lineage(
+                    [genome_a.replace(path_a, b),
+                     genome_b.replace(path_b, a)],
+                    [(hash(genome_a), genome_a.fitness),
+                     (hash(genome_b), genome_b.fitness)],
+                    [(len(genome_a) - a.size) / (len(genome_a) - a.size +
+                                                 b.size),
+                     (len(genome_b) - b.size) / (len(genome_b) - b.size +
+                                                 a.size)])
+        return [genome_a, genome_b]
+
+    def fits(self, size, depth, removed, added, params):
+        """
+        Determines whether or not replacing a branch of a genome with another
+        keeps that genome within the limits given by the specified parameters.
+
+        :param size: The number of chromosomes in the genome.
+        :param depth: The depth of the branch to replace.
+        :param removed: The size and height of the branch to replace.
+        :param added: The size and height of the replacement branch.
+        :param params: A dictionary of parameters.
+        :return: Whether or not the replacement is allowed.
+        """
+        max_height = params.get("crossover.max_height",
+                                SubtreeCrossover.DEFAULT_MAX_HEIGHT)
+        max_size = params.get("crossover.max_size",
+                              SubtreeCrossover.DEFAULT_MAX_SIZE)
+        parsimony = params.get("crossover.parsimony",
+                               SubtreeCrossover.DEFAULT_PARSIMONY)
+
+        new_size = size - removed[0] + added[0]
+        if new_size > max_size or depth + added[1] > max_height:
+            return False
+        return new_size <= size or random() >= parsimony
@@ -2,10 +2,16 @@
 Contains all classes and functions pertaining to methods of genome mutation.
 """
 from abc import abstractmethod
+from collections import deque
 from functools import partial
 from random import random
 
+import numpy as np
+
 from evored.algorithm import EvolvingAlgorithm
+from evored.genome import Chromosome
+from evored.lang import pack_instruction, unpack_instruction
+from evored.tree import PersistentTree
 
 
 class Mutator(EvolvingAlgorithm):
@@ -53,6 +59,21 @@ class HeapDownMutator(Mutator):
     As previously stated, this mutator may be configured to choose a random
     starting node instead of solely the root.  This has the effect of further
     mitigating any fitness increase structure alteration may bring.
+
+    Alternatively, if mutator.heapify is set, the subtree below the starting
+    node is fully heap-ordered in a single mutation using Floyd's bottom-up
+    heap construction, which is O(n) for the complete trees Tree.build()
+    creates.  The items are copied into an array (in breadth-first order),
+    each internal node is sifted down starting from the last, and only
+    those items that moved are written back.  A bound on the number of
+    levels each item may be sifted down (mutator.sift_levels) trades the
+    extent of the ordering for fewer comparisons.
+    """
+
+    DEFAULT_SIFT_LEVELS = None
+    """
+    The default maximum number of levels an item may be sifted down, where
+    None means no limit.
     """
 
     def get_largest_child(self, node):
@@ -71,6 +92,35 @@ class HeapDownMutator(Mutator):
             return node.left if node.left.item >= node.right.item else \
                 node.right
 
+    def build_heap(self, items, children, levels=None):
+        """
+        Arranges the specified array of items into a max-heap using Floyd's
+        bottom-up heap construction, sifting each item down at most the
+        specified number of levels.
+
+        Ties between children are broken in favour of the first, as by
+        get_largest_child().
+
+        :param items: The list of items to arrange in place.
+        :param children: The list of child indices of each item.
+        :param levels: The maximum number of levels to sift each item down,
+        or None for no limit.
+        """
+        for start in range(len(items) - 1, -1, -1):
+            index, remaining = start, levels
+
+            while children[index] and (remaining is None or remaining > 0):
+                child = children[index][0]
+                if len(children[index]) == 2 and \
+                        not items[child] >= items[children[index][1]]:
+                    child = children[index][1]
+
+                if not items[index] < items[child]:
+                    break
+                items[index], items[child] = items[child], items[index]
+                index = child
+                remaining = remaining - 1 if remaining is not None else None
+
     def heapify(self, node):
         """
         Performs a single heap-down operation on the specified node and its
@@ -85,14 +135,20 @@ class HeapDownMutator(Mutator):
 
     def mutate(self, genome, params):
         if random() > params["mutator.rate"]:
-            return
+            return genome
+
+        if params.get("mutator.heapify", False):
+            return self.mutate_heap(genome, params)
+
+        if isinstance(genome, PersistentTree):
+            return self.mutate_persistent(genome, params)
 
         node = genome.root if params.get("mutator.root_only", True) else \
             genome.choose_node()
 
-        queue = [node]
+        queue = deque([node])
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             self.heapify(current)
             if current.has_left() and not current.left.is_leaf():
                 queue.append(current.left)
@@ -100,6 +156,88 @@ class HeapDownMutator(Mutator):
                 queue.append(current.right)
         return genome
 
+    def mutate_heap(self, genome, params):
+        """
+        Heap-orders the subtree below the starting node of the specified
+        genome using build_heap(), creating a new version of the genome if
+        it is persistent.
+
+        :param genome: The genome to mutate.
+        :param params: A dictionary of parameters.
+        :return: The mutated genome, or a new version of it.
+        """
+        persistent = isinstance(genome, PersistentTree)
+        if params.get("mutator.root_only", True):
+            start = () if persistent else genome.root
+        else:
+            start = genome.choose_path() if persistent else \
+                genome.choose_node()
+
+        entries = [(start, genome.node_at(start) if persistent else start)]
+        children = []
+        for key, node in entries:
+            indices = []
+            for direction, child in enumerate((node.left, node.right)):
+                if child is not None:
+                    indices.append(len(entries))
+                    entries.append((key + (direction,) if persistent
+                                    else child, child))
+            children.append(indices)
+
+        items = [node.item for _, node in entries]
+        self.build_heap(items, children,
+                        params.get("mutator.sift_levels",
+                                   HeapDownMutator.DEFAULT_SIFT_LEVELS))
+
+        moved = [(key, node, item) for (key, node), item in
+                 zip(entries, items) if item is not node.item]
+        if persistent:
+            return genome.with_items({key: item for key, _, item in moved})
+
+        for _, node, item in moved:
+            node.item = item
+        return genome
+
+    def mutate_persistent(self, genome, params):
+        """
+        Applies the same heap-down pass as mutate() to the specified
+        persistent genome, creating a new version of it.
+
+        Swaps are recorded against the paths of the nodes involved and only
+        applied, all at once, when the pass is complete.
+
+        :param genome: The persistent genome to mutate.
+        :param params: A dictionary of parameters.
+        :return: A new version of the genome.
+        """
+        path = () if params.get("mutator.root_only", True) else \
+            genome.choose_path()
+        items = {}
+
+        def item(p, node):
+            return items.get(p, node.item)
+
+        queue = deque([(path, genome.node_at(path))])
+        while queue:
+            path, current = queue.popleft()
+            children = [(path + (x,), child) for x, child in
+                        enumerate((current.left, current.right))
+                        if child is not None]
+            if not children:
+                continue
+
+            child_path, child = children[0]
+            if len(children) == 2 and \
+                    not item(*children[0]) >= item(*children[1]):
+                child_path, child = children[1]
+
+            if item(path, current) < item(child_path, child):
+                items[path], items[child_path] = item(child_path, child), \
+                    item(path, current)
+
+            queue.extend((p, c) for p, c in children if not c.is_leaf())
+        return genome.with_items(items)
+
 
 class NoMutator(Mutator):
     """
@@ -108,3 +246,128 @@ class NoMutator(Mutator):
 
     def mutate(self, genome, params):
         return genome
+
+    def evolve_population(self, population, pool, params):
+        return population
+
+
+class PointMutator(Mutator):
+    """
+    Represents an implementation of Mutator that introduces new genetic
+    material by replacing individual fields of chromosomes with fields drawn
+    from a gene pool.
+
+    Each field of each chromosome of a genome chosen for mutation (according
+    to mutator.rate) is replaced independently with its own probability:
+    mutator.opcode_rate for the operation code, mutator.modifier_rate for the
+    modifier, mutator.mode_rate for either addressing mode, and
+    mutator.value_rate for either value.  The sites and replacement fields
+    are drawn for every genome at once, so evolve() does not use the process
+    pool at all.  A mutated chromosome is replaced by a new one, with no
+    fitness, rather than altered, since chromosomes may be shared.  Mutated
+    instructions are converted to the form the gene pool creates genes in
+    (see GenePool.canonical_packed()), so that a new operation code brings
+    its default modifier with it in a canonical pool.
+
+    Attributes:
+        gene_pool (GenePool): The gene pool replacement fields are drawn
+        from.
+    """
+
+    DEFAULT_MODE_RATE = 0.01
+    """
+    The default probability of replacing an addressing mode.
+    """
+
+    DEFAULT_MODIFIER_RATE = 0.01
+    """
+    The default probability of replacing a modifier.
+    """
+
+    DEFAULT_OPCODE_RATE = 0.01
+    """
+    The default probability of replacing an operation code.
+    """
+
+    DEFAULT_VALUE_RATE = 0.02
+    """
+    The default probability of replacing a value.
+    """
+
+    def __init__(self, gene_pool):
+        self.gene_pool = gene_pool
+
+    def evolve(self, genomes, pool, params):
+        rng = np.random.default_rng()
+        chosen = np.flatnonzero(rng.random(len(genomes)) <=
+                                params["mutator.rate"])
+
+        entries = []
+        for index in chosen:
+            genome = genomes[index]
+            if isinstance(genome, PersistentTree):
+                entries.extend((index, path, node)
+                               for path, node in genome.paths())
+            elif not genome.is_empty():
+                entries.extend((index, node, node) for node in genome)
+
+        masks = rng.random((len(entries), 6)) < self.get_field_rates(params)
+        sites = np.flatnonzero(masks.any(axis=1))
+        fields = np.array([pack_instruction(entries[site][2].item.ins)
+                           for site in sites.tolist()],
+                          dtype=np.int32).reshape(-1, 6)
+        fields = self.gene_pool.canonical_packed(np.where(
+            masks[sites], self.gene_pool.extract_packed(len(sites), rng),
+            fields))
+        changes = {}
+
+        for site, mutated in zip(sites.tolist(), fields.tolist()):
+            index, key, _ = entries[site]
+            changes.setdefault(index, {})[key] = Chromosome(
+                unpack_instruction(mutated))
+
+        results = list(genomes)
+        for index, items in changes.items():
+            if isinstance(genomes[index], PersistentTree):
+                results[index] = genomes[index].with_items(items)
+            else:
+                for node, item in items.items():
+                    node.item = item
+        return results
+
+    def evolve_population(self, population, pool, params):
+        rng = np.random.default_rng()
+        result = population.take(np.arange(len(population)))
+
+        chosen = rng.random(len(result)) <= params["mutator.rate"]
+        masks = rng.random((len(result.instructions), 6)) < \
+            self.get_field_rates(params)
+        masks &= np.repeat(chosen, result.sizes)[:, np.newaxis]
+
+        sites = np.flatnonzero(masks.any(axis=1))
+        replacements = self.gene_pool.extract_packed(len(sites), rng)
+        result.instructions[sites] = self.gene_pool.canonical_packed(
+            np.where(masks[sites], replacements, result.instructions[sites]))
+        result.chromosome_fitness[sites] = 0
+        return result
+
+    def get_field_rates(self, params):
+        """
+        Returns the probability of replacing each of the six fields of a
+        packed instruction (see lang.pack_instruction()), according to the
+        specified parameters.
+
+        :param params: A dictionary of parameters.
+        :return: An array of six probabilities.
+        """
+        mode = params.get("mutator.mode_rate", PointMutator.DEFAULT_MODE_RATE)
+        value = params.get("mutator.value_rate",
+                           PointMutator.DEFAULT_VALUE_RATE)
+        return np.array([params.get("mutator.opcode_rate",
+                                    PointMutator.DEFAULT_OPCODE_RATE),
+                         params.get("mutator.modifier_rate",
+                                    PointMutator.DEFAULT_MODIFIER_RATE),
+                         mode, value, mode, value])
+
+    def mutate(self, genome, params):
+        return self.evolve([genome], None, params)[0]
@@ -3,13 +3,19 @@ Contains all classes and functions pertaining to methods of genome selection.
 """
 from abc import abstractmethod
 from functools import partial
+from heapq import heappush, heapreplace, nsmallest
+from itertools import count
 from random import shuffle, sample, random, choice
 
 from math import ceil
 
 from copy import copy
 
+import numpy as np
+
 from evored.algorithm import EvolvingAlgorithm
+from evored.gene_pool import DistributionGenePool
+from evored.population import Population
 from evored.utils import flatten
 
 
@@ -29,9 +35,9 @@ class Selector(EvolvingAlgorithm):
         Selects the best genomes from the specified list for continuation in
         some way, influenced by the specified user-selected parameters.
 
-        Finally, the burden of implementing elitism falls on the caller,
-        not this function.  As such, this function should neither consider
-        the implications of nor perform elitism itself.
+        Finally, the burden of implementing elitism falls on the caller
+        (see HallOfFame), not this function.  As such, this function should
+        neither consider the implications of nor perform elitism itself.
 
         :param current: The current genome (used as an index placeholder).
         :param genomes: The list of genomes to select from.
@@ -41,6 +47,191 @@ class Selector(EvolvingAlgorithm):
         pass
 
 
+class HallOfFame(EvolvingAlgorithm):
+    """
+    Represents an archive of the best distinct genomes seen across
+    generations, which feeds copies of them back into each generation.
+
+    The archive is a bounded min-heap keyed by fitness, so the worst archived
+    genome is always at the root: a scored genome is only admitted if it
+    beats that genome, replacing it in O(log k) time for an archive of k
+    genomes.  Genomes are distinct by content hash (see Tree.__hash__()), so
+    a genome whose structure and instructions are already archived is not
+    admitted again, regardless of its fitness.
+
+    Evolving records every genome of a generation in the archive and then
+    replaces the elitism.elites least fit genomes of the generation with
+    copies of the best archived genomes that are not already present, as
+    long as the elite is fitter than the genome it replaces.  The least fit
+    genomes are found by partial selection rather than by sorting the whole
+    generation, so this should run after fitness evaluation and before
+    selection.  Populations only materialize the genomes that could enter
+    the archive or duplicate an elite, judging by fitness.
+
+    If a distribution gene pool is given, it learns from the
+    gene_pool.elites best archived genomes every generation (see
+    DistributionGenePool.update()), so that new genes resemble the best
+    found so far.
+
+    Attributes:
+        capacity (int): The maximum number of genomes archived.
+        gene_pool (DistributionGenePool): The gene pool that learns from the
+        archive every generation, if any.
+        heap (list): The archived genomes, as a heap of fitness, insertion
+        order, content hash, and genome entries.
+        hashes (set): The content hashes of all archived genomes.
+    """
+
+    DEFAULT_CAPACITY = 10
+    """
+    The default maximum number of genomes archived.
+    """
+
+    DEFAULT_ELITES = None
+    """
+    The default number of archived genomes fed back into each generation, or
+    None for all of them.
+    """
+
+    def __init__(self, capacity=None, gene_pool=None):
+        self.capacity = capacity if capacity is not None else \
+            HallOfFame.DEFAULT_CAPACITY
+        self.gene_pool = gene_pool
+        self.hashes = set()
+        self.heap = []
+        self._order = count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def elites(self, limit=None):
+        """
+        Returns the best archived genomes, best first.
+
+        Only the archive is sorted, never a generation.
+
+        :param limit: The maximum number of genomes to return, or None for
+        all of them.
+        :return: A list of archived genomes.
+        """
+        entries = sorted(self.heap, key=lambda x: (-x[0], x[1]))
+        return [entry[3] for entry in entries[:limit]]
+
+    def evolve(self, genomes, pool, params):
+        self.update(genomes)
+        self.learn(params)
+
+        present = {hash(genome) for genome in genomes}
+        elites = [genome for genome in self.elites(self.get_elites(params))
+                  if hash(genome) not in present]
+        worst = nsmallest(len(elites), range(len(genomes)),
+                          key=lambda x: genomes[x].fitness)
+
+        for index, elite in zip(worst, elites):
+            if elite.fitness > genomes[index].fitness:
+                genomes[index] = copy(elite)
+        return genomes
+
+    def evolve_population(self, population, pool, params):
+        candidates = np.arange(len(population))
+        if len(population) > self.capacity:
+            candidates = np.argpartition(-population.fitness,
+                                         self.capacity - 1)[:self.capacity]
+        self.update(population.genome(index)
+                    for index in candidates.tolist()
+                    if not self.is_full() or
+                    population.fitness[index] > self.heap[0][0])
+        self.learn(params)
+
+        elites = self.elites(self.get_elites(params))
+        if elites:
+            present = {hash(population.genome(index)) for index in
+                       np.flatnonzero(population.fitness >=
+                                      elites[-1].fitness).tolist()}
+            elites = [genome for genome in elites
+                      if hash(genome) not in present]
+        elites = elites[:len(population)]
+        if not elites:
+            return population
+
+        worst = np.argpartition(population.fitness, len(elites) - 1)
+        worst = worst[:len(elites)]
+        worst = worst[np.argsort(population.fitness[worst], kind="stable")]
+        replaced = [index for index, elite in zip(worst.tolist(), elites)
+                    if elite.fitness > population.fitness[index]]
+        if not replaced:
+            return population
+
+        order = np.arange(len(population))
+        order[replaced] = len(population) + np.arange(len(replaced))
+        return Population.concatenate([
+            population, Population.from_genomes(elites[:len(replaced)])
+        ]).take(order)
+
+    def get_elites(self, params):
+        """
+        Returns the number of archived genomes to feed back into each
+        generation.
+
+        :param params: The dictionary of user-specified parameters.
+        :return: The number of elites, or None for all of them.
+        """
+        return params.get("elitism.elites", HallOfFame.DEFAULT_ELITES)
+
+    def insert(self, genome):
+        """
+        Archives a copy of the specified scored genome if it is among the
+        best distinct genomes seen so far, evicting the worst archived
+        genome if the archive is full.
+
+        :param genome: The genome to archive.
+        :return: Whether or not the genome was archived.
+        """
+        key = hash(genome)
+        if key in self.hashes or self.capacity <= 0:
+            return False
+
+        entry = (genome.fitness, next(self._order), key, copy(genome))
+        if not self.is_full():
+            heappush(self.heap, entry)
+        elif genome.fitness > self.heap[0][0]:
+            self.hashes.discard(heapreplace(self.heap, entry)[2])
+        else:
+            return False
+
+        self.hashes.add(key)
+        return True
+
+    def is_full(self):
+        """
+        Returns whether or not this archive holds as many genomes as it can.
+
+        :return: Whether or not the archive is full.
+        """
+        return len(self.heap) >= self.capacity
+
+    def learn(self, params):
+        """
+        Updates the gene pool of this archive, if any, from the best archived
+        genomes.
+
+        :param params: The dictionary of user-specified parameters.
+        """
+        if self.gene_pool is not None and self.heap:
+            self.gene_pool.update(self.elites(params.get(
+                "gene_pool.elites", DistributionGenePool.DEFAULT_ELITES)))
+
+    def update(self, genomes):
+        """
+        Offers every one of the specified scored genomes to this archive
+        (see insert()).
+
+        :param genomes: The genomes to archive.
+        :return: The number of genomes archived.
+        """
+        return sum(self.insert(genome) for genome in genomes)
+
+
 class ReplacementSelector(Selector):
     """
     Represents an implementation of Selector that replaces the lower half of a
@@ -63,6 +254,11 @@ class ReplacementSelector(Selector):
     def select(self, current, genomes, params):
         return [current, copy(current)]
 
+    def evolve_population(self, population, pool, params):
+        order = np.argsort(-population.fitness, kind="stable")
+        upper = order[:ceil(len(population) / 2)]
+        return population.take(np.repeat(upper, 2)[:len(population)])
+
 
 class NoSelector(Selector):
     """
@@ -72,6 +268,9 @@ class NoSelector(Selector):
     def select(self, current, genomes, params):
         return current
 
+    def evolve_population(self, population, pool, params):
+        return population
+
 
 class RouletteSelector(Selector):
     """
@@ -90,6 +289,21 @@ class RouletteSelector(Selector):
             if random() < (selected.fitness / genomes[-1].fitness):
                 return copy(selected)
 
+    def evolve_population(self, population, pool, params):
+        rng = np.random.default_rng()
+        best = population.fitness.max() if len(population) else 0
+        odds = population.fitness / best if best > 0 else \
+            np.ones(len(population))
+        chosen = np.empty(len(population), dtype=np.int64)
+        pending = np.arange(len(population))
+
+        while len(pending):
+            candidates = rng.integers(len(population), size=len(pending))
+            accepted = rng.random(len(pending)) < odds[candidates]
+            chosen[pending[accepted]] = candidates[accepted]
+            pending = pending[~accepted]
+        return population.take(chosen)
+
 
 class TournamentSelector(Selector):
     """
@@ -105,3 +319,22 @@ class TournamentSelector(Selector):
     def select(self, current, genomes, params):
         return copy(max(sample(genomes, params["selector.tournament_size"])))
 
+    def evolve_population(self, population, pool, params):
+        rng = np.random.default_rng()
+        size = params["selector.tournament_size"]
+        if size > len(population):
+            raise ValueError("Tournament size exceeds population size.")
+
+        # Floyd's algorithm draws each row of entrants without replacement
+        # in one pass per column, however close size is to the population.
+        entrants = np.empty((len(population), size), dtype=np.int64)
+        for column, bound in enumerate(range(len(population) - size,
+                                             len(population))):
+            drawn = rng.integers(bound + 1, size=len(population))
+            taken = (entrants[:, :column] == drawn[:, None]).any(axis=1)
+            entrants[:, column] = np.where(taken, bound, drawn)
+
+        winners = population.fitness[entrants].argmax(axis=1)
+        return population.take(entrants[np.arange(len(population)),
+                                        winners])
+
@@ -8,12 +8,21 @@ class Fitnessable(metaclass=ABCMeta):
     """
     Represents an object that contains a concept of fitness.
 
+    An object may be scored repeatedly, in which case its fitness is the
+    running mean of all scores it has received and the running variance of
+    those scores is kept alongside it.
+
     Attributes:
+        evaluations (int): The number of scores received.
         fitness (int): A fitness score.
     """
 
+    __slots__ = ("evaluations", "fitness", "_m2")
+
     def __init__(self, fitness=0):
+        self.evaluations = 0
         self.fitness = fitness
+        self._m2 = 0
 
     def __eq__(self, other):
         if isinstance(other, Fitnessable):
@@ -48,3 +57,52 @@ class Fitnessable(metaclass=ABCMeta):
 
     def __str__(self):
         return "(f:%i)" % self.fitness
+
+    @property
+    def variance(self):
+        """
+        Returns the sample variance of all scores received.
+
+        :return: The variance of all scores, or zero if fewer than two scores
+        have been received.
+        """
+        if self.evaluations < 2:
+            return 0
+        return self._m2 / (self.evaluations - 1)
+
+    def add_score(self, score):
+        """
+        Incorporates the specified score into the running mean and variance
+        of this object, updating its fitness to the new mean.
+
+        :param score: The score to add.
+        """
+        if self.evaluations == 0:
+            self.fitness = 0
+
+        self.evaluations += 1
+        delta = score - self.fitness
+        self.fitness += delta / self.evaluations
+        self._m2 += delta * (score - self.fitness)
+
+    def copy_score(self, other):
+        """
+        Copies the fitness and running statistics of the specified object to
+        this one.
+
+        :param other: The object to copy from.
+        """
+        self.evaluations = other.evaluations
+        self.fitness = other.fitness
+        self._m2 = other._m2
+
+    def reset_score(self, fitness=0):
+        """
+        Discards all scores received and sets the fitness of this object to
+        the specified value.
+
+        :param fitness: The new fitness score.
+        """
+        self.evaluations = 0
+        self.fitness = fitness
+        self._m2 = 0
@@ -0,0 +1,177 @@
+"""
+Contains classes and functions concerned with choosing which benchmark
+warriors to evaluate against.
+"""
+from collections import deque
+from math import sqrt
+
+
+def rank(values):
+    """
+    Computes the rank of each of the specified values, assigning tied values
+    the average of the ranks they span.
+
+    :param values: The list of values to rank.
+    :return: A list of ranks, one per value.
+    """
+    order = sorted(range(len(values)), key=lambda x: values[x])
+    ranks = [0.0] * len(values)
+    start = 0
+
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and \
+                values[order[end + 1]] == values[order[start]]:
+            end += 1
+        for x in range(start, end + 1):
+            ranks[order[x]] = (start + end) / 2
+        start = end + 1
+    return ranks
+
+
+def spearman(a, b):
+    """
+    Computes the Spearman rank correlation between the specified lists of
+    values.
+
+    :param a: A list of values.
+    :param b: Another list of values of the same length.
+    :return: The rank correlation, or zero if either list has no variation.
+    """
+    rank_a, rank_b = rank(a), rank(b)
+    n = len(a)
+
+    if n < 2:
+        return 0.0
+
+    mean_a, mean_b = sum(rank_a) / n, sum(rank_b) / n
+    cov = sum((x - mean_a) * (y - mean_b) for x, y in zip(rank_a, rank_b))
+    var_a = sum((x - mean_a) ** 2 for x in rank_a)
+    var_b = sum((y - mean_b) ** 2 for y in rank_b)
+
+    if var_a == 0 or var_b == 0:
+        return 0.0
+    return cov / sqrt(var_a * var_b)
+
+
+class BenchmarkSubsetSelector:
+    """
+    Represents a mechanism for choosing a small subset of benchmark warriors
+    that ranks warriors almost identically to the full set.
+
+    Results of warriors against the full set of benchmarks are kept as a
+    history of rows (one score per benchmark).  From this history, a subset
+    is chosen greedily: at each step the benchmark whose addition yields the
+    highest rank correlation between subset totals and full totals is added.
+    The subset is used for most generations, but every few generations the
+    full set is used again so that the history (and subset) stays current
+    and the accuracy of the previous subset can be measured on fresh results.
+
+    Attributes:
+        benchmarks (list): The full list of benchmarks.
+        correlations (list): The rank correlation between subset and full
+        totals on each revalidation, as (generation, correlation) pairs.
+        history (deque): Recent rows of results against the full set.
+        revalidate (int): The number of generations between evaluations
+        against the full set.
+        size (int): The number of benchmarks to choose.
+        subset (list): The indices of the chosen benchmarks, or None if no
+        subset has been chosen yet.
+    """
+
+    DEFAULT_HISTORY = 2000
+    """
+    The default maximum number of result rows to keep.
+    """
+
+    DEFAULT_REVALIDATE = 10
+    """
+    The default number of generations between full evaluations.
+    """
+
+    DEFAULT_SIZE = 3
+    """
+    The default number of benchmarks to choose.
+    """
+
+    def __init__(self, benchmarks, size=None, revalidate=None, history=None):
+        self.benchmarks = list(benchmarks)
+        self.correlations = []
+        self.history = deque(maxlen=history if history else
+                             BenchmarkSubsetSelector.DEFAULT_HISTORY)
+        self.revalidate = revalidate if revalidate else \
+            BenchmarkSubsetSelector.DEFAULT_REVALIDATE
+        self.size = min(len(self.benchmarks), size if size else
+                        BenchmarkSubsetSelector.DEFAULT_SIZE)
+        self.subset = None
+
+    def choose(self):
+        """
+        Greedily chooses the subset of benchmarks whose totals best preserve
+        the ranking of the recorded history.
+
+        :return: A sorted list of benchmark indices.
+        """
+        totals = [sum(row) for row in self.history]
+        partial = [0] * len(self.history)
+        chosen = []
+
+        while len(chosen) < self.size:
+            best, best_rho = None, None
+            for x in range(len(self.benchmarks)):
+                if x in chosen:
+                    continue
+                rho = spearman([p + row[x] for p, row in
+                                zip(partial, self.history)], totals)
+                if best_rho is None or rho > best_rho:
+                    best, best_rho = x, rho
+
+            chosen.append(best)
+            partial = [p + row[best] for p, row in zip(partial, self.history)]
+        return sorted(chosen)
+
+    def is_full(self, generation):
+        """
+        Determines whether or not the specified generation should be evaluated
+        against the full set of benchmarks.
+
+        :param generation: The current generation.
+        :return: Whether or not to use every benchmark.
+        """
+        return self.subset is None or generation % self.revalidate == 0
+
+    def select(self, generation):
+        """
+        Returns the benchmarks to evaluate against in the specified
+        generation.
+
+        :param generation: The current generation.
+        :return: A list of benchmarks.
+        """
+        if self.is_full(generation):
+            return list(self.benchmarks)
+        return [self.benchmarks[x] for x in self.subset]
+
+    def update(self, generation, matrix):
+        """
+        Records the specified matrix of results against the full set of
+        benchmarks, measures the accuracy of the current subset against it,
+        and chooses a new subset.
+
+        :param generation: The current generation.
+        :param matrix: A matrix of scores, with one row per warrior and one
+        column per benchmark.
+        :return: The rank correlation of the previous subset on the new
+        results, or None if there was no previous subset.
+        """
+        rho = None
+
+        if self.subset is not None and matrix:
+            rho = spearman([sum(row[x] for x in self.subset)
+                            for row in matrix], [sum(row) for row in matrix])
+            self.correlations.append((generation, rho))
+
+        self.history.extend(matrix)
+        if self.history:
+            self.subset = self.choose()
+        return rho
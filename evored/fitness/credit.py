@@ -0,0 +1,91 @@
+"""
+Contains classes and functions concerned with assigning the scores of
+warriors back to the chromosomes that they were realized from.
+"""
+import numpy as np
+
+
+class CreditAssigner:
+    """
+    Represents a mechanism for crediting each chromosome of a population
+    with the scores of the warriors whose walks passed through it.
+
+    Scores are accumulated into sums and counts indexed by node row, over
+    any number of scoring rounds (or batches), and then written into the
+    chromosome fitness of the whole population by apply() in a single
+    vectorized update.  A chromosome's new fitness is the mean score of the
+    warriors it contributed to, blended with its previous fitness by the
+    credit rate: a rate of one replaces the previous fitness, while smaller
+    rates keep an exponentially weighted running mean across generations.
+    Chromosomes that no walk passed through keep their fitness.
+
+    Since sums are indexed by node row, scores must be applied before the
+    population is reshaped by selection, crossover, or mutation.
+
+    Attributes:
+        counts (ndarray): The number of scores accumulated for each node.
+        rate (float): The weight of newly accumulated credit.
+        sums (ndarray): The sum of the scores accumulated for each node.
+    """
+
+    DEFAULT_RATE = 1.0
+    """
+    The default weight of newly accumulated credit.
+    """
+
+    def __init__(self, rate=None):
+        self.counts = None
+        self.rate = rate if rate is not None else CreditAssigner.DEFAULT_RATE
+        self.sums = None
+
+    def accumulate(self, population, walks, scores):
+        """
+        Adds the score of each of the specified walks to every node it
+        visited.
+
+        :param population: The population the walks were taken through.
+        :param walks: The walks that were scored.
+        :param scores: The score of each walk.
+        """
+        nodes = len(population.chromosome_fitness)
+        if self.sums is None or len(self.sums) != nodes:
+            self.counts = np.zeros(nodes, dtype=np.int64)
+            self.sums = np.zeros(nodes)
+
+        credit = np.repeat(np.asarray(scores, dtype=np.float64),
+                           walks.lengths)
+        self.counts += np.bincount(walks.rows, minlength=nodes)
+        self.sums += np.bincount(walks.rows, credit, minlength=nodes)
+
+    def apply(self, population):
+        """
+        Writes the mean credit accumulated for each node into the chromosome
+        fitness of the specified population and discards it.
+
+        :param population: The population to credit.
+        :return: The number of chromosomes credited.
+        """
+        if self.sums is None:
+            return 0
+
+        visited = np.flatnonzero(self.counts)
+        means = self.sums[visited] / self.counts[visited]
+        population.chromosome_fitness[visited] = \
+            (1 - self.rate) * population.chromosome_fitness[visited] + \
+            self.rate * means
+
+        self.counts = self.sums = None
+        return len(visited)
+
+    def assign(self, population, walks, scores):
+        """
+        Credits the specified population with the scores of the specified
+        walks in one step.
+
+        :param population: The population the walks were taken through.
+        :param walks: The walks that were scored.
+        :param scores: The score of each walk.
+        :return: The number of chromosomes credited.
+        """
+        self.accumulate(population, walks, scores)
+        return self.apply(population)
@@ -2,12 +2,402 @@
 Contains all classes and functions necessary to determine the fitness of
 Core Wars warriors.
 """
-from abc import ABCMeta
+from math import ceil, floor, sqrt
+from random import sample
 
+import numpy as np
 
-class FitnessEvaluator(metaclass=ABCMeta):
+from evored.algorithm import EvolvingAlgorithm
+from evored.fitness.scoring import PmarsScoreProvider
+from evored.genome import Warrior
+from evored.statistics import InheritanceStatistics
+from evored.utils import flatten
+
+
+class FitnessEvaluator(EvolvingAlgorithm):
+    """
+    Represents a mechanism for determining the fitness of genomes by
+    realizing a warrior from each (via a random walk) and scoring the
+    resulting warriors against one another and any benchmarks.
+
+    Each genome receives exactly one evaluation per generation, which
+    replaces any fitness it had previously.  Parallelism is left to the
+    score provider, so the process pool is not used.
+
+    Populations are evaluated by realizing fitness.walks warriors from every
+    genome in one vectorized pass (see Population.realize()) and taking the
+    mean of their scores as each genome's fitness.  If a credit assigner is
+    given, every chromosome on those walks is then credited with their
+    scores as well.
+
+    If a batch size is specified (fitness.batch_size) then warriors are
+    scored in batches of that size through the provider's calculate_many(),
+    which allows the source files of one batch to be written while the
+    previous batch is simulated.  Batches only make sense when warriors are
+    scored against fixed benchmarks rather than each other.
+
+    Each call to evolve() or evolve_population() begins a new generation,
+    and its warriors are scored with sim.generation set to the index of
+    that generation (unless it is already specified), which score providers
+    use to pin placement, tune cycle limits, and choose benchmark subsets.
+
+    Attributes:
+        credit (CreditAssigner): The mechanism used to credit chromosomes of
+        a population with the scores of their warriors, if any.
+        generation (int): The index of the generation being (or last)
+        evaluated, starting from zero.
+        provider (ScoreProvider): The mechanism used to score warriors.
+    """
+
+    DEFAULT_FILE_PREFIX = "evored"
+    """
+    The default prefix for generated Redcode source files.
+    """
+
+    DEFAULT_WALKS = 1
+    """
+    The default number of warriors realized per genome of a population.
+    """
+
+    def __init__(self, provider, credit=None):
+        self.credit = credit
+        self.generation = -1
+        self.provider = provider
+
+    def evaluate(self, genomes, params):
+        """
+        Realizes and scores a single warrior from each of the specified
+        genomes without altering the genomes themselves.
+
+        :param genomes: The list of genomes to evaluate.
+        :param params: A dictionary of parameters.
+        :return: A list of scores, one per genome.
+        :raise ScoringException: If there was a problem scoring the warriors.
+        """
+        return self.score([genome.realize() for genome in genomes], params)
+
+    def evolve(self, genomes, pool, params):
+        self.generation += 1
+        for genome, score in zip(genomes, self.evaluate(genomes, params)):
+            genome.reset_score()
+            genome.add_score(score)
+        return genomes
+
+    def evolve_population(self, population, pool, params):
+        self.generation += 1
+        walks = population.realize(params.get("fitness.walks",
+                                              FitnessEvaluator.DEFAULT_WALKS))
+        scores = np.array(self.score(walks.warriors(population), params),
+                          dtype=np.float64)
+
+        counts = np.bincount(walks.genomes, minlength=len(population))
+        means = np.bincount(walks.genomes, scores, len(population)) / \
+            np.maximum(counts, 1)
+        population.fitness[:] = means
+        population.evaluations[:] = counts
+        population.m2[:] = np.bincount(
+            walks.genomes, (scores - means[walks.genomes]) ** 2,
+            len(population))
+
+        if self.credit is not None:
+            self.credit.assign(population, walks, scores)
+        return population
+
+    def score(self, warriors, params):
+        """
+        Scores the specified warriors with the provider, in batches if a
+        batch size is specified, and records each score on its warrior.
+
+        :param warriors: The list of warriors to score.
+        :param params: A dictionary of parameters.
+        :return: A list of scores, one per warrior.
+        :raise ScoringException: If there was a problem scoring the warriors.
+        """
+        prefix = params.get("fitness.file_prefix",
+                            FitnessEvaluator.DEFAULT_FILE_PREFIX)
+        batch_size = params.get("fitness.batch_size")
+        if "sim.generation" not in params:
+            params = dict(params, **{"sim.generation":
+                                     max(self.generation, 0)})
+
+        if batch_size and len(warriors) > batch_size:
+            batches = [warriors[x:x + batch_size]
+                       for x in range(0, len(warriors), batch_size)]
+            scores = flatten(self.provider.calculate_many(batches, prefix,
+                                                          params))
+        else:
+            scores = self.provider.calculate(warriors, prefix, params)
+
+        for warrior, score in zip(warriors, scores):
+            warrior.fitness = score
+        return scores
+
+
+class OcbaFitnessEvaluator(FitnessEvaluator):
+    """
+    Represents an implementation of FitnessEvaluator that spends additional
+    simulations only on those genomes whose ranking is uncertain enough to
+    change which are selected.
+
+    Every genome is first evaluated once.  The remaining budget is then
+    allocated in small increments using the optimal computing budget
+    allocation rule for selecting the top m of n designs (OCBA-m): the
+    boundary c is placed halfway between the m-th and (m + 1)-th best mean
+    fitness, and each genome is allotted simulations in proportion to
+    (sigma / (mean - c))^2.  Genomes far from the boundary, or whose scores
+    barely vary, therefore receive almost nothing, while close and noisy
+    ones are re-evaluated until their side of the boundary is clear.
+    Genomes with a single score use the pooled deviation of all others.
+
+    Repeated scores are combined into a running mean and variance on each
+    genome.  Since re-evaluated warriors are scored in smaller batches than
+    the full population, this is only meaningful when warriors are scored
+    against fixed benchmarks rather than each other.  Populations are
+    evaluated as genomes, since allocation proceeds one genome at a time.
+    """
+
+    DEFAULT_INCREMENT = 10
+    """
+    The default number of additional simulations allocated per round.
+    """
+
+    def allocate(self, genomes, top, increment):
+        """
+        Determines how many additional evaluations each of the specified
+        genomes should receive in order to best separate the specified number
+        of top genomes from the rest.
+
+        :param genomes: The list of genomes evaluated so far.
+        :param top: The number of genomes that will be selected.
+        :param increment: The total number of additional evaluations.
+        :return: A dictionary of genome indices to evaluation counts.
+        """
+        if top <= 0 or top >= len(genomes) or increment <= 0:
+            return {}
+
+        order = sorted(range(len(genomes)), key=lambda x: genomes[x].fitness,
+                       reverse=True)
+        boundary = (genomes[order[top - 1]].fitness +
+                    genomes[order[top]].fitness) / 2
+        pooled = self.pooled_deviation(genomes)
+
+        if pooled <= 0:
+            return {}
+
+        weights = []
+        for genome in genomes:
+            sigma = sqrt(genome.variance) if genome.evaluations > 1 else pooled
+            delta = max(abs(genome.fitness - boundary), pooled * 1e-3)
+            weights.append((sigma / delta) ** 2)
+
+        total = sum(genome.evaluations for genome in genomes) + increment
+        scale = total / sum(weights)
+        wanted = [max(0.0, w * scale - g.evaluations)
+                  for w, g in zip(weights, genomes)]
+
+        if sum(wanted) <= 0:
+            return {max(range(len(genomes)), key=lambda x: weights[x]):
+                    increment}
+
+        shares = [w * increment / sum(wanted) for w in wanted]
+        counts = [floor(share) for share in shares]
+        remainder = sorted(range(len(genomes)),
+                           key=lambda x: shares[x] - counts[x], reverse=True)
+
+        for index in remainder[:increment - sum(counts)]:
+            counts[index] += 1
+        return {x: count for x, count in enumerate(counts) if count > 0}
+
+    def evolve(self, genomes, pool, params):
+        super().evolve(genomes, pool, params)
+
+        budget = params.get("ocba.budget", len(genomes) // 2)
+        increment = params.get("ocba.increment",
+                               OcbaFitnessEvaluator.DEFAULT_INCREMENT)
+        top = params.get("ocba.top", ceil(len(genomes) / 2))
+
+        while budget > 0:
+            allocation = self.allocate(genomes, top, min(increment, budget))
+            if not allocation:
+                break
+
+            chosen = [genomes[index] for index, count in allocation.items()
+                      for _ in range(count)]
+            for genome, score in zip(chosen, self.evaluate(chosen, params)):
+                genome.add_score(score)
+            budget -= len(chosen)
+        return genomes
+
+    def evolve_population(self, population, pool, params):
+        return EvolvingAlgorithm.evolve_population(self, population, pool,
+                                                   params)
+
+    def pooled_deviation(self, genomes):
+        """
+        Computes the pooled standard deviation of the scores of the specified
+        genomes.
+
+        If no genome has been evaluated more than once, the deviation of the
+        single scores across genomes is used instead.
+
+        :param genomes: The list of genomes to compute a deviation for.
+        :return: A pooled standard deviation.
+        """
+        repeated = [g for g in genomes if g.evaluations > 1]
+
+        if repeated:
+            sum_sq = sum(g.variance * (g.evaluations - 1) for g in repeated)
+            dof = sum(g.evaluations - 1 for g in repeated)
+            return sqrt(sum_sq / dof)
+
+        if len(genomes) < 2:
+            return 0
+        mean = sum(g.fitness for g in genomes) / len(genomes)
+        return sqrt(sum((g.fitness - mean) ** 2 for g in genomes) /
+                    (len(genomes) - 1))
+
+
+class ExpectedFitnessEvaluator(FitnessEvaluator):
     """
+    Represents an implementation of FitnessEvaluator that scores each genome
+    by the expected fitness of the warriors its random walks realize, rather
+    than by a single walk.
+
+    Every walk of a genome with no more than fitness.max_walks of them is
+    enumerated together with its probability (see Tree.enumerate_walks()),
+    so its expected fitness is exact.  Larger genomes instead have about
+    fitness.samples walks drawn by stratified sampling (see
+    Tree.sample_walks()), which gives an unbiased estimate.  Identical
+    warriors, whether from different walks or different genomes, are only
+    simulated once per evaluation; warriors are compared in canonical form
+    (see Warrior.canonical()) for a core of pmars.core_size.
 
+    Like OcbaFitnessEvaluator, this evaluator is only meaningful when
+    warriors are scored against fixed benchmarks rather than each other,
+    since the number of warriors scored together varies.  Populations are
+    evaluated as genomes, since walks are enumerated one genome at a time.
     """
 
-    pass
+    DEFAULT_MAX_WALKS = 32
+    """
+    The default maximum number of walks to enumerate per genome.
+    """
+
+    DEFAULT_SAMPLES = 16
+    """
+    The default number of walks to sample from larger genomes.
+    """
+
+    def evaluate(self, genomes, params):
+        max_walks = params.get("fitness.max_walks",
+                               ExpectedFitnessEvaluator.DEFAULT_MAX_WALKS)
+        samples = params.get("fitness.samples",
+                             ExpectedFitnessEvaluator.DEFAULT_SAMPLES)
+        core_size = params.get("pmars.core_size",
+                               PmarsScoreProvider.DEFAULT_CORE_SIZE)
+
+        unique, weighted = {}, []
+        for genome in genomes:
+            walks = genome.enumerate_walks(max_walks)
+            if walks is None:
+                walks = genome.sample_walks(samples)
+
+            terms = []
+            for weight, chromosomes in walks:
+                warrior = Warrior([x.ins for x in chromosomes])
+                key = tuple(warrior.canonical(core_size).ins_list)
+                terms.append((weight, unique.setdefault(key, len(unique))))
+            weighted.append(terms)
+
+        scores = self.score([Warrior(list(key)) for key in unique], params)
+        return [sum(weight * scores[index] for weight, index in terms)
+                for terms in weighted]
+
+    def evolve_population(self, population, pool, params):
+        return EvolvingAlgorithm.evolve_population(self, population, pool,
+                                                   params)
+
+
+class InheritingFitnessEvaluator(FitnessEvaluator):
+    """
+    Represents an implementation of FitnessEvaluator that skips simulating a
+    fraction of the offspring of crossover, giving them a fitness inherited
+    from their parents instead.
+
+    Of the genomes that carry a lineage (see Lineage), inheritance.fraction
+    are chosen at random to inherit the estimate of their lineage, corrected
+    by the running bias of such estimates; every other genome is simulated
+    as usual.  Simulated genomes with a lineage calibrate the bias and error
+    of estimates (see InheritanceStatistics), and every
+    inheritance.period-th generation nothing is inherited so that the
+    calibration is refreshed from every offspring.  Inherited genomes have
+    no evaluations, and lineage is cleared from every genome once it has
+    been evaluated.
+
+    Populations do not track lineage and are therefore evaluated as genomes.
+
+    Attributes:
+        statistics (InheritanceStatistics): The inheritance statistics of the
+        most recent generation.
+    """
+
+    DEFAULT_FRACTION = 0.5
+    """
+    The default fraction of offspring that inherit their fitness.
+    """
+
+    DEFAULT_PERIOD = 5
+    """
+    The default number of generations between full calibrations.
+    """
+
+    DEFAULT_SMOOTHING = 0.2
+    """
+    The default weight of each generation's errors in the running bias and
+    error of inherited fitness.
+    """
+
+    def __init__(self, provider, credit=None):
+        super().__init__(provider, credit)
+        self.statistics = InheritanceStatistics()
+
+    def evolve(self, genomes, pool, params):
+        fraction = params.get("inheritance.fraction",
+                              InheritingFitnessEvaluator.DEFAULT_FRACTION)
+        period = params.get("inheritance.period",
+                            InheritingFitnessEvaluator.DEFAULT_PERIOD)
+        smoothing = params.get("inheritance.smoothing",
+                               InheritingFitnessEvaluator.DEFAULT_SMOOTHING)
+
+        self.generation += 1
+        offspring = [genome for genome in genomes
+                     if genome.lineage is not None]
+        calibrating = period and (self.generation + 1) % period == 0
+        inherited = set() if calibrating else \
+            {id(x) for x in sample(offspring, round(fraction *
+                                                    len(offspring)))}
+        simulated = [genome for genome in genomes
+                     if id(genome) not in inherited]
+
+        scores = self.evaluate(simulated, params)
+        self.statistics.calibrate([score - genome.lineage.estimate()
+                                   for genome, score in zip(simulated, scores)
+                                   if genome.lineage is not None], smoothing)
+
+        for genome, score in zip(simulated, scores):
+            genome.reset_score()
+            genome.add_score(score)
+        for genome in offspring:
+            if id(genome) in inherited:
+                genome.reset_score(genome.lineage.estimate() +
+                                   self.statistics.bias)
+        for genome in genomes:
+            genome.lineage = None
+
+        self.statistics.inherited = len(inherited)
+        self.statistics.simulated = len(simulated)
+        return genomes
+
+    def evolve_population(self, population, pool, params):
+        return EvolvingAlgorithm.evolve_population(self, population, pool,
+                                                   params)
@@ -0,0 +1,232 @@
+"""
+Contains classes and functions concerned with loading benchmark warriors once
+and sharing them between processes.
+"""
+import hashlib
+import os
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+
+from evored.lang import pack_instruction, unpack_instruction
+from evored.parsing import parse_assembly
+
+FIELDS_PER_INSTRUCTION = 6
+"""
+The number of integers used to pack a single instruction.
+"""
+
+
+class Benchmark:
+    """
+    Represents a single benchmark warrior that has been read from a Redcode
+    source file.
+
+    Attributes:
+        digest (str): The SHA-256 digest of the source file contents.
+        instructions (list): The list of instructions of the warrior.
+        name (str): The name of the warrior (its file name).
+        path (str): The path to the source file.
+    """
+
+    def __init__(self, name, path, digest, instructions):
+        self.digest = digest
+        self.instructions = instructions
+        self.name = name
+        self.path = path
+
+    def __eq__(self, other):
+        if isinstance(other, Benchmark):
+            return self.digest == other.digest
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr((self.name, self.digest))
+
+
+class BenchmarkLibrary:
+    """
+    Represents a collection of benchmark warriors that are parsed once and
+    then shared, read-only, with any number of worker processes.
+
+    Benchmarks are identified by both path and the content hash of their
+    source, the latter of which is suitable for use as a cache key.  Source
+    files are converted to instructions by the parser given to the library,
+    a function from an iterable of lines to a list of instructions, which is
+    the Redcode assembly parser by default.  Calling
+    share() packs every instruction into a single block of shared memory and
+    returns a small, picklable handle; workers then call attach() with that
+    handle to obtain a library backed by the same memory, decoding each
+    benchmark only when it is first used and never touching the files.
+
+    Attributes:
+        benchmarks (dict): The benchmarks in this library, keyed by path.
+        parser (callable): The function used to parse source files.
+    """
+
+    def __init__(self, paths=(), parser=None):
+        self.benchmarks = {}
+        self.parser = parser if parser else parse_assembly
+        self._memory = None
+        self._owner = False
+        self._views = []
+
+        for path in paths:
+            self.load(path)
+
+    def __contains__(self, path):
+        return path in self.benchmarks
+
+    def __getitem__(self, path):
+        return self.benchmarks[path]
+
+    def __iter__(self):
+        return iter(self.benchmarks.values())
+
+    def __len__(self):
+        return len(self.benchmarks)
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Creates a library backed by the shared memory described by the
+        specified handle.
+
+        :param handle: A handle created by share().
+        :return: A new, read-only library.
+        """
+        library = cls()
+        library._memory = SharedMemory(name=handle[0])
+        library._views.append(library._memory.buf.toreadonly())
+        library._views.append(library._views[0].cast("i"))
+
+        view = library._views[-1]
+        for name, path, digest, offset, count in handle[1]:
+            fields = view[offset:offset + count * FIELDS_PER_INSTRUCTION]
+            library.benchmarks[path] = SharedBenchmark(name, path, digest,
+                                                       fields)
+        return library
+
+    def close(self):
+        """
+        Releases any shared memory used by this library, removing it entirely
+        if this library created it.
+        """
+        if self._memory is None:
+            return
+
+        for benchmark in self:
+            if isinstance(benchmark, SharedBenchmark):
+                benchmark.release()
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+        self._memory = None
+
+    def find(self, digest):
+        """
+        Finds the benchmark with the specified content hash.
+
+        :param digest: The content hash to search for.
+        :return: A benchmark, or None if no benchmark has that hash.
+        """
+        for benchmark in self:
+            if benchmark.digest == digest:
+                return benchmark
+        return None
+
+    def load(self, path):
+        """
+        Reads, hashes, and parses the load-format Redcode file at the
+        specified path and adds it to this library.
+
+        :param path: The path to the source file.
+        :return: The loaded benchmark.
+        :raise ParsingException: If the file cannot be parsed.
+        """
+        with open(path, "rb") as f:
+            source = f.read()
+
+        benchmark = Benchmark(os.path.basename(path), path,
+                              hashlib.sha256(source).hexdigest(),
+                              self.parser(source.decode().splitlines()))
+        self.benchmarks[path] = benchmark
+        return benchmark
+
+    def share(self):
+        """
+        Packs every benchmark in this library into a single block of shared
+        memory.
+
+        The memory remains available until this library is closed.
+
+        :return: A picklable handle that may be passed to attach().
+        """
+        if self._memory is not None:
+            raise ValueError("Library is already shared.")
+
+        packed = array("i")
+        entries = []
+
+        for benchmark in self:
+            entries.append((benchmark.name, benchmark.path, benchmark.digest,
+                            len(packed), len(benchmark)))
+            for ins in benchmark.instructions:
+                packed.extend(pack_instruction(ins))
+
+        self._memory = SharedMemory(create=True,
+                                    size=max(1, len(packed) *
+                                             packed.itemsize))
+        self._memory.buf[:len(packed) * packed.itemsize] = packed.tobytes()
+        self._owner = True
+        return self._memory.name, entries
+
+
+class SharedBenchmark(Benchmark):
+    """
+    Represents an implementation of Benchmark whose instructions are stored
+    in shared memory and only decoded when first requested.
+    """
+
+    def __init__(self, name, path, digest, fields):
+        super().__init__(name, path, digest, None)
+        self.fields = fields
+
+    def __len__(self):
+        if self.fields is None:
+            return len(self._instructions)
+        return len(self.fields) // FIELDS_PER_INSTRUCTION
+
+    @property
+    def instructions(self):
+        if self._instructions is None:
+            self._instructions = [
+                unpack_instruction(self.fields[x:x + FIELDS_PER_INSTRUCTION])
+                for x in range(0, len(self.fields), FIELDS_PER_INSTRUCTION)]
+        return self._instructions
+
+    @instructions.setter
+    def instructions(self, instructions):
+        self._instructions = instructions
+
+    def release(self):
+        """
+        Decodes all instructions and then releases the view of shared memory
+        held by this benchmark.
+        """
+        if self.fields is not None:
+            self._instructions = self.instructions
+            self.fields.release()
+            self.fields = None
@@ -0,0 +1,244 @@
+"""
+Contains classes and functions concerned with dividing the scoring of a batch
+of warriors into smaller, independent simulations that may be run in
+parallel.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MatchupJob:
+    """
+    Represents a single, independent unit of simulation work: one warrior
+    battling each of a set of opponents in turn.
+
+    Attributes:
+        cost (float): The estimated cost of this job.
+        index (int): The index of the warrior in its original batch.
+        opponents (list): The opponents to battle, as indices into the list
+        of all opponents.
+        size (int): The number of instructions in the warrior.
+    """
+
+    def __init__(self, index, size, opponents, cost=0.0):
+        self.cost = cost
+        self.index = index
+        self.opponents = opponents
+        self.size = size
+
+    def __repr__(self):
+        return repr((self.index, self.opponents, self.cost))
+
+
+class MatchupPlanner:
+    """
+    Represents a mechanism for splitting the scoring of a batch of warriors
+    into (warrior, opponent set) jobs and running them across a bounded
+    number of workers.
+
+    The cost of each job is estimated from the length of its warrior and the
+    historical duration of battles against each of its opponents.  Jobs are
+    then started longest first so that no single long job is left to run
+    alone at the end of a batch.  Historical durations are kept per opponent
+    as an exponential moving average of the time taken per warrior
+    instruction and are updated as each job completes.
+
+    Warriors may also be scored against each other, in which case each
+    unordered pair is only battled once and the durations of all such
+    battles share a single history.
+
+    Attributes:
+        chunk_size (int): The maximum number of opponents per job.
+        smoothing (float): The weight given to the newest observation when
+        updating historical durations.
+        workers (int): The maximum number of jobs to run concurrently.
+    """
+
+    DEFAULT_CHUNK_SIZE = 4
+    """
+    The default maximum number of opponents per job.
+    """
+
+    DEFAULT_SMOOTHING = 0.25
+    """
+    The default weight given to new duration observations.
+    """
+
+    DEFAULT_WORKERS = os.cpu_count() or 1
+    """
+    The default maximum number of concurrent jobs.
+    """
+
+    PEER = "<peer>"
+    """
+    The key under which the durations of battles between warriors of the
+    same batch are recorded.
+    """
+
+    def __init__(self, workers=None, chunk_size=None, smoothing=None):
+        self.chunk_size = chunk_size if chunk_size else \
+            MatchupPlanner.DEFAULT_CHUNK_SIZE
+        self.smoothing = smoothing if smoothing else \
+            MatchupPlanner.DEFAULT_SMOOTHING
+        self.workers = workers if workers else MatchupPlanner.DEFAULT_WORKERS
+        self._durations = {}
+        self._lock = threading.Lock()
+
+    def duration(self, opponent):
+        """
+        Returns the estimated time taken per warrior instruction to battle
+        the specified opponent.
+
+        Opponents without any history are assumed to take as long as the
+        average of those that do, or one unit if there is no history at all.
+
+        :param opponent: The opponent to obtain an estimate for.
+        :return: An estimated duration.
+        """
+        with self._lock:
+            if opponent in self._durations:
+                return self._durations[opponent]
+            if self._durations:
+                return sum(self._durations.values()) / len(self._durations)
+        return 1.0
+
+    def estimate(self, size, opponents):
+        """
+        Estimates the cost of battling a warrior of the specified size
+        against each of the specified opponents.
+
+        :param size: The number of instructions in the warrior.
+        :param opponents: The list of opponents.
+        :return: An estimated cost.
+        """
+        return max(size, 1) * sum(self.duration(opp) for opp in opponents)
+
+    def plan(self, warriors, opponents):
+        """
+        Splits the battles between each of the specified warriors and all of
+        the specified opponents into jobs, ordered from most to least costly.
+
+        :param warriors: The list of warriors to score.
+        :param opponents: The list of opponents to battle.
+        :return: A list of jobs in the order they should be started.
+        """
+        jobs = []
+
+        for index, warrior in enumerate(warriors):
+            size = len(warrior.ins_list)
+            for start in range(0, len(opponents), self.chunk_size):
+                chunk = list(range(start, min(start + self.chunk_size,
+                                              len(opponents))))
+                cost = self.estimate(size, [opponents[x] for x in chunk])
+                jobs.append(MatchupJob(index, size, chunk, cost))
+
+        jobs.sort(key=lambda job: job.cost, reverse=True)
+        return jobs
+
+    def plan_peers(self, warriors):
+        """
+        Splits the battles between every unordered pair of the specified
+        warriors into jobs, ordered from most to least costly.
+
+        Each job battles one warrior against warriors that follow it in the
+        batch, so every pair appears in exactly one job.
+
+        :param warriors: The list of warriors to score.
+        :return: A list of jobs in the order they should be started.
+        """
+        jobs = []
+
+        for index, warrior in enumerate(warriors):
+            size = len(warrior.ins_list)
+            for start in range(index + 1, len(warriors), self.chunk_size):
+                chunk = list(range(start, min(start + self.chunk_size,
+                                              len(warriors))))
+                cost = self.estimate(size, [MatchupPlanner.PEER] * len(chunk))
+                jobs.append(MatchupJob(index, size, chunk, cost))
+
+        jobs.sort(key=lambda job: job.cost, reverse=True)
+        return jobs
+
+    def record(self, job, opponents, elapsed):
+        """
+        Updates the historical durations of the opponents of the specified
+        job using the specified elapsed time.
+
+        :param job: The job that completed.
+        :param opponents: The list of all opponents.
+        :param elapsed: The time the job took to complete.
+        """
+        per_battle = elapsed / (max(job.size, 1) * len(job.opponents))
+
+        with self._lock:
+            for x in job.opponents:
+                opponent = opponents[x]
+                if opponent in self._durations:
+                    self._durations[opponent] += self.smoothing * \
+                        (per_battle - self._durations[opponent])
+                else:
+                    self._durations[opponent] = per_battle
+
+    def run(self, warriors, opponents, battle):
+        """
+        Scores each of the specified warriors against every one of the
+        specified opponents, running jobs concurrently.
+
+        The specified battle function receives a warrior index and a single
+        opponent and must return the score of the warrior against that
+        opponent.  It is called from multiple threads at once.
+
+        :param warriors: The list of warriors to score.
+        :param opponents: The list of opponents to battle.
+        :param battle: The function that conducts a single battle.
+        :return: A matrix of scores, with one row per warrior (in original
+        order) and one column per opponent.
+        """
+        scores = [[0] * len(opponents) for _ in warriors]
+
+        def execute(job):
+            start = time.perf_counter()
+            results = [battle(job.index, opponents[x]) for x in job.opponents]
+            self.record(job, opponents, time.perf_counter() - start)
+            return job, results
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for job, results in executor.map(execute,
+                                              self.plan(warriors, opponents)):
+                for x, score in zip(job.opponents, results):
+                    scores[job.index][x] = score
+        return scores
+
+    def run_peers(self, warriors, battle):
+        """
+        Scores each of the specified warriors against every other, running
+        jobs concurrently and battling each pair only once.
+
+        The specified battle function receives the indices of two warriors
+        and must return the scores of the first and second warrior against
+        each other, in that order.  It is called from multiple threads at
+        once.
+
+        :param warriors: The list of warriors to score.
+        :param battle: The function that conducts a single battle.
+        :return: A matrix of scores, with one row and one column per warrior
+        (in original order) and zeros along the diagonal.
+        """
+        peers = [MatchupPlanner.PEER] * len(warriors)
+        scores = [[0] * len(warriors) for _ in warriors]
+
+        def execute(job):
+            start = time.perf_counter()
+            results = [battle(job.index, x) for x in job.opponents]
+            self.record(job, peers, time.perf_counter() - start)
+            return job, results
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for job, results in executor.map(execute,
+                                              self.plan_peers(warriors)):
+                for x, (score, other) in zip(job.opponents, results):
+                    scores[job.index][x] = score
+                    scores[x][job.index] = other
+        return scores
@@ -4,6 +4,15 @@ Core Wars simulation.
 """
 import subprocess
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from random import shuffle
+
+from evored.fitness.benchmarks import BenchmarkSubsetSelector
+from evored.fitness.planning import MatchupPlanner
+from evored.fitness.seeding import SeedSchedule
+from evored.fitness.tuning import CycleLimitTuner
+from evored.fitness.writing import WarriorWriter
+from evored.utils import WorkspaceManager, flatten
 
 
 class ScoringException(Exception):
@@ -46,16 +55,48 @@ class ScoreProvider(metaclass=ABCMeta):
         """
         pass
 
+    def calculate_many(self, batches, file_prefix, params):
+        """
+        Computes scores for each of the specified batches of warriors, as if
+        calculate() were called on each batch in turn.
+
+        Implementations may override this to overlap the work of consecutive
+        batches.
+
+        :param batches: The list of warrior lists to evaluate.
+        :param file_prefix: The prefix to use when creating Redcode source
+        files.
+        :param params: A dictionary of parameters.
+        :return: A list of fitness score lists, one per batch.
+        :raise ScoringException: If there was a problem evaluating the warriors.
+        """
+        return [self.calculate(batch, file_prefix, params)
+                for batch in batches]
+
+    def close(self):
+        """
+        Releases any resources held by this provider.
+        """
+        pass
+
 
 class PmarsScoreProvider(ScoreProvider):
     """
     Represents an implementation of FitnessEvaluator that uses an external
     program, PMARS, to evaluate warriors for fitness.
-    """
 
-    """
-    Represents an implementation of FitnessEvaluator that uses an external
-    program, PMARS, to evaluate warriors for fitness.
+    If a placement seed is specified (pmars.seed) then the placement of
+    warriors is pinned for each generation (sim.generation), so that every
+    candidate of a generation is scored under identical conditions.  The
+    placements used are recorded in the seed schedule.  The minimum distance
+    between warriors (pmars.min_distance) is passed to PMARS as well, so that
+    it agrees with the range that placements are drawn from.
+
+    The cycle limit (pmars.max_cycles) may either be fixed or, if
+    pmars.adaptive_cycles is set, tuned each generation from the tie rate of
+    one-on-one battles so that long, tie-bound battles are cut short.  PMARS
+    only reports ties for battles between two warriors, so tuning is only
+    available to providers that run nothing else (see ONE_ON_ONE).
     """
 
     DEFAULT_ASM_OUTPUT = False
@@ -86,6 +127,16 @@ class PmarsScoreProvider(ScoreProvider):
     Whether or not to display additional output.    
     """
 
+    ONE_ON_ONE = False
+    """
+    Whether or not every simulation is a battle between exactly two warriors.
+    """
+
+    RESULTS_OFFSET = len("Results:")
+    """
+    The number of characters to offset by when parsing PMARS results.
+    """
+
     SCORE_OFFSET = len("scores") + 1
     """
     The number of characters to offset by when parsing PMARS output.
@@ -98,6 +149,8 @@ class PmarsScoreProvider(ScoreProvider):
         asm = params.get("pmars.asm", PmarsScoreProvider.DEFAULT_ASM_OUTPUT)
         core_size = params.get("pmars.core_size",
                                PmarsScoreProvider.DEFAULT_CORE_SIZE)
+        max_cycles = params.get("pmars.max_cycles",
+                                CycleLimitTuner.DEFAULT_MAX_CYCLES)
         rounds = params.get("pmars.rounds", PmarsScoreProvider.DEFAULT_ROUNDS)
         verbose = params.get("pmars.verbose",
                              PmarsScoreProvider.DEFAULT_VERBOSITY)
@@ -110,22 +163,157 @@ class PmarsScoreProvider(ScoreProvider):
         if verbose:
             self.cmd.append("-V")
 
+        self.cycles = None
+        if params.get("pmars.adaptive_cycles", False):
+            if not self.ONE_ON_ONE:
+                raise ScoringException("Adaptive cycle limits require a "
+                                       "provider that runs one-on-one "
+                                       "battles.")
+            self.cycles = CycleLimitTuner(max_cycles,
+                                          params.get("pmars.min_cycles"),
+                                          params.get("pmars.tie_tolerance"))
+        elif "pmars.max_cycles" in params:
+            self.cmd.extend(["-c", str(max_cycles)])
+
+        if params.get("pmars.min_distance") is not None:
+            self.cmd.extend(["-d", str(params["pmars.min_distance"])])
+
+        self.seeds = None
+        if params.get("pmars.seed") is not None:
+            self.seeds = SeedSchedule(params["pmars.seed"], core_size,
+                                      params.get("pmars.min_distance"))
+
+        self.writer = WarriorWriter()
+        self.workspaces = WorkspaceManager(
+            params.get("sim.temp_dir", WarriorWriter.DEFAULT_DIRECTORY))
+
     def calculate(self, warriors, file_prefix, params):
-        if len(warriors) < 1 or (len(warriors) <= 1 and
-                                 not params["benchmarks"]):
-            raise ScoringException("Not enough warriors to score.")
+        benchmarks = self.check_warriors(warriors, params)
+
+        with self.workspaces.workspace() as work_dir:
+            file_paths = self.writer.paths(len(warriors), file_prefix,
+                                           work_dir)
+            self.writer.write(warriors, file_paths)
+            return self.simulate(file_paths + benchmarks, params)
+
+    def calculate_many(self, batches, file_prefix, params):
+        """
+        Computes scores for each of the specified batches of warriors,
+        writing the source files of the next batch on a background thread
+        while the current batch is being simulated.
+
+        :param batches: The list of warrior lists to evaluate.
+        :param file_prefix: The prefix to use when creating Redcode source
+        files.
+        :param params: A dictionary of parameters.
+        :return: A list of fitness score lists, one per batch.
+        :raise ScoringException: If there was a problem evaluating the warriors.
+        """
+        if not batches:
+            return []
+
+        benchmarks = [self.check_warriors(batch, params) for batch in batches]
+        work_dirs = [self.workspaces.acquire(), self.workspaces.acquire()]
+        file_paths = [self.writer.paths(len(batch), file_prefix,
+                                        work_dirs[index % 2])
+                      for index, batch in enumerate(batches)]
+        scores = []
+
+        try:
+            pending = self.writer.submit(batches[0], file_paths[0])
+            for index in range(len(batches)):
+                pending.result()
+
+                if index + 1 < len(batches):
+                    pending = self.writer.submit(batches[index + 1],
+                                                 file_paths[index + 1])
+                scores.append(self.simulate(file_paths[index] +
+                                            benchmarks[index], params))
+            pending.result()
+        finally:
+            for work_dir in work_dirs:
+                self.workspaces.release(work_dir)
+        return scores
+
+    def close(self):
+        self.writer.close()
+        self.workspaces.close()
+
+    def check_warriors(self, warriors, params):
+        """
+        Ensures that there are enough of the specified warriors, along with
+        any user-specified benchmarks, to conduct a simulation.
 
-        base_path = params["sim.temp_dir"] + "/" + file_prefix + "_"
+        :param warriors: The list of warriors to evaluate.
+        :param params: A dictionary of parameters.
+        :return: The list of benchmark file paths.
+        :raise ScoringException: If there are not enough warriors to score.
+        """
         benchmarks = params.get("fitness.benchmarks", [])
-        file_paths = [base_path + str(x) + ".RED" for x in range(len(warriors))]
-        full_cmd = self.cmd + file_paths + benchmarks
 
-        for warrior, file_path in zip(warriors, file_paths):
-            warrior.write(file_path)
+        if len(warriors) < 1 or (len(warriors) <= 1 and not benchmarks):
+            raise ScoringException("Not enough warriors to score.")
+        return benchmarks
+
+    def cycle_options(self, params):
+        """
+        Creates the PMARS command line options that set the cycle limit for
+        the generation specified in the specified parameters, if the limit is
+        being tuned automatically.
+
+        :param params: A dictionary of parameters.
+        :return: A list of PMARS command line options.
+        """
+        if self.cycles is None:
+            return []
+        return self.cycles.options(params.get("sim.generation", 0))
+
+    def seed_options(self, params):
+        """
+        Creates the PMARS command line options that pin warrior placement for
+        the generation specified in the specified parameters, if common
+        random numbers are enabled.
+
+        :param params: A dictionary of parameters.
+        :return: A list of PMARS command line options.
+        """
+        if self.seeds is None:
+            return []
+        return self.seeds.options(params.get("sim.generation", 0))
+
+    def simulate(self, file_paths, params):
+        """
+        Runs PMARS on the specified Redcode source files and collects the
+        resulting scores.
+
+        :param file_paths: The list of source files to simulate.
+        :param params: A dictionary of parameters.
+        :return: The generated fitness scores, in file order.
+        :raise ScoringException: If PMARS could not be run successfully.
+        """
+        try:
+            result = subprocess.run(self.cmd + self.seed_options(params) +
+                                    self.cycle_options(params) + file_paths,
+                                    stdout=subprocess.PIPE,
+                                    universal_newlines=True)
+        except OSError as e:
+            raise ScoringException("Could not run PMARS: %s" % e)
+
+        if result.returncode != 0:
+            raise ScoringException("PMARS exited with code %i." %
+                                   result.returncode)
 
-        pmars_pid = subprocess.Popen(full_cmd, shell=True,
-                                     stdout=subprocess.PIPE)
-        return self.parse_output(pmars_pid.stdout)
+        lines = result.stdout.splitlines()
+        scores = self.parse_output(lines)
+        if not scores:
+            raise ScoringException("PMARS did not report any scores.")
+
+        if self.cycles is not None and len(scores) == 2:
+            results = self.parse_results(lines)
+            if results:
+                self.cycles.record(params.get("sim.generation", 0),
+                                   results[2], sum(results))
+        return scores
 
     def parse_output(self, stream):
         """
@@ -143,3 +331,220 @@ class PmarsScoreProvider(ScoreProvider):
             except ValueError:
                 pass
         return scores
+
+    def parse_results(self, stream):
+        """
+        Extracts the win, loss, and tie counts of the first warrior from the
+        specified output stream of a battle between two warriors.
+
+        :param stream: The output stream to parse.
+        :return: The wins, losses, and ties of the first warrior, or None if
+        they could not be found.
+        """
+        for line in stream:
+            try:
+                index = line.index("Results:") + \
+                        PmarsScoreProvider.RESULTS_OFFSET
+                results = [int(x) for x in line[index:].split()]
+            except ValueError:
+                continue
+
+            if len(results) == 3:
+                return results
+        return None
+
+
+class ShardedPmarsScoreProvider(PmarsScoreProvider):
+    """
+    Represents an implementation of PmarsScoreProvider that splits a batch of
+    warriors into independent one-on-one battles against each opponent and
+    runs them concurrently, rather than passing every warrior to a single
+    PMARS process.
+
+    Opponents are the user-specified benchmarks or, if there are none, every
+    other warrior in the batch (in which case each pair battles only once and
+    both scores are taken from the same simulation).  The score of each
+    warrior is the sum of its scores against all of its opponents.
+
+    Attributes:
+        planner (MatchupPlanner): The planner used to schedule battles.
+    """
+
+    ONE_ON_ONE = True
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.planner = MatchupPlanner(params.get("planner.workers"),
+                                      params.get("planner.chunk_size"))
+
+    def calculate(self, warriors, file_prefix, params):
+        return [sum(row) for row in
+                self.calculate_matrix(warriors, file_prefix, params)]
+
+    def calculate_many(self, batches, file_prefix, params):
+        return ScoreProvider.calculate_many(self, batches, file_prefix, params)
+
+    def calculate_matrix(self, warriors, file_prefix, params):
+        """
+        Computes the score of each of the specified warriors against each of
+        its opponents individually.
+
+        :param warriors: The list of warriors to evaluate.
+        :param file_prefix: The prefix to use when creating Redcode source
+        files.
+        :param params: A dictionary of parameters.
+        :return: A matrix of scores, with one row per warrior and one column
+        per opponent.
+        :raise ScoringException: If there was a problem evaluating the warriors.
+        """
+        benchmarks = self.check_warriors(warriors, params)
+
+        with self.workspaces.workspace() as work_dir:
+            file_paths = self.writer.paths(len(warriors), file_prefix,
+                                           work_dir)
+            self.writer.write(warriors, file_paths)
+
+            if not benchmarks:
+                def battle(index, other):
+                    return self.simulate([file_paths[index],
+                                          file_paths[other]], params)[:2]
+
+                return self.planner.run_peers(warriors, battle)
+
+            def battle(index, opponent):
+                return self.simulate([file_paths[index], opponent],
+                                     params)[0]
+
+            return self.planner.run(warriors, benchmarks, battle)
+
+
+class MeleePmarsScoreProvider(PmarsScoreProvider):
+    """
+    Represents an implementation of PmarsScoreProvider that ranks warriors
+    by placing them into groups that all battle one another at once in a
+    single simulation (a melee) instead of battling in pairs.
+
+    Every pass shuffles the warriors into new groups so that each warrior
+    meets a different set of rivals, and the score of a warrior is its mean
+    score over all passes.  Because PMARS awards up to (N^2 - 1) points per
+    round in an N-warrior melee, scores from groups of different sizes are
+    rescaled to the configured group size before being combined.  Any
+    user-specified benchmarks join every group.
+
+    This requires (passes * warriors / group size) simulations instead of
+    the (warriors^2) required by a full round robin, at the cost of a
+    noisier ranking.
+    """
+
+    DEFAULT_GROUP_SIZE = 8
+    """
+    The default number of warriors per melee.
+    """
+
+    DEFAULT_PASSES = 3
+    """
+    The default number of times each warrior is placed into a melee.
+    """
+
+    def calculate(self, warriors, file_prefix, params):
+        benchmarks = self.check_warriors(warriors, params)
+        group_size = params.get("melee.group_size",
+                                MeleePmarsScoreProvider.DEFAULT_GROUP_SIZE)
+        passes = params.get("melee.passes",
+                            MeleePmarsScoreProvider.DEFAULT_PASSES)
+        workers = params.get("planner.workers", MatchupPlanner.DEFAULT_WORKERS)
+
+        if group_size < 2 and not benchmarks:
+            raise ScoringException("Melee groups must hold two warriors.")
+
+        groups = flatten([self.create_groups(len(warriors), group_size)
+                          for _ in range(passes)])
+        scores = [0] * len(warriors)
+
+        with self.workspaces.workspace() as work_dir:
+            file_paths = self.writer.paths(len(warriors), file_prefix,
+                                           work_dir)
+            self.writer.write(warriors, file_paths)
+
+            def battle(group):
+                return self.simulate([file_paths[x] for x in group] +
+                                     benchmarks, params)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for group, results in zip(groups, executor.map(battle,
+                                                               groups)):
+                    size = len(group) + len(benchmarks)
+                    full_size = group_size + len(benchmarks)
+                    scale = (full_size * full_size - 1) / (size * size - 1)
+
+                    for index, score in zip(group, results):
+                        scores[index] += score * scale / passes
+
+        for warrior, score in zip(warriors, scores):
+            warrior.fitness = score
+        return scores
+
+    def calculate_many(self, batches, file_prefix, params):
+        return ScoreProvider.calculate_many(self, batches, file_prefix, params)
+
+    def create_groups(self, count, group_size):
+        """
+        Randomly divides the specified number of warriors into melee groups
+        of (at most) the specified size.
+
+        A final group that would otherwise contain a single warrior is
+        merged into the group before it.
+
+        :param count: The number of warriors to divide.
+        :param group_size: The maximum number of warriors per group.
+        :return: A list of groups, each a list of warrior indices.
+        """
+        indices = list(range(count))
+        shuffle(indices)
+
+        groups = [indices[x:x + group_size]
+                  for x in range(0, count, group_size)]
+        if len(groups) > 1 and len(groups[-1]) < 2:
+            groups[-2].extend(groups.pop())
+        return groups
+
+
+class SubsetPmarsScoreProvider(ShardedPmarsScoreProvider):
+    """
+    Represents an implementation of ShardedPmarsScoreProvider that battles
+    warriors against a small, representative subset of the user-specified
+    benchmarks in most generations.
+
+    Every few generations warriors battle the full set of benchmarks again,
+    which both re-chooses the subset and measures how closely the previous
+    subset reproduced the full ranking (see BenchmarkSubsetSelector).  Scores
+    against a subset are scaled up to the size of the full set so that they
+    remain comparable.
+
+    Attributes:
+        selector (BenchmarkSubsetSelector): The mechanism used to choose
+        benchmarks.
+    """
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.selector = BenchmarkSubsetSelector(
+            params.get("fitness.benchmarks", []),
+            params.get("benchmarks.subset_size"),
+            params.get("benchmarks.revalidate"))
+
+    def calculate(self, warriors, file_prefix, params):
+        if not self.selector.benchmarks:
+            return super().calculate(warriors, file_prefix, params)
+
+        generation = params.get("sim.generation", 0)
+        benchmarks = self.selector.select(generation)
+        scale = len(self.selector.benchmarks) / len(benchmarks)
+
+        local = dict(params)
+        local["fitness.benchmarks"] = benchmarks
+        matrix = self.calculate_matrix(warriors, file_prefix, local)
+
+        if self.selector.is_full(generation):
+            self.selector.update(generation, matrix)
+        return [sum(row) * scale for row in matrix]
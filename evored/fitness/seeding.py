@@ -0,0 +1,69 @@
+"""
+Contains classes and functions concerned with controlling the randomness of
+Core Wars simulations so that warriors may be compared under identical
+conditions.
+"""
+from random import Random, randrange
+from threading import Lock
+
+
+class SeedSchedule:
+    """
+    Represents a reproducible schedule of warrior placements, one per
+    generation, that is shared by every candidate in that generation.
+
+    PMARS normally places the second warrior at a random position each round,
+    which adds noise to every score.  Pinning the placement seed (and using a
+    fixed series of positions for the remaining rounds) means that all
+    candidates of a generation face exactly the same conditions - a form of
+    common random numbers - so that differences in score reflect differences
+    in warriors rather than luck.  Placements are derived from a single base
+    seed, so an entire run may be reproduced from it and the recorded
+    history.
+
+    Attributes:
+        base_seed (int): The seed every placement is derived from.
+        core_size (int): The size of the simulated core.
+        history (dict): The placement used for each generation so far.
+        min_distance (int): The minimum distance between warriors.
+    """
+
+    DEFAULT_MIN_DISTANCE = 100
+    """
+    The default minimum distance between warriors (identical to PMARS).
+    """
+
+    def __init__(self, base_seed=None, core_size=8000, min_distance=None):
+        self.base_seed = base_seed if base_seed is not None else \
+            randrange(0, 2 ** 32)
+        self.core_size = core_size
+        self.history = {}
+        self.min_distance = min_distance if min_distance else \
+            SeedSchedule.DEFAULT_MIN_DISTANCE
+        self._lock = Lock()
+
+    def options(self, generation):
+        """
+        Creates the PMARS command line options that pin the placement of
+        warriors for the specified generation.
+
+        :param generation: The generation to obtain options for.
+        :return: A list of PMARS command line options.
+        """
+        return ["-F", str(self.position(generation)), "-f"]
+
+    def position(self, generation):
+        """
+        Computes the starting position of the second warrior for the
+        specified generation and records it in the history.
+
+        :param generation: The generation to compute a position for.
+        :return: A starting position.
+        """
+        rng = Random("%i:%i" % (self.base_seed, generation))
+        position = rng.randint(self.min_distance,
+                               self.core_size - self.min_distance)
+
+        with self._lock:
+            self.history[generation] = position
+        return position
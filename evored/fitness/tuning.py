@@ -0,0 +1,176 @@
+"""
+Contains classes and functions concerned with adjusting simulation settings
+over the course of a run in order to reduce the cost of fitness evaluation.
+"""
+from threading import Lock
+
+
+class CycleLimitTuner:
+    """
+    Represents a mechanism for automatically lowering the maximum number of
+    cycles a battle may last before it is declared a tie.
+
+    Randomly generated warriors frequently survive until the cycle limit,
+    which means most of the time spent simulating them is spent on battles
+    that end in ties and carry little information.  This tuner records, for
+    each generation, the fraction of battles that ended in a tie (the only
+    outcome PMARS reports besides scores) and uses it to choose the limit for
+    the next generation: the tie rate at the full limit is used as a
+    baseline, and the limit is shrunk geometrically while the tie rate stays
+    within tolerance of that baseline and grown again once it does not.
+
+    Every few generations the full limit is restored in order to re-measure
+    the baseline.  The limit never leaves the configured bounds.
+
+    Attributes:
+        baseline (float): The tie rate most recently measured at the full
+        limit, or None if it has not been measured.
+        history (list): A record of each completed generation, as a
+        dictionary of its generation, limit, tie rate, and number of battles.
+        limit (int): The current cycle limit.
+        max_cycles (int): The maximum (and initial) cycle limit.
+        min_cycles (int): The minimum cycle limit.
+        revalidate (int): The number of generations between baseline
+        measurements.
+        shrink (float): The factor to shrink the limit by each generation.
+        tolerance (float): The acceptable fraction of battles that may be
+        converted from decisive outcomes to ties.
+    """
+
+    DEFAULT_MAX_CYCLES = 80000
+    """
+    The default maximum number of cycles (identical to PMARS).
+    """
+
+    DEFAULT_MIN_CYCLES = 1000
+    """
+    The default minimum number of cycles.
+    """
+
+    DEFAULT_REVALIDATE = 10
+    """
+    The default number of generations between baseline measurements.
+    """
+
+    DEFAULT_SHRINK = 0.8
+    """
+    The default factor to shrink the limit by.
+    """
+
+    DEFAULT_TOLERANCE = 0.02
+    """
+    The default fraction of battles that may be converted to ties.
+    """
+
+    def __init__(self, max_cycles=None, min_cycles=None, tolerance=None,
+                 shrink=None, revalidate=None):
+        self.max_cycles = max_cycles if max_cycles else \
+            CycleLimitTuner.DEFAULT_MAX_CYCLES
+        self.min_cycles = min(self.max_cycles, min_cycles if min_cycles else
+                              CycleLimitTuner.DEFAULT_MIN_CYCLES)
+        self.tolerance = tolerance if tolerance is not None else \
+            CycleLimitTuner.DEFAULT_TOLERANCE
+        self.shrink = shrink if shrink else CycleLimitTuner.DEFAULT_SHRINK
+        self.revalidate = revalidate if revalidate else \
+            CycleLimitTuner.DEFAULT_REVALIDATE
+
+        self.baseline = None
+        self.history = []
+        self.limit = self.max_cycles
+
+        self._battles = 0
+        self._generation = None
+        self._lock = Lock()
+        self._ties = 0
+
+    def _advance(self, generation):
+        """
+        Completes the current generation if the specified generation differs
+        from it.
+
+        This function is not thread-safe and must be called with the lock
+        held.
+
+        :param generation: The generation being simulated.
+        """
+        if self._generation is None:
+            self._generation = generation
+        elif generation != self._generation:
+            self._finish()
+            self._generation = generation
+
+    def _finish(self):
+        """
+        Completes the current generation, recording its statistics and
+        choosing the limit for the next.
+
+        This function is not thread-safe and must be called with the lock
+        held.
+        """
+        if not self._battles:
+            return
+
+        tie_rate = self._ties / self._battles
+        self.history.append({"generation": self._generation,
+                             "limit": self.limit,
+                             "tie_rate": tie_rate,
+                             "battles": self._battles})
+        self.limit = self.next_limit(tie_rate)
+
+        self._battles = self._ties = 0
+
+    def finish(self):
+        """
+        Completes the current generation without waiting for the next to
+        begin, recording its statistics and choosing the next limit.
+        """
+        with self._lock:
+            self._finish()
+
+    def next_limit(self, tie_rate):
+        """
+        Chooses the next cycle limit given the specified tie rate observed at
+        the current limit.
+
+        :param tie_rate: The fraction of battles that ended in ties.
+        :return: The next cycle limit.
+        """
+        if self.limit >= self.max_cycles:
+            self.baseline = tie_rate
+
+        if len(self.history) % self.revalidate == 0:
+            return self.max_cycles
+
+        if self.baseline is None:
+            limit = self.max_cycles
+        elif tie_rate - self.baseline <= self.tolerance:
+            limit = int(self.limit * self.shrink)
+        else:
+            limit = int(self.limit / self.shrink)
+        return max(self.min_cycles, min(self.max_cycles, limit))
+
+    def options(self, generation):
+        """
+        Creates the PMARS command line options that set the cycle limit for
+        the specified generation.
+
+        :param generation: The generation being simulated.
+        :return: A list of PMARS command line options.
+        """
+        with self._lock:
+            self._advance(generation)
+            return ["-c", str(self.limit)]
+
+    def record(self, generation, ties, battles):
+        """
+        Records the outcome of one or more battles in the specified
+        generation.
+
+        :param generation: The generation the battles belong to.
+        :param ties: The number of battles that ended in ties.
+        :param battles: The total number of battles.
+        """
+        with self._lock:
+            self._advance(generation)
+            self._battles += battles
+            self._ties += ties
@@ -0,0 +1,116 @@
+"""
+Contains classes and functions concerned with converting warriors to Redcode
+source files for consumption by an external Core Wars simulator.
+"""
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+WARRIOR_HEADER = ";redcode-94\n;name %s\n;author Evo-Red automatic generation\n"
+"""
+The header prepended to every generated Redcode source file.
+"""
+
+
+@lru_cache(maxsize=65536)
+def render_instruction(ins):
+    """
+    Converts the specified instruction to its textual Redcode form, caching
+    the result so that each unique instruction is only formatted once.
+
+    :param ins: The instruction to render.
+    :return: The Redcode text of an instruction.
+    """
+    return str(ins)
+
+
+def render_warrior(warrior, name):
+    """
+    Converts the specified warrior to the complete contents of a valid
+    Redcode source file with the specified name.
+
+    :param warrior: The warrior to render.
+    :param name: The name of the warrior.
+    :return: The Redcode source of a warrior.
+    """
+    lines = [render_instruction(ins) for ins in warrior.ins_list]
+    return (WARRIOR_HEADER % name) + "\n".join(lines) + "\n"
+
+
+class WarriorWriter:
+    """
+    Represents a mechanism for writing entire batches of warriors to Redcode
+    source files at once.
+
+    Writing may either be performed synchronously or submitted to a single
+    background thread, allowing the source files of the next batch to be
+    written while the current batch is being simulated.  Both are safe to
+    use from multiple threads at once.  By default files are written to
+    shared memory (/dev/shm) if available so that scoring does not touch the
+    disk.
+
+    Attributes:
+        directory (str): The directory to write source files to by default.
+    """
+
+    DEFAULT_DIRECTORY = "/dev/shm" if os.path.isdir("/dev/shm") else \
+        tempfile.gettempdir()
+    """
+    The default directory to write source files to.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory if directory else \
+            WarriorWriter.DEFAULT_DIRECTORY
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def close(self):
+        """
+        Waits for any outstanding writes to finish and releases the
+        background thread.
+        """
+        self._executor.shutdown(wait=True)
+
+    def paths(self, count, file_prefix, directory=None):
+        """
+        Creates a list of source file paths for a batch of warriors of the
+        specified size.
+
+        :param count: The number of warriors in the batch.
+        :param file_prefix: The prefix to use for each file name.
+        :param directory: The directory to place the files in, or None to use
+        the default.
+        :return: A list of absolute file paths.
+        """
+        base_path = os.path.join(directory if directory else self.directory,
+                                 file_prefix + "_")
+        return [base_path + str(x) + ".RED" for x in range(count)]
+
+    def submit(self, warriors, file_paths):
+        """
+        Schedules the specified warriors to be written to the specified file
+        paths on a background thread.
+
+        :param warriors: The list of warriors to write.
+        :param file_paths: The list of file paths to write to.
+        :return: A future that completes when every file has been written.
+        """
+        return self._executor.submit(self.write, warriors, file_paths)
+
+    def write(self, warriors, file_paths):
+        """
+        Writes the specified warriors to the specified file paths in a single
+        pass, rendering every source file before any is opened.
+
+        :param warriors: The list of warriors to write.
+        :param file_paths: The list of file paths to write to.
+        :return: The list of file paths written.
+        """
+        sources = [render_warrior(warrior, file_path)
+                   for warrior, file_path in zip(warriors, file_paths)]
+
+        for source, file_path in zip(sources, file_paths):
+            with open(file_path, "w") as f:
+                f.write(source)
+        return file_paths
@@ -3,9 +3,54 @@ Contains all classes and functions pertaining to the random generation of
 Redcode instructions.
 """
 from abc import ABCMeta, abstractmethod
-from random import choice, randrange
+from functools import lru_cache
+from random import choice, random, randrange
 
-from evored.lang import OpCode, Modifier, AddressMode, Instruction, Argument
+import numpy as np
+
+from evored.lang import OpCode, Modifier, AddressMode, Instruction, \
+    Argument, ADDRESS_MODES, IGNORED_MODIFIER_OPCODES, MODIFIERS, OPCODES, \
+    default_modifier, pack_instruction
+
+
+def _canonical_fields(fields, core_size):
+    """
+    Converts the specified array of packed instructions, in place, to the
+    packed canonical forms (see Instruction.canonical()) of those
+    instructions for a core of the specified size.
+
+    :param fields: The array of packed instructions, one per row.
+    :param core_size: The size of the core.
+    :return: The same array.
+    """
+    fields[:, 3] %= core_size
+    fields[:, 5] %= core_size
+
+    ignored = np.isin(fields[:, 0], [OPCODES.index(x) for x in
+                                     IGNORED_MODIFIER_OPCODES])
+    replaced = ignored | (fields[:, 1] == MODIFIERS.index(Modifier.Empty))
+    fields[replaced, 1] = _default_modifiers()[
+        fields[replaced, 0], fields[replaced, 2], fields[replaced, 4]]
+    return fields
+
+
+@lru_cache(maxsize=None)
+def _default_modifiers():
+    """
+    Creates a table of the index of the default modifier (see
+    lang.default_modifier()) of every combination of operation code and
+    addressing modes, indexed by their packed indices.
+
+    :return: An array of modifier indices.
+    """
+    table = np.empty((len(OPCODES), len(ADDRESS_MODES), len(ADDRESS_MODES)),
+                     dtype=np.int32)
+    for x, opcode in enumerate(OPCODES):
+        for y, mode_a in enumerate(ADDRESS_MODES):
+            for z, mode_b in enumerate(ADDRESS_MODES):
+                table[x, y, z] = MODIFIERS.index(
+                    default_modifier(opcode, mode_a, mode_b))
+    return table
 
 
 class GenePool(metaclass=ABCMeta):
@@ -16,6 +61,20 @@ class GenePool(metaclass=ABCMeta):
     that is not coupled to a fitness score.
     """
 
+    def canonical_packed(self, fields):
+        """
+        Converts the specified array of packed genes, in place, to the form
+        in which this gene pool creates genes, so that genes altered outside
+        of the pool (such as by mutation) compare and hash like its own.
+
+        Implementations that create genes in canonical form should override
+        this function.
+
+        :param fields: The array of packed genes, one per row.
+        :return: The same array.
+        """
+        return fields
+
     def extract(self, count):
         """
         Creates a list of new genes with the specified size.
@@ -25,6 +84,21 @@ class GenePool(metaclass=ABCMeta):
         """
         return [self.next_gene() for _ in range(0, count)]
 
+    def extract_packed(self, count, rng=None):
+        """
+        Creates the specified number of new genes, packed (as by
+        lang.pack_instruction()) into an array with one row per gene.
+
+        Implementations that can draw genes in bulk should override this
+        function.
+
+        :param count: The number of genes to extract from the pool.
+        :param rng: The NumPy random generator to use, if any.
+        :return: An array of packed genes.
+        """
+        return np.array([pack_instruction(ins) for ins in self.extract(count)],
+                        dtype=np.int32).reshape(-1, 6)
+
     @abstractmethod
     def next_gene(self):
         """
@@ -47,6 +121,11 @@ class RandomGenePool(GenePool):
         modifiers (list): The list of available instruction modifiers.
         opcodes (list): The list of available operation codes.
 
+    If a core size is specified then arguments are drawn from the core (by
+    default) and every gene is created in canonical form (see
+    Instruction.canonical()), so that behaviorally identical genes are equal
+    and hash identically.
+
     Initialization Arguments:
         allow_non_standard (bool): Allow operation codes that enable Redcode
         programs to read and write to the standard input and output,
@@ -54,16 +133,30 @@ class RandomGenePool(GenePool):
         allow_pspace (bool): Allow operation codes that enable Redcode
         programs to make use of the so-called P-space, a private memory space
         that is safe from attackers and persists between rounds.
+        core_size (int): The size of the core genes are generated for, if
+        any.
+    """
+
+    DEFAULT_ARG_RANGE = (0, 8000)
+    """
+    The default range of argument values when no core size is specified.
     """
 
     def __init__(self, opcodes=None, modifiers=None, addr_modes=None,
-                 arg_range=(0, 8000), allow_non_standard=False,
-                 allow_pspace=True):
+                 arg_range=None, allow_non_standard=False,
+                 allow_pspace=True, core_size=None):
         super().__init__()
         self.opcodes = opcodes if opcodes else list(OpCode)
         self.modifiers = modifiers if modifiers else list(Modifier)
         self.addr_modes = addr_modes if addr_modes else list(AddressMode)
-        self.arg_range = arg_range
+        self.core_size = core_size
+
+        if arg_range:
+            self.arg_range = arg_range
+        elif core_size:
+            self.arg_range = (0, core_size)
+        else:
+            self.arg_range = RandomGenePool.DEFAULT_ARG_RANGE
 
         if not allow_non_standard:
             if OpCode.Lds in self.opcodes:
@@ -77,11 +170,314 @@ class RandomGenePool(GenePool):
             if OpCode.Stp in self.opcodes:
                 self.opcodes.remove(OpCode.Stp)
 
+    def canonical_packed(self, fields):
+        return _canonical_fields(fields, self.core_size) if self.core_size \
+            else fields
+
+    def extract_packed(self, count, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+
+        def draw(choices, lookup):
+            return np.array([lookup.index(x) for x in choices],
+                            dtype=np.int32)[rng.integers(len(choices),
+                                                         size=count)]
+
+        low, high = self.arg_range
+        fields = np.empty((count, 6), dtype=np.int32)
+        fields[:, 0] = draw(self.opcodes, OPCODES)
+        fields[:, 1] = draw(self.modifiers, MODIFIERS)
+        fields[:, 2] = draw(self.addr_modes, ADDRESS_MODES)
+        fields[:, 3] = rng.integers(low, high, size=count)
+        fields[:, 4] = draw(self.addr_modes, ADDRESS_MODES)
+        fields[:, 5] = rng.integers(low, high, size=count)
+        return self.canonical_packed(fields)
+
     def next_gene(self):
-        return Instruction(choice(self.opcodes), choice(self.modifiers),
-                           Argument(choice(self.addr_modes),
-                                    randrange(self.arg_range[0],
-                                              self.arg_range[1])),
-                           Argument(choice(self.addr_modes),
-                                    randrange(self.arg_range[0],
-                                              self.arg_range[1])))
+        ins = Instruction(choice(self.opcodes), choice(self.modifiers),
+                          Argument(choice(self.addr_modes),
+                                   randrange(self.arg_range[0],
+                                             self.arg_range[1])),
+                          Argument(choice(self.addr_modes),
+                                   randrange(self.arg_range[0],
+                                             self.arg_range[1])))
+        return ins.canonical(self.core_size) if self.core_size else ins
+
+
+class AliasTable:
+    """
+    Represents a discrete probability distribution that can be sampled in
+    constant time using Walker's alias method.
+
+    The table is built in O(n) using Vose's construction: every outcome is
+    given one column, which holds its own probability (scaled by n) and, in
+    the remaining space, an alias to another outcome.  Sampling chooses a
+    column uniformly and then either the column's outcome or its alias.
+
+    Attributes:
+        alias (ndarray): The alias of each column.
+        probability (ndarray): The probability of choosing each column's own
+        outcome rather than its alias.
+    """
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) == 0 or weights.sum() <= 0 or (weights < 0).any():
+            raise ValueError("Weights must be non-negative with a positive "
+                             "sum.")
+
+        scaled = weights * len(weights) / weights.sum()
+        self.alias = np.arange(len(weights))
+        self.probability = np.ones(len(weights))
+
+        small = [x for x in range(len(weights)) if scaled[x] < 1.0]
+        large = [x for x in range(len(weights)) if scaled[x] >= 1.0]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def __len__(self):
+        return len(self.probability)
+
+    def sample(self):
+        """
+        Draws a single outcome from this distribution.
+
+        :return: The index of an outcome.
+        """
+        column = randrange(len(self.probability))
+        return column if random() < self.probability[column] else \
+            int(self.alias[column])
+
+    def sample_many(self, count, rng=None):
+        """
+        Draws the specified number of independent outcomes from this
+        distribution at once.
+
+        :param count: The number of outcomes to draw.
+        :param rng: The NumPy random generator to use, if any.
+        :return: An array of outcome indices.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        columns = rng.integers(len(self.probability), size=count)
+        return np.where(rng.random(count) < self.probability[columns],
+                        columns, self.alias[columns])
+
+
+class DistributionGenePool(GenePool):
+    """
+    Represents an implementation of GenePool that learns which genes to
+    create from the genomes that perform best (an estimation of
+    distribution algorithm).
+
+    Each field of an instruction (the operation code, the modifier, and the
+    addressing mode and value of each argument) is drawn independently from
+    its own categorical distribution over the choices of a base random gene
+    pool, initially uniform.  Each call to update() moves every distribution
+    towards the frequencies observed in the specified elite genomes by the
+    learning rate, as in population-based incremental learning, and a small
+    floor of the uniform distribution is mixed in so that no choice is ever
+    lost for good.  Distributions may optionally be kept separately for the
+    first few depths of a genome tree, the last of which is used for every
+    deeper node.  Sampling uses alias tables (see AliasTable), which are
+    rebuilt only after an update, so each field costs O(1) to draw.  In an
+    evolutionary run, the pool learns from the best archived genomes of
+    every generation (see HallOfFame).
+
+    Attributes:
+        base (RandomGenePool): The gene pool whose choices are learned over.
+        depths (int): The number of depths with their own distributions.
+        distributions (list): For each depth, the list of six probability
+        vectors, one per packed instruction field.
+        floor (float): The weight of the uniform distribution mixed into
+        every distribution when sampling.
+        learning_rate (float): How far each update moves the distributions.
+    """
+
+    DEFAULT_ELITES = 5
+    """
+    The default number of elite genomes learned from per generation.
+    """
+
+    DEFAULT_FLOOR = 0.05
+    """
+    The default weight of the uniform distribution when sampling.
+    """
+
+    DEFAULT_LEARNING_RATE = 0.1
+    """
+    The default fraction by which each update moves the distributions.
+    """
+
+    def __init__(self, base=None, depths=1, learning_rate=None, floor=None):
+        super().__init__()
+        self.base = base if base else RandomGenePool()
+        self.depths = max(1, depths)
+        self.floor = floor if floor is not None else \
+            DistributionGenePool.DEFAULT_FLOOR
+        self.learning_rate = learning_rate if learning_rate is not None else \
+            DistributionGenePool.DEFAULT_LEARNING_RATE
+
+        modes = np.array([ADDRESS_MODES.index(x)
+                          for x in self.base.addr_modes])
+        self._codes = [np.array([OPCODES.index(x)
+                                 for x in self.base.opcodes]),
+                       np.array([MODIFIERS.index(x)
+                                 for x in self.base.modifiers]),
+                       modes, None, modes, None]
+
+        width = self.base.arg_range[1] - self.base.arg_range[0]
+        sizes = [len(codes) if codes is not None else width
+                 for codes in self._codes]
+        self.distributions = [[np.full(size, 1.0 / size) for size in sizes]
+                              for _ in range(self.depths)]
+        self._tables = None
+
+    def canonical_packed(self, fields):
+        return self.base.canonical_packed(fields)
+
+    def extract_packed(self, count, rng=None, depths=None):
+        """
+        Creates the specified number of new genes, packed (as by
+        lang.pack_instruction()) into an array with one row per gene.
+
+        :param count: The number of genes to extract from the pool.
+        :param rng: The NumPy random generator to use, if any.
+        :param depths: The tree depth of each gene, if known.
+        :return: An array of packed genes.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        depths = np.minimum(np.asarray(depths), self.depths - 1) \
+            if depths is not None else np.zeros(count, dtype=np.int64)
+        fields = np.empty((count, 6), dtype=np.int32)
+
+        for depth, tables in enumerate(self.get_tables()):
+            rows = np.flatnonzero(depths == depth)
+            for column, table in enumerate(tables):
+                fields[rows, column] = self._decode(
+                    column, table.sample_many(len(rows), rng))
+        return self.canonical_packed(fields)
+
+    def get_tables(self):
+        """
+        Returns the alias tables used for sampling, building them from the
+        current distributions (mixed with the floor) if necessary.
+
+        :return: For each depth, the list of six alias tables.
+        """
+        if self._tables is None:
+            self._tables = [[AliasTable((1 - self.floor) * probabilities +
+                                        self.floor / len(probabilities))
+                             for probabilities in distributions]
+                            for distributions in self.distributions]
+        return self._tables
+
+    def next_gene(self, depth=0):
+        """
+        Creates and returns a new random gene for a node at the specified
+        depth.
+
+        :param depth: The depth of the node the gene is for.
+        :return: A new random gene.
+        """
+        tables = self.get_tables()[min(depth, self.depths - 1)]
+        fields = [int(self._decode(column, table.sample()))
+                  for column, table in enumerate(tables)]
+
+        ins = Instruction(OPCODES[fields[0]], MODIFIERS[fields[1]],
+                          Argument(ADDRESS_MODES[fields[2]], fields[3]),
+                          Argument(ADDRESS_MODES[fields[4]], fields[5]))
+        return ins.canonical(self.base.core_size) if self.base.core_size \
+            else ins
+
+    def update(self, elite):
+        """
+        Moves the distributions of this gene pool towards the frequencies
+        of the fields of every chromosome of the specified genomes.
+
+        :param elite: The list of genomes to learn from.
+        """
+        fields, depths = [], []
+        for genome in elite:
+            level = [genome.root] if not genome.is_empty() else []
+            depth = 0
+            while level:
+                fields.extend(pack_instruction(node.item.ins)
+                              for node in level)
+                depths.extend([depth] * len(level))
+                level = [child for node in level
+                         for child in (node.left, node.right)
+                         if child is not None]
+                depth += 1
+
+        self.update_packed(np.array(fields, dtype=np.int64).reshape(-1, 6),
+                           depths)
+
+    def update_packed(self, fields, depths=None):
+        """
+        Moves the distributions of this gene pool towards the frequencies
+        of the specified packed instructions.
+
+        Fields outside the choices of the base gene pool are ignored.
+
+        :param fields: The array of packed instructions, one per row.
+        :param depths: The tree depth of each instruction, if known.
+        """
+        if len(fields) == 0:
+            return
+
+        depths = np.minimum(np.asarray(depths), self.depths - 1) \
+            if depths is not None else np.zeros(len(fields), dtype=np.int64)
+
+        for depth, distributions in enumerate(self.distributions):
+            rows = fields[depths == depth]
+            if len(rows) == 0:
+                continue
+
+            for column, probabilities in enumerate(distributions):
+                categories = self._encode(column, rows[:, column])
+                counts = np.bincount(categories[categories >= 0],
+                                     minlength=len(probabilities))
+                if counts.sum() > 0:
+                    probabilities *= 1 - self.learning_rate
+                    probabilities += self.learning_rate * counts / \
+                        counts.sum()
+        self._tables = None
+
+    def _decode(self, column, categories):
+        """
+        Converts categories of the specified packed field to field values.
+
+        :param column: The index of the packed field.
+        :param categories: The categories to convert.
+        :return: The field values.
+        """
+        if self._codes[column] is None:
+            return categories + self.base.arg_range[0]
+        return self._codes[column][categories]
+
+    def _encode(self, column, values):
+        """
+        Converts values of the specified packed field to categories, using
+        -1 for any value that is not a choice of the base gene pool.
+
+        :param column: The index of the packed field.
+        :param values: The field values to convert.
+        :return: An array of categories.
+        """
+        low, high = self.base.arg_range
+        if self._codes[column] is None:
+            return np.where((values >= low) & (values < high), values - low,
+                            -1)
+
+        lookup = np.full(max(len(OPCODES), len(MODIFIERS),
+                             len(ADDRESS_MODES)), -1)
+        lookup[self._codes[column]] = np.arange(len(self._codes[column]))
+        return lookup[values]
@@ -3,7 +3,59 @@ Contains all the classes and functions that comprise the conceptual model for
 this project.
 """
 from evored.fitness import Fitnessable
-from evored.tree import Tree, _copy_tree
+from evored.fitness.writing import render_warrior
+from evored.tree import PersistentTree, Tree, _copy_tree
+
+
+def _signature(genome, core_size=None):
+    """
+    Creates a list that describes both the shape and the instructions of the
+    specified genome, ignoring all fitness scores.
+
+    :param genome: The genome to describe.
+    :param core_size: The size of the core to describe instructions in
+    canonical form for, if any.
+    :return: A list of instructions and child flags in breadth-first order.
+    """
+    return [(node.item.ins.canonical(core_size) if core_size else
+             node.item.ins, node.has_left(), node.has_right())
+            for node in genome]
+
+
+def deduplicate(genomes, core_size=None):
+    """
+    Removes every genome from the specified list that has the same shape and
+    instructions as one before it, regardless of fitness.
+
+    Genomes are grouped by their cached structural hashes, so only genomes
+    with equal hashes (in practice, duplicates) are ever compared in full.
+    If a core size is specified, instructions are instead compared in
+    canonical form (see Instruction.canonical()), so that genomes that only
+    differ in behaviorally identical instructions are duplicates as well;
+    this requires every genome to be described and hashed in full.
+
+    :param genomes: The list of genomes to deduplicate.
+    :param core_size: The size of the core to compare instructions for, if
+    any.
+    :return: A new list of distinct genomes, in their original order.
+    """
+    seen = {}
+    distinct = []
+
+    for genome in genomes:
+        signature = _signature(genome, core_size) if core_size else None
+        key = hash(tuple(signature)) if core_size else hash(genome)
+
+        candidates = seen.setdefault(key, [])
+        if candidates:
+            signature = signature or _signature(genome)
+            if any(signature == _signature(c, core_size)
+                   for c in candidates):
+                continue
+
+        candidates.append(genome)
+        distinct.append(genome)
+    return distinct
 
 
 class Chromosome(Fitnessable):
@@ -11,6 +63,8 @@ class Chromosome(Fitnessable):
     Represents a single Redcode instruction in a probabilistic syntax tree.
     """
 
+    __slots__ = ("ins",)
+
     def __init__(self, ins, fitness=0):
         super().__init__(fitness)
         self.ins = ins
@@ -24,7 +78,7 @@ class Chromosome(Fitnessable):
         return NotImplemented
 
     def __hash__(self):
-        return hash((self.fitness, self.ins))
+        return hash(self.ins)
 
     def __ne__(self, other):
         return not self == other
@@ -44,6 +98,8 @@ class Warrior(Fitnessable):
     warriors using a Core Wars simulator, in this case the PMARS program.
     """
 
+    __slots__ = ("ins_list",)
+
     def __init__(self, ins_list, fitness=0):
         super().__init__(fitness)
         self.ins_list = ins_list
@@ -58,7 +114,7 @@ class Warrior(Fitnessable):
         return NotImplemented
 
     def __hash__(self):
-        return hash((self.fitness, self.ins_list))
+        return hash(tuple(self.ins_list))
 
     def __ne__(self, other):
         return not self == other
@@ -66,6 +122,21 @@ class Warrior(Fitnessable):
     def __str__(self):
         return "\n".join(map(str, self.ins_list))
 
+    def canonical(self, core_size):
+        """
+        Creates a copy of this warrior whose instructions are in canonical
+        form for a core of the specified size (see Instruction.canonical()).
+
+        Canonical warriors are used wherever warriors are hashed to share
+        scores (see ExpectedFitnessEvaluator), so that warriors that only
+        differ in behaviorally identical instructions are scored once.
+
+        :param core_size: The size of the core.
+        :return: A new warrior.
+        """
+        return Warrior([ins.canonical(core_size) for ins in self.ins_list],
+                       self.fitness)
+
     def write(self, filename):
         """
         Converts this warrior to a valid Redcode source file with the
@@ -74,32 +145,75 @@ class Warrior(Fitnessable):
         :param filename: The name of the source file to create.
         """
         with open(filename, "w+") as f:
-            f.write(";redcode-94\n")
-            f.write(";name %s\n" % filename)
-            f.write(";author Evo-Red automatic generation\n")
-            f.write("%s\n" % str(self))
+            f.write(render_warrior(self, filename))
+
+
+class Lineage:
+    """
+    Represents the parentage of a genome created by crossover, which allows
+    its fitness to be estimated from that of its parents.
+
+    Attributes:
+        fraction (float): The fraction of the genome's chromosomes that came
+        from the first parent.
+        parents (tuple): The structural hashes of both parents, the parent
+        the genome was derived from first.
+        scores (tuple): The fitness of each parent when they were crossed.
+    """
+
+    __slots__ = ("fraction", "parents", "scores")
+
+    def __init__(self, parents, scores, fraction):
+        self.fraction = fraction
+        self.parents = parents
+        self.scores = scores
+
+    def __repr__(self):
+        return repr((self.parents, self.scores, self.fraction))
+
+    def estimate(self):
+        """
+        Estimates the fitness of the genome as the mean fitness of its
+        parents, weighted by the fraction of chromosomes taken from each.
+
+        :return: An estimated fitness.
+        """
+        return self.fraction * self.scores[0] + \
+            (1 - self.fraction) * self.scores[1]
 
 
 class Genome(Fitnessable, Tree):
     """
     Represents a probabilistic syntax tree whose nodes are comprised of
     singular Redcode instructions.
+
+    Genomes hash by structure and instructions alone, so that the hash of a
+    genome is unaffected by changes to its fitness (or that of its
+    chromosomes) and genomes may be kept in sets while they are scored.
+
+    Attributes:
+        lineage (Lineage): The parentage of this genome if it was created by
+        crossover since it was last evaluated, otherwise None.
     """
 
     def __init__(self, chromosomes=None, fitness=0):
         Fitnessable.__init__(self, fitness)
         Tree.__init__(self, chromosomes)
+        self.lineage = None
 
     def __copy__(self):
-        return _copy_tree(self, Genome(fitness=self.fitness))
+        genome = _copy_tree(self, Genome())
+        genome.copy_score(self)
+        genome.lineage = self.lineage
+        return genome
 
     def __eq__(self, other):
         if isinstance(other, Genome):
             return Fitnessable.__eq__(self, other) and Tree.__eq__(self, other)
         return NotImplemented
 
-    def hash(self):
-        return hash((Fitnessable.__hash__(self), Tree.__hash__(self)))
+    def __hash__(self):
+        return Tree.__hash__(self)
 
     def __ne__(self, other):
         return not self == other
@@ -110,3 +224,99 @@ class Genome(Fitnessable, Tree):
     def __str__(self):
         return "(" + Fitnessable.__str__(self) + ", " + \
                Tree.__str__(self) + ")"
+
+    def realize(self):
+        """
+        Creates a warrior from the instructions of a single random walk of
+        this genome.
+
+        :return: A new warrior.
+        """
+        return Warrior([chromosome.ins for chromosome in self.random_walk()])
+
+
+class PersistentGenome(Fitnessable, PersistentTree):
+    """
+    Represents an immutable probabilistic syntax tree whose nodes are
+    comprised of singular Redcode instructions.
+
+    Copying a persistent genome is O(1) and shares every node, while
+    crossover and mutation create new versions that share all unchanged
+    subtrees with their parents (see PersistentTree).  Chromosomes are
+    shared between versions as well, so they must be replaced rather than
+    rescored in place.
+
+    Attributes:
+        lineage (Lineage): The parentage of this genome if it was created by
+        crossover since it was last evaluated, otherwise None.
+    """
+
+    def __init__(self, chromosomes=None, fitness=0, root=None):
+        Fitnessable.__init__(self, fitness)
+        PersistentTree.__init__(self, chromosomes, root)
+        self.lineage = None
+
+    def __copy__(self):
+        return self.derive(self.root)
+
+    def __eq__(self, other):
+        if isinstance(other, (Genome, PersistentGenome)):
+            return Fitnessable.__eq__(self, other) and \
+                   PersistentTree.__eq__(self, other)
+        return NotImplemented
+
+    def __hash__(self):
+        return PersistentTree.__hash__(self)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return repr((Fitnessable.__repr__(self), PersistentTree.__str__(self)))
+
+    def __str__(self):
+        return "(" + Fitnessable.__str__(self) + ", " + \
+               PersistentTree.__str__(self) + ")"
+
+    @staticmethod
+    def freeze(genome):
+        """
+        Creates a persistent copy of the specified mutable genome, including
+        its fitness.
+
+        :param genome: The genome to copy.
+        :return: A new persistent genome.
+        """
+        frozen = PersistentGenome(root=PersistentTree.freeze_nodes(
+            genome.root))
+        frozen.copy_score(genome)
+        frozen.lineage = genome.lineage
+        return frozen
+
+    def derive(self, root):
+        genome = PersistentGenome(root=root)
+        genome.copy_score(self)
+        genome.lineage = self.lineage
+        return genome
+
+    def realize(self):
+        """
+        Creates a warrior from the instructions of a single random walk of
+        this genome.
+
+        :return: A new warrior.
+        """
+        return Warrior([chromosome.ins for chromosome in self.random_walk()])
+
+    def thaw(self, tree=None):
+        """
+        Creates a mutable copy of this genome, including its fitness.
+
+        :param tree: The empty genome to copy to, if any.
+        :return: A new genome.
+        """
+        genome = PersistentTree.thaw(self, tree if tree is not None else
+                                     Genome())
+        genome.copy_score(self)
+        genome.lineage = self.lineage
+        return genome
@@ -2,6 +2,7 @@
 Contains all classes and functions necessary to describe the Redcode language
 per the 1994 standard.
 """
+import weakref
 from enum import unique, Enum
 
 
@@ -120,14 +121,20 @@ class Modifier(Enum):
 class Argument:
     """
     Represents a single argument to an instruction in Redcode.
+
+    Arguments are immutable, which allows them to be shared freely and their
+    hashes to be computed once.
     """
 
+    __slots__ = ("addr_mode", "value", "_hash")
+
     def __init__(self, addr_mode=AddressMode.Direct, value=0):
-        self.addr_mode = addr_mode
-        self.value = value
+        object.__setattr__(self, "addr_mode", addr_mode)
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "_hash", hash((addr_mode, value)))
 
     def __copy__(self):
-        return Argument(self.addr_mode, self.value)
+        return self
 
     def __eq__(self, other):
         if isinstance(other, Argument):
@@ -136,7 +143,13 @@ class Argument:
         return NotImplemented
 
     def __hash__(self):
-        return hash((self.addr_mode, self.value))
+        return self._hash
+
+    def __reduce__(self):
+        return Argument, (self.addr_mode, self.value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Arguments cannot be modified.")
 
     def __ne__(self, other):
         return not self == other
@@ -144,6 +157,22 @@ class Argument:
     def __str__(self):
         return "%s%i" % (self.addr_mode.value, self.value)
 
+    def canonical(self, core_size):
+        """
+        Creates the canonical form of this argument for a core of the
+        specified size, in which the value lies within [0, core_size).
+
+        Since all addresses in Redcode are taken modulo the size of the core,
+        values that differ by a multiple of the core size are identical.
+
+        :param core_size: The size of the core.
+        :return: The canonical form of this argument.
+        """
+        value = self.value % core_size
+        if value == self.value:
+            return self
+        return Argument(self.addr_mode, value)
+
 
 @unique
 class OpCode(Enum):
@@ -291,33 +320,197 @@ class Instruction:
     to its value even if the operation code does not make use of it.  This
     has important implications for argument mutation as well as overall
     program construction.
+
+    Instructions are immutable and their hashes are computed once.  Since
+    populations contain many equal instructions, they may also be interned
+    (see intern_instruction()) so that equal instructions share one object.
     """
 
+    __slots__ = ("opcode", "modifier", "arg_a", "arg_b", "_hash",
+                 "__weakref__")
+
     def __init__(self, opcode, modifier, arg_a, arg_b):
-        self.opcode = opcode
-        self.modifier = modifier
-        self.arg_a = arg_a
-        self.arg_b = arg_b
+        object.__setattr__(self, "opcode", opcode)
+        object.__setattr__(self, "modifier", modifier)
+        object.__setattr__(self, "arg_a", arg_a)
+        object.__setattr__(self, "arg_b", arg_b)
+        object.__setattr__(self, "_hash",
+                           hash((opcode, modifier, arg_a, arg_b)))
 
     def __copy__(self):
-        return Instruction(self.opcode, self.modifier, self.arg_a, self.arg_b)
+        return self
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, Instruction):
-            return self.opcode == other.opcode and \
-                   self.modifier == other.modifier and \
+            return self._hash == other._hash and \
+                self.opcode == other.opcode and \
+                self.modifier == other.modifier and \
                 self.arg_a == other.arg_a and self.arg_b == other.arg_b
         return NotImplemented
 
     def __hash__(self):
-        return hash((self.opcode, self.modifier, self.arg_a, self.arg_b))
+        return self._hash
+
+    def __reduce__(self):
+        return _restore_instruction, (self.opcode, self.modifier, self.arg_a,
+                                      self.arg_b)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Instructions cannot be modified.")
 
     def __ne__(self, other):
         return not self == other
 
     def __str__(self):
         ins_str = self.opcode.value
-        if self.modifier:
+        if self.modifier and self.modifier is not Modifier.Empty:
             ins_str += ".%s" % self.modifier.value
         ins_str += " %s %s " % (self.arg_a, self.arg_b)
         return ins_str
+
+    def canonical(self, core_size):
+        """
+        Creates the canonical form of this instruction for a core of the
+        specified size.
+
+        In canonical form both argument values are reduced modulo the core
+        size, an empty modifier is replaced by the modifier that the 1994
+        standard implies for the operation code and addressing modes, and the
+        modifier of an operation code that ignores its modifier when executed
+        (see IGNORED_MODIFIER_OPCODES) is replaced by its default.  Warriors
+        whose instructions only differ in these ways behave identically
+        unless an opponent inspects them as data.  Addressing modes are
+        kept as they are, since every mode of an operand is evaluated (and
+        may increment or decrement memory) regardless of operation code.
+
+        :param core_size: The size of the core.
+        :return: The canonical form of this instruction.
+        """
+        modifier = self.modifier
+        if modifier is Modifier.Empty or modifier is None or \
+                self.opcode in IGNORED_MODIFIER_OPCODES:
+            modifier = default_modifier(self.opcode, self.arg_a.addr_mode,
+                                        self.arg_b.addr_mode)
+
+        arg_a = self.arg_a.canonical(core_size)
+        arg_b = self.arg_b.canonical(core_size)
+
+        if modifier is self.modifier and arg_a is self.arg_a and \
+                arg_b is self.arg_b:
+            return self
+        return Instruction(self.opcode, modifier, arg_a, arg_b)
+
+
+IGNORED_MODIFIER_OPCODES = {OpCode.Dat, OpCode.Jmp, OpCode.Nop, OpCode.Spl}
+"""
+The operation codes whose behavior, when executed, does not depend on their
+modifier.
+"""
+
+
+_INSTRUCTIONS = weakref.WeakValueDictionary()
+
+
+def intern_instruction(ins):
+    """
+    Returns the shared instance of the specified instruction, registering it
+    as that instance if there is none.
+
+    Shared instances are only kept for as long as something else refers to
+    them, so interning never prevents an instruction from being collected.
+
+    :param ins: The instruction to intern.
+    :return: An equal, shared instruction.
+    """
+    return _INSTRUCTIONS.setdefault((ins.opcode, ins.modifier, ins.arg_a,
+                                     ins.arg_b), ins)
+
+
+def _restore_instruction(opcode, modifier, arg_a, arg_b):
+    """
+    Recreates an unpickled instruction, interning it in this process.
+
+    :param opcode: The operation code of the instruction.
+    :param modifier: The modifier of the instruction.
+    :param arg_a: The A-field argument.
+    :param arg_b: The B-field argument.
+    :return: An interned instruction.
+    """
+    return intern_instruction(Instruction(opcode, modifier, arg_a, arg_b))
+
+
+def default_modifier(opcode, mode_a, mode_b):
+    """
+    Determines the modifier that the 1994 standard implies for an instruction
+    with the specified operation code and addressing modes that has none.
+
+    :param opcode: The operation code of the instruction.
+    :param mode_a: The addressing mode of the A-field.
+    :param mode_b: The addressing mode of the B-field.
+    :return: The implied modifier.
+    """
+    if opcode in (OpCode.Dat, OpCode.Nop):
+        return Modifier.F
+    elif opcode in (OpCode.Mov, OpCode.Seq, OpCode.Sne):
+        if mode_a is AddressMode.Immediate:
+            return Modifier.AB
+        return Modifier.B if mode_b is AddressMode.Immediate else Modifier.I
+    elif opcode in (OpCode.Add, OpCode.Sub, OpCode.Mul, OpCode.Div,
+                    OpCode.Mod):
+        if mode_a is AddressMode.Immediate:
+            return Modifier.AB
+        return Modifier.B if mode_b is AddressMode.Immediate else Modifier.F
+    elif opcode in (OpCode.Slt, OpCode.Ldp, OpCode.Stp):
+        return Modifier.AB if mode_a is AddressMode.Immediate else Modifier.B
+    return Modifier.B
+
+
+ADDRESS_MODES = list(AddressMode)
+"""
+The list of all addressing modes, in the order used for packing.
+"""
+
+MODIFIERS = list(Modifier)
+"""
+The list of all modifiers, in the order used for packing.
+"""
+
+OPCODES = list(OpCode)
+"""
+The list of all operation codes, in the order used for packing.
+"""
+
+_ADDRESS_MODE_INDEX = {mode: index for index, mode in enumerate(ADDRESS_MODES)}
+_MODIFIER_INDEX = {modifier: index for index, modifier in enumerate(MODIFIERS)}
+_OPCODE_INDEX = {opcode: index for index, opcode in enumerate(OPCODES)}
+
+
+def pack_instruction(ins):
+    """
+    Converts the specified instruction to a tuple of six integers: the
+    indices of its operation code, modifier, and A-field addressing mode, its
+    A-field value, and the index of its B-field addressing mode and its
+    B-field value.
+
+    :param ins: The instruction to pack.
+    :return: A tuple of integers.
+    """
+    return (_OPCODE_INDEX[ins.opcode], _MODIFIER_INDEX[ins.modifier],
+            _ADDRESS_MODE_INDEX[ins.arg_a.addr_mode], ins.arg_a.value,
+            _ADDRESS_MODE_INDEX[ins.arg_b.addr_mode], ins.arg_b.value)
+
+
+def unpack_instruction(fields):
+    """
+    Converts the specified six integers, as created by pack_instruction(),
+    back to an instruction.
+
+    :param fields: The sequence of integers to unpack.
+    :return: An interned instruction.
+    """
+    return intern_instruction(
+        Instruction(OPCODES[fields[0]], MODIFIERS[fields[1]],
+                    Argument(ADDRESS_MODES[fields[2]], fields[3]),
+                    Argument(ADDRESS_MODES[fields[4]], fields[5])))
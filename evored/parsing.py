@@ -0,0 +1,616 @@
+"""
+Contains all classes and functions necessary to read Redcode source into
+instructions.
+"""
+import hashlib
+import os
+import pickle
+import re
+from itertools import cycle, islice
+
+from evored.genome import Chromosome, Genome
+from evored.lang import OpCode, Modifier, AddressMode, Instruction, \
+    Argument, intern_instruction, pack_instruction, unpack_instruction
+from evored.tree import Node
+
+OPCODE_ALIASES = {"CMP": OpCode.Seq}
+"""
+Operation codes that are accepted as synonyms of others.
+"""
+
+PSEUDO_OPCODES = {"END", "ORG", "PIN"}
+"""
+Assembler directives that do not produce an instruction.
+"""
+
+UNSUPPORTED_OPCODES = {"FOR", "ROF"}
+"""
+Assembler directives that cannot be handled by this parser.
+"""
+
+_ADDRESS_MODES = {mode.value: mode for mode in AddressMode}
+_MODIFIERS = {modifier.name: modifier for modifier in Modifier
+              if modifier is not Modifier.Empty}
+_OPCODES = {opcode.value: opcode for opcode in OpCode}
+_TOKEN = re.compile(r"\s*(?:(\d+)|([A-Za-z_]\w*)|(.))")
+
+
+class ParsingException(Exception):
+    """
+    Represents an exception that is thrown when Redcode source cannot be
+    parsed.
+    """
+
+    pass
+
+
+class ParseCache:
+    """
+    Represents a store of previously parsed Redcode source, keyed by the
+    SHA-256 digest of the source itself.
+
+    Since the key is derived from content rather than location, renamed or
+    duplicated files are only ever parsed once.  Instructions are kept in
+    packed form (see lang.pack_instruction()) and the cache may optionally be
+    saved to, and restored from, a file so that it persists between runs.
+
+    Attributes:
+        entries (dict): The packed instructions of each source, keyed by
+        digest.
+        path (str): The file to persist this cache to, if any.
+    """
+
+    def __init__(self, path=None):
+        self.entries = {}
+        self.path = path
+
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                self.entries = pickle.load(f)
+
+    def __contains__(self, digest):
+        return digest in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, digest):
+        """
+        Returns the instructions parsed from the source with the specified
+        digest.
+
+        :param digest: The digest of the source.
+        :return: A list of instructions, or None if the source is unknown.
+        """
+        packed = self.entries.get(digest)
+        if packed is None:
+            return None
+        return [unpack_instruction(fields) for fields in packed]
+
+    def put(self, digest, instructions):
+        """
+        Stores the specified instructions as those parsed from the source
+        with the specified digest.
+
+        :param digest: The digest of the source.
+        :param instructions: The list of parsed instructions.
+        """
+        self.put_packed(digest, [pack_instruction(ins)
+                                 for ins in instructions])
+
+    def put_packed(self, digest, packed):
+        """
+        Stores the specified packed instructions as those parsed from the
+        source with the specified digest.
+
+        :param digest: The digest of the source.
+        :param packed: The list of packed instructions.
+        """
+        self.entries[digest] = tuple(packed)
+
+    def save(self):
+        """
+        Writes this cache to its file, if it has one.
+        """
+        if self.path is not None:
+            with open(self.path, "wb") as f:
+                pickle.dump(self.entries, f)
+
+
+def digest_source(source):
+    """
+    Computes the content hash of the specified Redcode source.
+
+    :param source: The source, as either text or bytes.
+    :return: A SHA-256 hex digest.
+    """
+    if isinstance(source, str):
+        source = source.encode()
+    return hashlib.sha256(source).hexdigest()
+
+
+def evaluate_expression(text, symbols=None):
+    """
+    Computes the value of the specified Redcode operand expression.
+
+    Expressions are made of integers, symbols, the binary operators +, -, *,
+    / and % (with the usual precedence and integer division), unary + and -,
+    and parentheses.
+
+    :param text: The expression to evaluate.
+    :param symbols: A dictionary of symbol names to values.
+    :return: The integer value of an expression.
+    :raise ParsingException: If the expression is malformed or uses an
+    unknown symbol.
+    """
+    tokens = []
+    for number, name, other in _TOKEN.findall(text.strip()):
+        if number:
+            tokens.append(int(number))
+        elif name:
+            key = name.upper()
+            if symbols is None or key not in symbols:
+                raise ParsingException("Unknown symbol: %s" % name)
+            tokens.append(symbols[key])
+        elif other.strip():
+            tokens.append(other)
+
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def factor():
+        token = take() if peek() is not None else None
+        if token == "-":
+            return -factor()
+        elif token == "+":
+            return factor()
+        elif token == "(":
+            value = expression()
+            if peek() != ")":
+                raise ParsingException("Unbalanced parentheses: %s" % text)
+            take()
+            return value
+        elif isinstance(token, int):
+            return token
+        raise ParsingException("Invalid expression: %s" % text)
+
+    def term():
+        value = factor()
+        while peek() in ("*", "/", "%"):
+            operator, other = take(), factor()
+            if operator != "*" and other == 0:
+                raise ParsingException("Division by zero: %s" % text)
+            if operator == "*":
+                value *= other
+            elif operator == "/":
+                value = int(value / other)
+            else:
+                value = value - other * int(value / other)
+        return value
+
+    def expression():
+        value = term()
+        while peek() in ("+", "-"):
+            value = value + term() if take() == "+" else value - term()
+        return value
+
+    result = expression()
+    if position != len(tokens):
+        raise ParsingException("Invalid expression: %s" % text)
+    return result
+
+
+def iter_instructions(lines):
+    """
+    Converts the specified lines of a load-format Redcode file to
+    instructions one at a time, stopping at the END directive if one is
+    present.
+
+    Since no state is kept between lines, arbitrarily long streams of source
+    may be read without holding them in memory.  For the same reason, the
+    instructions cannot be reordered to begin at a start offset other than
+    zero (see parse_load_file()).
+
+    :param lines: An iterable of lines to parse.
+    :return: A generator of instructions.
+    :raise ParsingException: If a line cannot be parsed or specifies a
+    non-zero start offset.
+    """
+    for line in lines:
+        code = line.split(";", 1)[0].strip().upper()
+        name, _, start = code.replace("\t", " ").partition(" ")
+        if name in ("END", "ORG") and start.strip() and \
+                evaluate_expression(start) != 0:
+            raise ParsingException("Cannot stream a non-zero start: %s" %
+                                   code)
+        elif name == "END":
+            return
+
+        ins = parse_instruction(line)
+        if ins is not None:
+            yield ins
+
+
+def load_directory(directory, pool=None, cache=None, extension=".red"):
+    """
+    Parses every Redcode file with the specified extension in the specified
+    directory (and its subdirectories).
+
+    Each file is read and hashed once.  Files whose digest is already in the
+    specified cache are not parsed again; the rest are parsed by the
+    specified process pool (or in this process if there is none) and the
+    results added to the cache.  Files that cannot be parsed are reported
+    rather than aborting the load.
+
+    :param directory: The directory to search.
+    :param pool: The process pool to parse with, if any.
+    :param cache: The cache of previously parsed sources, if any.
+    :param extension: The file extension of Redcode source files.
+    :return: A dictionary of paths to instruction lists, and a dictionary of
+    paths to error messages for files that could not be parsed.
+    """
+    cache = cache if cache is not None else ParseCache()
+    digests = {}
+    pending = {}
+
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            if not name.lower().endswith(extension):
+                continue
+
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                source = f.read()
+
+            digest = digest_source(source)
+            digests[path] = digest
+            if digest not in cache and digest not in pending:
+                pending[digest] = source.decode(errors="replace")
+
+    keys = list(pending)
+    sources = [pending[key] for key in keys]
+    results = pool.map(_parse_packed, sources) if pool is not None else \
+        map(_parse_packed, sources)
+    errors = {}
+
+    for digest, (packed, error) in zip(keys, results):
+        if error is None:
+            cache.put_packed(digest, packed)
+        else:
+            errors[digest] = error
+
+    parsed = {}
+    failed = {}
+
+    for path, digest in sorted(digests.items()):
+        if digest in errors:
+            failed[path] = errors[digest]
+        else:
+            parsed[path] = cache.get(digest)
+    return parsed, failed
+
+
+def parse_argument(text, symbols=None):
+    """
+    Converts the specified operand text (an optional addressing mode followed
+    by an integer or expression) to an argument.
+
+    :param text: The operand to parse.
+    :param symbols: A dictionary of symbol names to values, if any.
+    :return: A new argument.
+    :raise ParsingException: If the operand is not a valid number or
+    expression.
+    """
+    text = text.strip()
+    mode = AddressMode.Direct
+
+    if text and text[0] in _ADDRESS_MODES:
+        mode = _ADDRESS_MODES[text[0]]
+        text = text[1:].strip()
+
+    try:
+        return Argument(mode, int(text))
+    except ValueError:
+        pass
+
+    if not text:
+        raise ParsingException("Missing operand value.")
+    return Argument(mode, evaluate_expression(text, symbols))
+
+
+def parse_assembly(lines):
+    """
+    Converts the specified lines of a simple Redcode assembly file to a list
+    of instructions.
+
+    In addition to load format, labels (with or without a trailing colon)
+    may precede any instruction and be used within operand expressions,
+    where they evaluate to their offset from the current instruction, and
+    EQU may be used to define constants.  Unlike a full assembler, EQU
+    values are evaluated once as numbers rather than substituted as text,
+    and macros (FOR and ROF) are not supported.  Since labels may be used
+    before they are defined, all of the lines are read before any are
+    parsed.
+
+    Since warriors are always executed from their first instruction, a start
+    offset given by ORG or END (the latter taking precedence) is honored by
+    rotating the instructions to begin at it (see rotate_instructions()).
+
+    :param lines: An iterable of lines to parse.
+    :return: A list of instructions.
+    :raise ParsingException: If a line cannot be parsed.
+    """
+    constants = {}
+    labels = {}
+    pending = []
+    start = None
+    statements = []
+
+    for line in lines:
+        code = line.split(";", 1)[0].strip()
+        if not code:
+            continue
+
+        parts = code.split(None, 1)
+        while parts and _is_label(parts[0]):
+            pending.append(parts[0].rstrip(":").upper())
+            parts = parts[1].split(None, 1) if len(parts) > 1 else []
+
+        if not parts:
+            continue
+
+        name = parts[0].upper().partition(".")[0]
+        rest = parts[1] if len(parts) > 1 else ""
+
+        if name == "EQU":
+            if len(pending) != 1:
+                raise ParsingException("EQU requires exactly one label: %s" %
+                                       code)
+            constants[pending.pop()] = evaluate_expression(
+                rest, dict(constants))
+            continue
+        elif name in UNSUPPORTED_OPCODES:
+            raise ParsingException("Unsupported directive: %s" % name)
+        elif name == "END":
+            start = rest if rest.strip() else start
+            break
+
+        for label in pending:
+            labels[label] = len(statements)
+        pending = []
+
+        if name == "ORG":
+            start = rest
+        elif name not in PSEUDO_OPCODES:
+            statements.append(" ".join(parts))
+
+    instructions = []
+    for address, code in enumerate(statements):
+        symbols = dict(constants)
+        symbols.update((label, offset - address)
+                       for label, offset in labels.items())
+        instructions.append(parse_instruction(code, symbols))
+
+    if start is None or not instructions:
+        return instructions
+
+    symbols = dict(constants)
+    symbols.update(labels)
+    offset = evaluate_expression(start, symbols)
+    if not 0 <= offset < len(instructions):
+        raise ParsingException("Start is outside of the warrior: %s" % start)
+    return rotate_instructions(instructions, offset)
+
+
+def parse_file(path):
+    """
+    Reads and parses the Redcode assembly (or load-format) file at the
+    specified path.
+
+    :param path: The path to the source file.
+    :return: A list of instructions.
+    :raise ParsingException: If the file cannot be parsed.
+    """
+    with open(path, "r") as f:
+        return parse_assembly(f)
+
+
+def parse_instruction(line, symbols=None):
+    """
+    Converts the specified line of load-format Redcode to an instruction.
+
+    Lines that are blank, contain only a comment, or contain an assembler
+    directive produce nothing.  Operands may be separated by either a comma
+    or whitespace.  An instruction with only one operand receives a B-field
+    of $0, except for DAT whose single operand is its B-field (per the 1994
+    standard).
+
+    :param line: The line to parse.
+    :param symbols: A dictionary of symbol names to values that may be used
+    in operands, if any.
+    :return: A new instruction, or None if the line has no instruction.
+    :raise ParsingException: If the line cannot be parsed.
+    """
+    code = line.split(";", 1)[0].strip()
+    if not code:
+        return None
+
+    parts = code.split(None, 1)
+    name, _, modifier = parts[0].upper().partition(".")
+
+    if name in PSEUDO_OPCODES:
+        return None
+
+    opcode = OPCODE_ALIASES.get(name, _OPCODES.get(name))
+    if opcode is None:
+        raise ParsingException("Unknown operation code: %s" % name)
+
+    if modifier and modifier not in _MODIFIERS:
+        raise ParsingException("Unknown modifier: %s" % modifier)
+
+    operands = parts[1] if len(parts) > 1 else ""
+    if "," in operands:
+        operands = operands.split(",")
+    else:
+        operands = _split_operands(operands)
+
+    if len(operands) > 2:
+        raise ParsingException("Too many operands: %s" % code)
+
+    arguments = [parse_argument(x, symbols) for x in operands if x.strip()]
+    if not arguments:
+        raise ParsingException("Missing operands: %s" % code)
+    elif len(arguments) == 1 and opcode is OpCode.Dat:
+        arguments.insert(0, Argument(AddressMode.Immediate, 0))
+    elif len(arguments) == 1:
+        arguments.append(Argument(AddressMode.Direct, 0))
+
+    return intern_instruction(
+        Instruction(opcode, _MODIFIERS[modifier] if modifier else
+                    Modifier.Empty, arguments[0], arguments[1]))
+
+
+def parse_load_file(lines):
+    """
+    Converts the specified lines of a load-format Redcode file to a list of
+    instructions, stopping at the END directive if one is present.
+
+    Unlike iter_instructions(), a start offset given by ORG or END is
+    honored (see parse_assembly()).
+
+    :param lines: An iterable of lines to parse.
+    :return: A list of instructions.
+    :raise ParsingException: If a line cannot be parsed.
+    """
+    return parse_assembly(lines)
+
+
+def rotate_instructions(instructions, start):
+    """
+    Reorders the specified instructions so that the one at the specified
+    offset comes first, preserving what each operand refers to.
+
+    An operand that addresses an instruction of the warrior is adjusted to
+    address the same instruction once it has been moved, so that the result
+    behaves the same when executed from its first instruction.  Immediate
+    operands are data rather than addresses, and operands that address
+    memory beyond the warrior are unaffected by where it begins, so neither
+    is changed.
+
+    :param instructions: The list of instructions to rotate.
+    :param start: The offset of the instruction to execute first.
+    :return: A new list of instructions.
+    """
+    size = len(instructions)
+    if start % size == 0:
+        return list(instructions)
+
+    def relocate(arg, address):
+        target = address + arg.value
+        if arg.addr_mode is AddressMode.Immediate or not 0 <= target < size:
+            return arg
+        return Argument(arg.addr_mode, (target - start) % size -
+                        (address - start) % size)
+
+    rotated = [intern_instruction(Instruction(ins.opcode, ins.modifier,
+                                              relocate(ins.arg_a, address),
+                                              relocate(ins.arg_b, address)))
+               for address, ins in enumerate(instructions)]
+    return rotated[start:] + rotated[:start]
+
+
+def seed_genome(instructions):
+    """
+    Creates a genome whose every random walk produces the specified
+    instructions, in order.
+
+    :param instructions: The list of instructions to seed with.
+    :return: A new genome.
+    :raise ValueError: If there are no instructions.
+    """
+    if not instructions:
+        raise ValueError("Cannot seed a genome without instructions.")
+
+    genome = Genome()
+    genome.root = Node(Chromosome(instructions[0]))
+    current = genome.root
+
+    for ins in islice(instructions, 1, None):
+        current.left = Node(Chromosome(ins), parent=current)
+        current = current.left
+    return genome
+
+
+def seed_population(warriors, count):
+    """
+    Creates the specified number of genomes from the specified instruction
+    lists, using each in turn (and repeating them as necessary).
+
+    :param warriors: The list of instruction lists to seed with.
+    :param count: The number of genomes to create.
+    :return: A list of new genomes.
+    :raise ValueError: If there are no instruction lists.
+    """
+    if not warriors:
+        raise ValueError("Cannot seed a population without warriors.")
+    return [seed_genome(ins_list)
+            for ins_list in islice(cycle(warriors), count)]
+
+
+def _is_label(token):
+    """
+    Determines whether or not the specified token is a label rather than an
+    operation code or directive.
+
+    :param token: The token to check.
+    :return: Whether or not a token is a label.
+    """
+    name = token.upper().partition(".")[0]
+    if name in _OPCODES or name in OPCODE_ALIASES or name in PSEUDO_OPCODES \
+            or name in UNSUPPORTED_OPCODES or name == "EQU":
+        return False
+    return re.fullmatch(r"[A-Za-z_]\w*:?", token) is not None
+
+
+def _parse_packed(source):
+    """
+    Parses the specified Redcode source into packed instructions, suitable
+    for returning from a worker process.
+
+    :param source: The source text to parse.
+    :return: The tuple of packed instructions and None, or None and an error
+    message if the source could not be parsed.
+    """
+    try:
+        return tuple(pack_instruction(ins) for ins in
+                     parse_assembly(source.splitlines())), None
+    except ParsingException as e:
+        return None, str(e)
+
+
+def _split_operands(text):
+    """
+    Splits the specified whitespace-separated operand text into operands,
+    keeping each addressing mode attached to its value.
+
+    :param text: The operand text to split.
+    :return: A list of operands.
+    """
+    operands = []
+    pending = ""
+
+    for token in text.split():
+        pending += token
+        if pending not in _ADDRESS_MODES and pending not in "+-":
+            operands.append(pending)
+            pending = ""
+    if pending:
+        operands.append(pending)
+    return operands
@@ -0,0 +1,363 @@
+"""
+Contains all classes and functions for storing entire populations of genomes
+in contiguous arrays.
+"""
+import numpy as np
+
+from evored.genome import Chromosome, Genome, Warrior
+from evored.lang import pack_instruction, unpack_instruction
+from evored.tree import Node
+
+HAS_LEFT = 1
+"""
+The shape flag of a node that has a left child.
+"""
+
+HAS_RIGHT = 2
+"""
+The shape flag of a node that has a right child.
+"""
+
+
+class Population:
+    """
+    Represents a collection of genomes stored column by column in contiguous,
+    ragged arrays rather than as individual node graphs.
+
+    The nodes of every genome are stored one after another in breadth-first
+    order; the nodes of genome i occupy rows offsets[i] to offsets[i + 1].
+    For each node, the population keeps its shape flags (whether it has a
+    left and/or right child), its instruction (packed into six integers as
+    by lang.pack_instruction()), and the fitness of its chromosome.  For
+    each genome, it keeps the fitness, number of evaluations, and running
+    variance statistic of Fitnessable.  A node therefore occupies 33 bytes
+    and a population of a million genomes of 50 chromosomes fits in under
+    2 GB.
+
+    Genome objects are only created when requested (see genome()), which
+    allows whole-population operations to work on the arrays directly.
+
+    Attributes:
+        chromosome_fitness (ndarray): The fitness of each node's chromosome.
+        evaluations (ndarray): The number of evaluations of each genome.
+        fitness (ndarray): The fitness of each genome.
+        instructions (ndarray): The packed instruction of each node, with one
+        row per node and six columns.
+        m2 (ndarray): The running variance statistic of each genome.
+        offsets (ndarray): The index of the first node of each genome,
+        followed by the total number of nodes.
+        shapes (ndarray): The shape flags of each node.
+    """
+
+    def __init__(self, offsets, shapes, instructions, chromosome_fitness,
+                 fitness, evaluations=None, m2=None):
+        self.chromosome_fitness = chromosome_fitness
+        self.evaluations = evaluations if evaluations is not None else \
+            np.zeros(len(fitness), dtype=np.int32)
+        self.fitness = fitness
+        self.instructions = instructions
+        self.m2 = m2 if m2 is not None else np.zeros(len(fitness))
+        self.offsets = offsets
+        self.shapes = shapes
+
+    def __getitem__(self, index):
+        return self.genome(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.genome(index)
+
+    def __len__(self):
+        return len(self.fitness)
+
+    @staticmethod
+    def concatenate(populations):
+        """
+        Combines the specified populations into one, in order.
+
+        :param populations: The list of populations to combine.
+        :return: A new population.
+        """
+        starts = np.cumsum([0] + [p.offsets[-1] for p in populations[:-1]])
+        offsets = np.concatenate([populations[0].offsets[:1]] +
+                                 [p.offsets[1:] + start for p, start in
+                                  zip(populations, starts)])
+        return Population(offsets,
+                          np.concatenate([p.shapes for p in populations]),
+                          np.concatenate([p.instructions
+                                          for p in populations]),
+                          np.concatenate([p.chromosome_fitness
+                                          for p in populations]),
+                          np.concatenate([p.fitness for p in populations]),
+                          np.concatenate([p.evaluations
+                                          for p in populations]),
+                          np.concatenate([p.m2 for p in populations]))
+
+    @staticmethod
+    def from_genomes(genomes):
+        """
+        Packs the specified genomes into a new population.
+
+        :param genomes: The list of genomes to pack.
+        :return: A new population.
+        """
+        offsets = np.zeros(len(genomes) + 1, dtype=np.int64)
+        shapes, instructions, chromosome_fitness = [], [], []
+
+        for index, genome in enumerate(genomes):
+            for node in genome if not genome.is_empty() else ():
+                shapes.append((HAS_LEFT if node.left is not None else 0) |
+                              (HAS_RIGHT if node.right is not None else 0))
+                instructions.append(pack_instruction(node.item.ins))
+                chromosome_fitness.append(node.item.fitness)
+            offsets[index + 1] = len(shapes)
+
+        return Population(
+            offsets, np.array(shapes, dtype=np.uint8),
+            np.array(instructions, dtype=np.int32).reshape(-1, 6),
+            np.array(chromosome_fitness, dtype=np.float64),
+            np.array([g.fitness for g in genomes], dtype=np.float64),
+            np.array([g.evaluations for g in genomes], dtype=np.int32),
+            np.array([g._m2 for g in genomes], dtype=np.float64))
+
+    @staticmethod
+    def generate(count, size, gene_pool, rng=None):
+        """
+        Creates the specified number of random genomes, each a complete
+        binary tree of the specified number of chromosomes (as built by
+        Tree.build()), without creating any objects per genome.
+
+        Instructions are drawn in bulk from the specified gene pool (see
+        GenePool.extract_packed()).
+
+        :param count: The number of genomes to create.
+        :param size: The number of chromosomes per genome.
+        :param gene_pool: The gene pool to draw from.
+        :param rng: The NumPy random generator to use, if any.
+        :return: A new population.
+        """
+        positions = np.arange(size)
+        shape = np.where(2 * positions + 1 < size, HAS_LEFT, 0) | \
+            np.where(2 * positions + 2 < size, HAS_RIGHT, 0)
+
+        return Population(np.arange(count + 1, dtype=np.int64) * size,
+                          np.tile(shape.astype(np.uint8), count),
+                          gene_pool.extract_packed(count * size, rng),
+                          np.zeros(count * size), np.zeros(count))
+
+    @property
+    def sizes(self):
+        """
+        Returns the number of chromosomes in each genome.
+
+        :return: An array of genome sizes.
+        """
+        return np.diff(self.offsets)
+
+    def children(self):
+        """
+        Computes the row of the left and right child of every node, which
+        follow from the shape flags since nodes are stored in breadth-first
+        order.
+
+        :return: Two arrays of child rows, with -1 for an absent child.
+        """
+        has_left = (self.shapes & HAS_LEFT) != 0
+        has_right = (self.shapes & HAS_RIGHT) != 0
+
+        counts = has_left.astype(np.int64) + has_right
+        before = np.cumsum(counts) - counts
+        starts = np.repeat(self.offsets[:-1], self.sizes)
+        first = starts + 1 + before - before[starts]
+
+        left = np.where(has_left, first, -1)
+        right = np.where(has_right, first + has_left, -1)
+        return left, right
+
+    def genome(self, index):
+        """
+        Creates a genome object from the arrays of the genome at the
+        specified index.
+
+        The genome is a copy; changes to it do not affect this population.
+
+        :param index: The index of the genome.
+        :return: A new genome.
+        """
+        start, end = self.offsets[index], self.offsets[index + 1]
+        genome = Genome(fitness=float(self.fitness[index]))
+        genome.evaluations = int(self.evaluations[index])
+        genome._m2 = float(self.m2[index])
+
+        nodes = [Node(Chromosome(unpack_instruction(fields.tolist()),
+                                 float(fit)))
+                 for fields, fit in zip(self.instructions[start:end],
+                                        self.chromosome_fitness[start:end])]
+        if not nodes:
+            return genome
+
+        child = 1
+        for node, shape in zip(nodes, self.shapes[start:end].tolist()):
+            if shape & HAS_LEFT:
+                node.left = nodes[child]
+                nodes[child].parent = node
+                child += 1
+            if shape & HAS_RIGHT:
+                node.right = nodes[child]
+                nodes[child].parent = node
+                child += 1
+
+        genome.root = nodes[0]
+        return genome
+
+    def nodes(self, index):
+        """
+        Returns the range of node rows belonging to the genome at the
+        specified index.
+
+        :param index: The index of the genome.
+        :return: A slice of node rows.
+        """
+        return slice(self.offsets[index], self.offsets[index + 1])
+
+    def realize(self, count=1, rng=None):
+        """
+        Performs the specified number of random walks (as by
+        Tree.random_walk()) of every non-empty genome of this population at
+        once.
+
+        Every walk advances one level per step, so the number of steps is
+        the height of the tallest genome regardless of the number of walks.
+
+        :param count: The number of walks per genome.
+        :param rng: The NumPy random generator to use, if any.
+        :return: The walks taken.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        genomes = np.repeat(np.flatnonzero(self.sizes > 0), count)
+        left, right = self.children()
+
+        walks, rows = [], []
+        active = np.arange(len(genomes))
+        current = self.offsets[genomes]
+
+        while len(active):
+            walks.append(active)
+            rows.append(current)
+
+            go_left, go_right = left[current], right[current]
+            both = (go_left >= 0) & (go_right >= 0)
+            chosen = np.where(go_left >= 0, go_left, go_right)
+            chosen[both] = np.where(rng.random(int(both.sum())) < 0.5,
+                                    go_left[both], go_right[both])
+
+            moving = chosen >= 0
+            active, current = active[moving], chosen[moving]
+
+        walks = np.concatenate(walks) if walks else np.zeros(0, np.int64)
+        rows = np.concatenate(rows) if rows else np.zeros(0, np.int64)
+        order = np.argsort(walks, kind="stable")
+
+        offsets = np.zeros(len(genomes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(walks, minlength=len(genomes)),
+                  out=offsets[1:])
+        return WalkBatch(genomes, offsets, rows[order])
+
+    def rows(self, indices, counts):
+        """
+        Returns the node rows of the first few nodes (in breadth-first order)
+        of each of the genomes at the specified indices, concatenated.
+
+        :param indices: The indices of the genomes.
+        :param counts: The number of nodes to include from each genome.
+        :return: An array of node rows.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        starts = np.cumsum(counts) - counts
+        return np.repeat(self.offsets[indices] - starts, counts) + \
+            np.arange(counts.sum())
+
+    def take(self, indices):
+        """
+        Creates a new population from the genomes at the specified indices,
+        in order and with repetition, copying their arrays in bulk.
+
+        :param indices: The indices of the genomes to take.
+        :return: A new population.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        sizes = self.sizes[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+
+        rows = self.rows(indices, sizes)
+        return Population(offsets, self.shapes[rows], self.instructions[rows],
+                          self.chromosome_fitness[rows],
+                          self.fitness[indices], self.evaluations[indices],
+                          self.m2[indices])
+
+    def to_genomes(self):
+        """
+        Creates a genome object for every genome in this population.
+
+        :return: A list of new genomes.
+        """
+        return [self.genome(index) for index in range(len(self))]
+
+
+class WalkBatch:
+    """
+    Represents a collection of random walks taken through the genomes of a
+    population, stored as the node rows each walk visited.
+
+    The rows visited by walk i, from the root down, are rows[offsets[i]] to
+    rows[offsets[i + 1]], and are therefore also the rows of the packed
+    instructions of the warrior the walk realizes.
+
+    Attributes:
+        genomes (ndarray): The index of the genome of each walk.
+        offsets (ndarray): The index of the first row of each walk, followed
+        by the total number of rows.
+        rows (ndarray): The node rows visited by every walk, in order.
+    """
+
+    def __init__(self, genomes, offsets, rows):
+        self.genomes = genomes
+        self.offsets = offsets
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.genomes)
+
+    @property
+    def lengths(self):
+        """
+        Returns the number of instructions realized by each walk.
+
+        :return: An array of walk lengths.
+        """
+        return np.diff(self.offsets)
+
+    def instructions(self, population):
+        """
+        Returns the packed instructions realized by every walk, in order,
+        from the specified population.
+
+        :param population: The population the walks were taken through.
+        :return: An array of packed instructions, one per row.
+        """
+        return population.instructions[self.rows]
+
+    def warriors(self, population):
+        """
+        Creates a warrior for each walk from the instructions of the
+        specified population.
+
+        :param population: The population the walks were taken through.
+        :return: A list of new warriors.
+        """
+        fields = self.instructions(population).tolist()
+        return [Warrior([unpack_instruction(x) for x in
+                         fields[self.offsets[i]:self.offsets[i + 1]]])
+                for i in range(len(self))]
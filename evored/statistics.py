@@ -10,6 +10,8 @@ class FitnessStatistics:
     list of tiness-related objects.
     """
 
+    __slots__ = ("max", "mean", "min", "variance")
+
     def __init__(self, max=0, mean=0, min=0, variance=0):
         self.max = max
         self.mean = mean
@@ -66,3 +68,58 @@ class FitnessStatistics:
 
         self.mean = sum / n
         self.variance = (n * sum_sq - (sum * sum)) / (n * (n - 1))
+
+
+class InheritanceStatistics:
+    """
+    Represents a mechanism for deriving and storing statistical data about
+    fitness inheritance, i.e. how many genomes inherited an estimated fitness
+    rather than being simulated and how far off those estimates are.
+
+    The bias and error of estimates are exponentially weighted means of the
+    differences between the real scores of simulated offspring and the
+    fitness they would have inherited, so they follow the population as it
+    evolves.
+    """
+
+    __slots__ = ("bias", "calibrations", "error", "inherited", "simulated")
+
+    def __init__(self, bias=0, calibrations=0, error=0, inherited=0,
+                 simulated=0):
+        self.bias = bias
+        self.calibrations = calibrations
+        self.error = error
+        self.inherited = inherited
+        self.simulated = simulated
+
+    def __repr__(self):
+        return repr((self.bias, self.calibrations, self.error, self.inherited,
+                     self.simulated))
+
+    def __str__(self):
+        return "sim: " + str(self.simulated) + \
+               " inh: " + str(self.inherited) + \
+               " bias: " + str(self.bias) + \
+               " err: " + str(self.error)
+
+    def calibrate(self, errors, smoothing):
+        """
+        Incorporates the specified estimation errors into the running bias
+        and mean absolute error of inherited fitness.
+
+        The first calibration replaces the running means outright.
+
+        :param errors: The list of differences between real and estimated
+        fitness.
+        :param smoothing: The weight of the new errors, between zero and one.
+        """
+        if not errors:
+            return
+
+        bias = sum(errors) / len(errors)
+        error = sum(abs(x) for x in errors) / len(errors)
+        weight = smoothing if self.calibrations > 0 else 1
+
+        self.bias += weight * (bias - self.bias)
+        self.error += weight * (error - self.error)
+        self.calibrations += len(errors)
@@ -3,6 +3,7 @@ Contains all classes and functions for creating and working with an
 unstructured binary tree.
 """
 import itertools
+from collections import deque
 from copy import copy
 from random import random, randrange
 
@@ -41,12 +42,12 @@ def _copy_tree(source, target):
 
     target.root = Node(copy(source.root.item))
 
-    source = [source.root]
-    dest = [target.root]
+    source = deque([source.root])
+    dest = deque([target.root])
 
     while source:
-        s = source.pop(0)
-        d = dest.pop(0)
+        s = source.popleft()
+        d = dest.popleft()
 
         if s.has_left():
             source.append(s.left)
@@ -73,6 +74,14 @@ class Node:
     """
     Represents a single node in an unstructured binary tree.
 
+    Each node lazily computes and caches a structural hash of the subtree it
+    roots (see subtree_hash()), combining the hash of its item with those of
+    its children, along with the size and height of that subtree.  Assigning
+    the item or either child of a node invalidates its cached values and
+    those of its ancestors, so items must be replaced rather than altered in
+    place for the cache to remain correct.  Cached values are not pickled,
+    since string hashes differ between processes.
+
     Attributes:
         item (object): The item contained in this node.
         left (Node): The left child of this node.
@@ -80,11 +89,17 @@ class Node:
         right (Node): The right child of this node.
     """
 
+    __slots__ = ("_hash", "_height", "_item", "_left", "_right", "_size",
+                 "parent")
+
     def __init__(self, item, parent=None, left=None, right=None):
-        self.item = item
-        self.left = left
+        self._hash = None
+        self._height = None
+        self._size = None
+        self._item = item
+        self._left = left
         self.parent = parent
-        self.right = right
+        self._right = right
 
     def __eq__(self, other):
         if isinstance(other, Node):
@@ -98,9 +113,43 @@ class Node:
         return hash((self.item, _get_item(self.left), _get_item(self.parent),
                      _get_item(self.right)))
 
+    def __getstate__(self):
+        return self._item, self._left, self.parent, self._right
+
+    def __setstate__(self, state):
+        self._item, self._left, self.parent, self._right = state
+        self._hash = self._height = self._size = None
+
     def __ne__(self, other):
         return not self == other
 
+    @property
+    def item(self):
+        return self._item
+
+    @item.setter
+    def item(self, item):
+        self._item = item
+        self.invalidate()
+
+    @property
+    def left(self):
+        return self._left
+
+    @left.setter
+    def left(self, node):
+        self._left = node
+        self.invalidate()
+
+    @property
+    def right(self):
+        return self._right
+
+    @right.setter
+    def right(self, node):
+        self._right = node
+        self.invalidate()
+
     def choose_child(self):
         """
         Randomly chooses a child.
@@ -119,7 +168,20 @@ class Node:
             return self.left
         elif not self.has_left() and self.has_right():
             return self.right
-        return self.left if random.uniform(0, 1) < 0.5 else self.right
+        return self.left if random() < 0.5 else self.right
+
+    def depth(self):
+        """
+        Computes the number of ancestors of this node.
+
+        :return: The depth of this node.
+        """
+        depth = 0
+        current = self.parent
+        while current is not None:
+            depth += 1
+            current = current.parent
+        return depth
 
     def has_left(self):
         """
@@ -137,6 +199,21 @@ class Node:
         """
         return self.right is not None
 
+    def invalidate(self):
+        """
+        Discards the cached subtree hash, size, and height of this node and
+        of every ancestor that has them.
+
+        Since computing the hash of a node computes that of all its
+        descendants, an ancestor can only have a cached hash if every node
+        below it does; the walk therefore stops at the first ancestor
+        without one.
+        """
+        current = self
+        while current is not None and current._hash is not None:
+            current._hash = current._height = current._size = None
+            current = current.parent
+
     def is_full(self):
         """
         Returns whether or not this node has both children.
@@ -183,6 +260,68 @@ class Node:
         else:
             raise ValueError("Child does not belong to this node.")
 
+    def subtree_hash(self):
+        """
+        Returns the structural hash of the subtree rooted at this node,
+        computing it (and that of any descendant without one) if necessary.
+
+        Two subtrees with equal items in identical shapes have equal hashes,
+        so subtrees that differ can usually be told apart in constant time.
+
+        :return: The hash of this node's subtree.
+        """
+        if self._hash is None:
+            self._measure()
+        return self._hash
+
+    def subtree_height(self):
+        """
+        Returns the number of nodes on the longest path from this node to a
+        leaf, computing it (as by subtree_hash()) if necessary.
+
+        :return: The height of this node's subtree.
+        """
+        if self._hash is None:
+            self._measure()
+        return self._height
+
+    def subtree_size(self):
+        """
+        Returns the number of nodes in the subtree rooted at this node,
+        computing it (as by subtree_hash()) if necessary.
+
+        :return: The size of this node's subtree.
+        """
+        if self._hash is None:
+            self._measure()
+        return self._size
+
+    def _measure(self):
+        """
+        Computes and caches the hash, size, and height of the subtree rooted
+        at this node and of every descendant without them, children first.
+        """
+        stack = [self]
+        while stack:
+            current = stack[-1]
+            pending = [child for child in (current._left, current._right)
+                       if child is not None and child._hash is None]
+
+            if pending:
+                stack.extend(pending)
+                continue
+
+            stack.pop()
+            left, right = current._left, current._right
+            current._hash = hash((
+                current._item, left._hash if left is not None else None,
+                right._hash if right is not None else None))
+            current._height = 1 + max(
+                left._height if left is not None else 0,
+                right._height if right is not None else 0)
+            current._size = 1 + (left._size if left is not None else 0) + \
+                (right._size if right is not None else 0)
+
     def swap_children(self):
         """
         Swaps the placement of this node's children with each other,
@@ -247,12 +386,19 @@ class Tree:
 
     def __eq__(self, other):
         if isinstance(other, Tree):
+            if self.root is not None and other.root is not None and \
+                    hash(self) != hash(other):
+                return False
+
             for s, t in itertools.zip_longest(self, other):
                 if not s == t:
                     return False
             return True
         return NotImplemented
 
+    def __hash__(self):
+        return self.root.subtree_hash() if self.root is not None else 0
+
     def __iter__(self):
         """
         Creates a generator that returns the nodes of this tree in
@@ -260,10 +406,10 @@ class Tree:
 
         :return: The nodes of this tree in breadth-first order.
         """
-        queue = [self.root]
+        queue = deque([self.root])
 
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             yield current
 
             if current.left is not None:
@@ -313,24 +459,41 @@ class Tree:
 
     def choose_node(self):
         """
-        Chooses a random node from this tree.
+        Chooses a random node from this tree, each node being equally likely.
 
-        This function is O(n) since, for this project, the number of nodes
-        will always be unknown.
+        The node is found by descending from the root, choosing at each node
+        between itself and its branches in proportion to their cached sizes.
+        This function is therefore O(n) only when the tree has changed since
+        sizes were last computed and O(depth) otherwise.
 
         :return: A randomly chosen node.
         """
         if not self.root:
             return None
 
-        count = 0
-        selected = None
+        current = self.root
+        while True:
+            roll = randrange(current.subtree_size())
+            left_size = current.left.subtree_size() \
+                if current.left is not None else 0
+
+            if roll == 0:
+                return current
+            elif roll <= left_size:
+                current = current.left
+            else:
+                current = current.right
+
+    def enumerate_walks(self, limit=None):
+        """
+        Enumerates every walk random_walk() may take, together with its
+        probability.
 
-        for node in self:
-            count += 1
-            if randrange(0, count) == 0:
-                selected = node
-        return selected
+        :param limit: The maximum number of walks to enumerate, if any.
+        :return: A list of probabilities and lists of items, or None if
+        there are more walks than the limit.
+        """
+        return _enumerate_walks(self.root, limit)
 
     def is_empty(self):
         """
@@ -358,3 +521,517 @@ class Tree:
             items.append(current.item)
             current = current.choose_child()
         return items
+
+    def sample_walks(self, count):
+        """
+        Samples approximately the specified number of walks using stratified
+        sampling, each with its weight in an estimate of an expectation over
+        all walks.
+
+        :param count: The approximate number of walks to sample.
+        :return: A list of weights and lists of items.
+        """
+        return _sample_walks(self.root, count)
+
+
+class PersistentNode:
+    """
+    Represents a single, immutable node in an unstructured binary tree.
+
+    Persistent nodes have no parent, which allows any number of trees (and
+    versions of the same tree) to share them.  The structural hash, size,
+    and height of the subtree each node roots are computed once, when it is
+    created, from those of its children.
+
+    Attributes:
+        height (int): The number of nodes on the longest path from this node
+        to a leaf.
+        item (object): The item contained in this node.
+        left (PersistentNode): The left child of this node.
+        right (PersistentNode): The right child of this node.
+        size (int): The number of nodes in the subtree rooted at this node.
+    """
+
+    __slots__ = ("height", "item", "left", "right", "size", "_hash")
+
+    def __init__(self, item, left=None, right=None):
+        object.__setattr__(self, "item", item)
+        object.__setattr__(self, "left", left)
+        object.__setattr__(self, "right", right)
+        object.__setattr__(self, "size", 1 +
+                           (left.size if left is not None else 0) +
+                           (right.size if right is not None else 0))
+        object.__setattr__(self, "height", 1 + max(
+            left.height if left is not None else 0,
+            right.height if right is not None else 0))
+        object.__setattr__(self, "_hash", hash((
+            item, left._hash if left is not None else None,
+            right._hash if right is not None else None)))
+
+    def __reduce__(self):
+        return PersistentNode, (self.item, self.left, self.right)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Persistent nodes cannot be modified.")
+
+    def choose_child(self):
+        """
+        Randomly chooses a child, following the same rules as
+        Node.choose_child().
+
+        :return: A randomly chosen child.
+        """
+        if self.left is None:
+            return self.right
+        elif self.right is None:
+            return self.left
+        return self.left if random() < 0.5 else self.right
+
+    def has_left(self):
+        """
+        Returns whether or not this node has a left child.
+
+        :return: Whether or not there is a left child.
+        """
+        return self.left is not None
+
+    def has_right(self):
+        """
+        Returns whether or not this node has a right child.
+
+        :return: Whether or not there is a right child.
+        """
+        return self.right is not None
+
+    def is_leaf(self):
+        """
+        Returns whether or not this node has no children.
+
+        :return: Whether or not there are no children.
+        """
+        return self.left is None and self.right is None
+
+    def subtree_hash(self):
+        """
+        Returns the structural hash of the subtree rooted at this node, which
+        equals that of a mutable node with identical contents.
+
+        :return: The hash of this node's subtree.
+        """
+        return self._hash
+
+
+class PersistentTree:
+    """
+    Represents an immutable, unstructured binary tree whose modified versions
+    share every unchanged subtree with the original.
+
+    Nodes are identified by their path from the root, a tuple of directions
+    (0 for left and 1 for right).  Rather than changing a tree, operations
+    such as with_items() create a new version by copying only the nodes on
+    the paths to the changed nodes (path copying), which costs O(depth) per
+    change instead of O(n).  Copying a persistent tree is therefore O(1) and
+    a population of near-duplicate trees occupies little more memory than a
+    single tree.
+
+    Since items are shared between versions, they must never be altered in
+    place; replace them with with_items() instead.
+
+    Attributes:
+        root (PersistentNode): The root node of this tree.
+    """
+
+    def __init__(self, items=None, root=None):
+        self.root = root
+
+        if items is not None:
+            self.root = PersistentTree.build_nodes(items)
+
+    def __copy__(self):
+        return PersistentTree(root=self.root)
+
+    def __eq__(self, other):
+        if isinstance(other, (PersistentTree, Tree)):
+            if self.root is other.root:
+                return True
+            if hash(self) != hash(other):
+                return False
+
+            for s, t in itertools.zip_longest(self, other):
+                if s is None or t is None or s.item != t.item or \
+                        s.has_left() != t.has_left() or \
+                        s.has_right() != t.has_right():
+                    return False
+            return True
+        return NotImplemented
+
+    def __hash__(self):
+        return self.root.subtree_hash() if self.root is not None else 0
+
+    def __iter__(self):
+        """
+        Creates a generator that returns the nodes of this tree in
+        breadth-first order.
+
+        :return: The nodes of this tree in breadth-first order.
+        """
+        for _, node in self.paths():
+            yield node
+
+    def __len__(self):
+        return self.root.size if self.root is not None else 0
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __str__(self):
+        return str([node.item for node in self])
+
+    @staticmethod
+    def build_nodes(items):
+        """
+        Creates the nodes of a tree filled out in breadth-first order (as by
+        Tree.build()) using the specified list of items as elements.
+
+        :param items: The items to fill the tree with.
+        :return: The root node of the new tree, or None if there are no
+        items.
+        """
+        nodes = [None] * len(items)
+
+        for index in range(len(items) - 1, -1, -1):
+            left, right = 2 * index + 1, 2 * index + 2
+            nodes[index] = PersistentNode(
+                items[index], nodes[left] if left < len(items) else None,
+                nodes[right] if right < len(items) else None)
+        return nodes[0] if nodes else None
+
+    @staticmethod
+    def freeze_nodes(node):
+        """
+        Creates a persistent copy of the subtree rooted at the specified
+        mutable node.
+
+        :param node: The node to copy.
+        :return: The root of an identical persistent subtree.
+        """
+        if node is None:
+            return None
+
+        order = [node]
+        for current in order:
+            order.extend(child for child in (current.left, current.right)
+                         if child is not None)
+
+        frozen = {}
+        for current in reversed(order):
+            frozen[id(current)] = PersistentNode(
+                current.item, frozen.get(id(current.left)),
+                frozen.get(id(current.right)))
+        return frozen[id(node)]
+
+    def choose_path(self):
+        """
+        Chooses the path of a random node from this tree, each node being
+        equally likely.
+
+        :return: A randomly chosen path, or None if this tree is empty.
+        """
+        if self.root is None:
+            return None
+
+        path = ()
+        current = self.root
+        while True:
+            roll = randrange(current.size)
+            left_size = current.left.size if current.left is not None else 0
+
+            if roll == 0:
+                return path
+            elif roll <= left_size:
+                path, current = path + (0,), current.left
+            else:
+                path, current = path + (1,), current.right
+
+    def derive(self, root):
+        """
+        Creates a new version of this tree with the specified root.
+
+        Subclasses must override this function in order to carry over any
+        additional state.
+
+        :param root: The root node of the new version.
+        :return: A new tree.
+        """
+        return PersistentTree(root=root)
+
+    def enumerate_walks(self, limit=None):
+        """
+        Enumerates every walk random_walk() may take, together with its
+        probability (see Tree.enumerate_walks()).
+
+        :param limit: The maximum number of walks to enumerate, if any.
+        :return: A list of probabilities and lists of items, or None if
+        there are more walks than the limit.
+        """
+        return _enumerate_walks(self.root, limit)
+
+    def is_empty(self):
+        """
+        Determines whether or not this tree is empty.
+
+        :return: Whether or not this tree is devoid of nodes.
+        """
+        return self.root is None
+
+    def node_at(self, path):
+        """
+        Returns the node at the specified path.
+
+        :param path: The path to the node.
+        :return: A node.
+        :raise ValueError: If there is no node at the path.
+        """
+        current = self.root
+        for direction in path:
+            if current is None:
+                break
+            current = current.right if direction else current.left
+
+        if current is None:
+            raise ValueError("No node at path: %s" % (path,))
+        return current
+
+    def paths(self):
+        """
+        Creates a generator that returns the path and node of each node of
+        this tree in breadth-first order.
+
+        :return: Pairs of paths and nodes in breadth-first order.
+        """
+        if self.root is None:
+            return
+
+        queue = deque([((), self.root)])
+        while queue:
+            path, current = queue.popleft()
+            yield path, current
+
+            if current.left is not None:
+                queue.append((path + (0,), current.left))
+            if current.right is not None:
+                queue.append((path + (1,), current.right))
+
+    def random_walk(self):
+        """
+        Performs a "random walk" starting at the root node, randomly choosing
+        the next child to walk to.
+
+        :return: A list of items obtained from the walk.
+        """
+        items = []
+        current = self.root
+
+        while current is not None:
+            items.append(current.item)
+            current = current.choose_child()
+        return items
+
+    def replace(self, path, node):
+        """
+        Creates a new version of this tree in which the subtree at the
+        specified path is replaced by the specified node.
+
+        :param path: The path of the subtree to replace.
+        :param node: The root of the replacement subtree.
+        :return: A new tree.
+        :raise ValueError: If there is no node at the path.
+        """
+        self.node_at(path)
+        return self.derive(_replace_at(self.root, tuple(path), node))
+
+    def sample_walks(self, count):
+        """
+        Samples approximately the specified number of walks using stratified
+        sampling (see Tree.sample_walks()).
+
+        :param count: The approximate number of walks to sample.
+        :return: A list of weights and lists of items.
+        """
+        return _sample_walks(self.root, count)
+
+    def thaw(self, tree=None):
+        """
+        Creates a mutable copy of this tree.
+
+        :param tree: The empty tree to copy to, if any.
+        :return: A mutable tree with identical contents.
+        """
+        target = tree if tree is not None else Tree()
+        if self.root is None:
+            return target
+
+        target.root = Node(self.root.item)
+        queue = deque([(self.root, target.root)])
+
+        while queue:
+            source, dest = queue.popleft()
+            if source.left is not None:
+                dest.left = Node(source.left.item, parent=dest)
+                queue.append((source.left, dest.left))
+            if source.right is not None:
+                dest.right = Node(source.right.item, parent=dest)
+                queue.append((source.right, dest.right))
+        return target
+
+    def with_items(self, items):
+        """
+        Creates a new version of this tree in which the node at each of the
+        specified paths holds the corresponding item.
+
+        Nodes on the paths to the changed nodes are copied once, regardless
+        of how many changes lie beneath them, while every other node is
+        shared with this tree.
+
+        :param items: A dictionary of paths to replacement items.
+        :return: A new tree, or this tree if there are no changes.
+        :raise ValueError: If there is no node at one of the paths.
+        """
+        if not items:
+            return self
+
+        for path in items:
+            self.node_at(path)
+        return self.derive(_assign_items(
+            self.root, [(tuple(path), item) for path, item in items.items()]))
+
+
+def _assign_items(node, updates):
+    """
+    Recreates the specified persistent node with the specified items
+    assigned at the specified paths relative to it.
+
+    :param node: The node to recreate.
+    :param updates: A list of relative paths and items.
+    :return: A new persistent node.
+    """
+    item = node.item
+    left, right = [], []
+
+    for path, new_item in updates:
+        if not path:
+            item = new_item
+        elif path[0]:
+            right.append((path[1:], new_item))
+        else:
+            left.append((path[1:], new_item))
+
+    return PersistentNode(item,
+                          _assign_items(node.left, left) if left else
+                          node.left,
+                          _assign_items(node.right, right) if right else
+                          node.right)
+
+
+def _replace_at(node, path, replacement):
+    """
+    Recreates the specified persistent node with the subtree at the
+    specified relative path replaced.
+
+    :param node: The node to recreate.
+    :param path: The relative path of the subtree to replace.
+    :param replacement: The root of the replacement subtree.
+    :return: A new persistent node.
+    """
+    if not path:
+        return replacement
+    elif path[0]:
+        return PersistentNode(node.item, node.left,
+                              _replace_at(node.right, path[1:], replacement))
+    return PersistentNode(node.item,
+                          _replace_at(node.left, path[1:], replacement),
+                          node.right)
+
+
+def _enumerate_walks(root, limit=None):
+    """
+    Enumerates every walk from the specified node to a leaf, together with
+    the probability of a random walk taking it.
+
+    A walk continues to a lone child with certainty and to either of two
+    children with equal probability, as by Node.choose_child().
+
+    :param root: The node to start at.
+    :param limit: The maximum number of walks to enumerate, if any.
+    :return: A list of probabilities and lists of items, in left-to-right
+    order, or None if there are more walks than the limit.
+    """
+    if root is None:
+        return []
+
+    walks = []
+    stack = [(root, 1.0, (root.item,))]
+
+    while stack:
+        node, probability, items = stack.pop()
+        children = [child for child in (node.left, node.right)
+                    if child is not None]
+
+        if not children:
+            walks.append((probability, list(items)))
+            if limit is not None and len(walks) > limit:
+                return None
+            continue
+
+        for child in reversed(children):
+            stack.append((child, probability / len(children),
+                          items + (child.item,)))
+    return walks
+
+
+def _sample_walks(root, count):
+    """
+    Samples approximately the specified number of random walks from the
+    specified node using stratified sampling, together with the weight of
+    each walk in an unbiased estimate of an expectation over all walks.
+
+    The strata are the nodes of the deepest level (of the walks that have
+    not yet ended) with no more nodes than the specified count.  Each
+    stratum receives samples in proportion to its probability, and at least
+    one, and each walk is weighted by the probability of its stratum divided
+    by the number of samples it received.
+
+    :param root: The node to start at.
+    :param count: The approximate number of walks to sample.
+    :return: A list of weights and lists of items.
+    """
+    if root is None:
+        return []
+
+    strata = [(root, 1.0, (root.item,))]
+    while True:
+        expanded = []
+        for node, probability, items in strata:
+            children = [child for child in (node.left, node.right)
+                        if child is not None]
+            if not children:
+                expanded.append((node, probability, items))
+            for child in children:
+                expanded.append((child, probability / len(children),
+                                 items + (child.item,)))
+
+        if len(expanded) > count or len(expanded) == len(strata):
+            break
+        strata = expanded
+
+    walks = []
+    for node, probability, items in strata:
+        samples = 1 if node.is_leaf() else max(1, round(count * probability))
+        for _ in range(samples):
+            walk = list(items)
+            current = node.choose_child()
+            while current is not None:
+                walk.append(current.item)
+                current = current.choose_child()
+            walks.append((probability / samples, walk))
+    return walks
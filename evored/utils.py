@@ -5,6 +5,8 @@ import contextlib
 
 import os
 import tempfile
+import threading
+import weakref
 
 import shutil
 
@@ -20,6 +22,18 @@ def flatten(llist):
     return [item for sublist in llist for item in sublist]
 
 
+def _remove_directories(paths):
+    """
+    Deletes each of the specified directories, ignoring any that no longer
+    exist, and empties the list.
+
+    :param paths: The list of directories to delete.
+    """
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
+    paths.clear()
+
+
 @contextlib.contextmanager
 def cd(new_dir, cleanup=lambda: True):
     """
@@ -27,6 +41,10 @@ def cd(new_dir, cleanup=lambda: True):
     (which for this project is a temporary) and executes the specified
     clean-up function before leaving scope.
 
+    Please note that the working directory is shared by the entire process,
+    so this function is not safe to use from multiple threads or tasks at
+    once.  Use WorkspaceManager instead in those cases.
+
     :param new_dir: The temporary directory to use.
     :param cleanup: Whether or not to delete the temporary directory on exit.
     """
@@ -54,3 +72,116 @@ def tempdir():
 
     with cd(dir_path, cleanup):
         yield dir_path
+
+
+class WorkspaceManager:
+    """
+    Represents a thread-safe collection of reusable scratch directories.
+
+    Each worker (or task) acquires a workspace by absolute path and releases
+    it when finished, after which the same directory is handed out again
+    instead of being deleted and recreated.  The current working directory
+    is never changed, so any number of workspaces may be in use concurrently
+    within a single process.  All workspaces are removed when the manager is
+    closed or, failing that, when it is garbage collected or the interpreter
+    exits.
+
+    Attributes:
+        prefix (str): The prefix for each workspace directory name.
+        root (str): The directory to create workspaces in, or None to use the
+        system default.
+    """
+
+    def __init__(self, root=None, prefix="evored_"):
+        self.prefix = prefix
+        self.root = root
+        self._available = []
+        self._closed = False
+        self._created = []
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _remove_directories,
+                                           self._created)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._created)
+
+    def acquire(self):
+        """
+        Obtains an unused workspace, creating a new one only if none are
+        available.
+
+        :return: The absolute path to a workspace.
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("Workspace manager is closed.")
+            if self._available:
+                return self._available.pop()
+
+            path = os.path.abspath(tempfile.mkdtemp(prefix=self.prefix,
+                                                    dir=self.root))
+            self._created.append(path)
+            return path
+
+    def close(self):
+        """
+        Removes every workspace this manager has created.
+
+        Any workspaces still in use are removed as well, so this should only
+        be called once all work has finished.  Workspaces released afterward
+        are ignored.
+        """
+        with self._lock:
+            self._closed = True
+            self._available.clear()
+            self._finalizer()
+
+    def release(self, path, clear=False):
+        """
+        Returns the specified workspace so that it may be reused.
+
+        This function does nothing if this manager has been closed.
+
+        :param path: The workspace to release.
+        :param clear: Whether or not to delete the contents of the workspace
+        before it is reused.
+        :raise ValueError: If the workspace does not belong to this manager.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            if path not in self._created:
+                raise ValueError("Workspace does not belong to this manager.")
+
+        if clear:
+            for entry in os.scandir(path):
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+
+        with self._lock:
+            if not self._closed:
+                self._available.append(path)
+
+    @contextlib.contextmanager
+    def workspace(self, clear=False):
+        """
+        Acquires a workspace for the duration of a with statement.
+
+        :param clear: Whether or not to delete the contents of the workspace
+        on release.
+        :return: The absolute path to a workspace.
+        """
+        path = self.acquire()
+        try:
+            yield path
+        finally:
+            self.release(path, clear)
@@ -4,7 +4,9 @@ contained within to run correctly.
 """
 from random import randint
 
-from evored.genome import Genome
+from evored.genome import Chromosome, Genome
+from evored.lang import OpCode, Modifier, AddressMode, Instruction, Argument
+from evored.population import Population
 
 
 def create_genomes(num_genomes, max_fitness=100, max_chromosome_num=10,
@@ -44,3 +46,39 @@ def create_genomes_from_fitness(fitness_scores, max_chromosome_num=10,
                        for _ in range(randint(1, max_chromosome_num))]
         genomes.append(Genome(chromosomes=chromosomes, fitness=score))
     return genomes
+
+
+def create_dat_genome(values, fitness=0, opcodes=None):
+    """
+    Creates a genome of DAT instructions whose B-field values (in
+    breadth-first order) are the specified values, making the origin of each
+    chromosome easy to track.
+
+    :param values: The list of B-field values.
+    :param fitness: The fitness score of the genome.
+    :param opcodes: The list of operation codes to use in place of DAT, one
+    per value, if any.
+    :return: A new genome.
+    """
+    values = list(values)
+    opcodes = opcodes if opcodes else [OpCode.Dat] * len(values)
+    chromosomes = [Chromosome(Instruction(opcode, Modifier.F,
+                                          Argument(AddressMode.Immediate, 0),
+                                          Argument(AddressMode.Immediate, x)))
+                   for x, opcode in zip(values, opcodes)]
+    return Genome(chromosomes if chromosomes else None, fitness)
+
+
+def create_population(sizes, fitness_scores=None):
+    """
+    Creates a population of DAT genomes of the specified sizes, in which the
+    chromosome at position j of genome i has a B-field value of 1000 * i + j.
+
+    :param sizes: The number of chromosomes of each genome.
+    :param fitness_scores: The fitness score of each genome, if any.
+    :return: A new population.
+    """
+    fitness_scores = fitness_scores if fitness_scores else [0] * len(sizes)
+    return Population.from_genomes([
+        create_dat_genome(range(1000 * i, 1000 * i + size), score)
+        for i, (size, score) in enumerate(zip(sizes, fitness_scores))])
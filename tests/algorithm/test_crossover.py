@@ -2,6 +2,7 @@
 Contains unit tests for verifying the correctness of crossover pair extraction.
 """
 from unittest import TestCase
+from unittest.mock import patch
 
 from evored.algorithm.crossover import Crossover
 from tests import create_genomes
@@ -65,3 +66,18 @@ class CrossoverTest(TestCase):
         self.assertEqual(len(gen_a), 0)
         self.assertEqual(len(gen_b), 0)
         self.assertEqual(len(genomes), 11)
+
+    def test_crossing_pairs_keeps_remaining_order(self):
+        genomes = create_genomes(11)
+        expected = [genomes[x] for x in [0, 1, 4, 5, 10]]
+        decisions = iter([0.9, 0.1, 0.9, 0.1, 0.1])
+        params = {"crossover.rate": 0.5}
+
+        with patch("evored.algorithm.crossover.random",
+                   lambda: next(decisions)):
+            gen_a, gen_b = self.crossover.extract_crossing_pairs(genomes,
+                                                                 params)
+
+        self.assertEqual(expected, genomes)
+        self.assertEqual(3, len(gen_a))
+        self.assertEqual(3, len(gen_b))
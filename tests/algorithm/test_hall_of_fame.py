@@ -0,0 +1,86 @@
+"""
+Contains unit tests to verify that the hall of fame archives the best
+distinct genomes and feeds them back into later generations.
+"""
+from unittest import TestCase
+
+from evored.algorithm.selection import HallOfFame
+from evored.gene_pool import DistributionGenePool, RandomGenePool
+from evored.lang import OpCode
+from tests import create_dat_genome, create_population
+
+
+class HallOfFameTest(TestCase):
+    """
+    Test suite for HallOfFame.
+    """
+
+    def setUp(self):
+        self.archive = HallOfFame(3)
+        self.params = {}
+
+    def test_insert_keeps_best_genomes(self):
+        genomes = [create_dat_genome([x], x) for x in [5, 1, 9, 3, 7, 2]]
+        self.assertEqual(5, self.archive.update(genomes))
+
+        self.assertEqual(3, len(self.archive))
+        self.assertEqual([9, 7, 5],
+                         [g.fitness for g in self.archive.elites()])
+        self.assertEqual([9, 7], [g.fitness for g in self.archive.elites(2)])
+
+    def test_insert_ignores_duplicate_content(self):
+        self.assertTrue(self.archive.insert(create_dat_genome([1, 2], 4)))
+        self.assertFalse(self.archive.insert(create_dat_genome([1, 2], 8)))
+        self.assertEqual([4], [g.fitness for g in self.archive.elites()])
+
+    def test_insert_forgets_evicted_content(self):
+        self.archive.update(create_dat_genome([x], x) for x in range(3))
+        self.archive.insert(create_dat_genome([5], 5))
+        self.assertTrue(self.archive.insert(create_dat_genome([0], 6)))
+
+    def test_insert_archives_copies(self):
+        genome = create_dat_genome([1], 4)
+        self.archive.insert(genome)
+        genome.fitness = 0
+        self.assertEqual(4, self.archive.elites()[0].fitness)
+
+    def test_evolve_replaces_worst_genomes_with_elites(self):
+        self.archive.update([create_dat_genome([100], 50),
+                             create_dat_genome([101], 40)])
+        genomes = [create_dat_genome([x], x) for x in [6, 2, 8, 1, 45]]
+        results = self.archive.evolve(genomes, None,
+                                      {"elitism.elites": 3})
+
+        self.assertEqual([6, 40, 8, 50, 45], [g.fitness for g in results])
+        self.assertEqual([50, 45, 40],
+                         [g.fitness for g in self.archive.elites()])
+
+    def test_evolve_skips_elites_already_present(self):
+        genomes = [create_dat_genome([x], x) for x in [3, 1, 2]]
+        results = self.archive.evolve(genomes, None, self.params)
+        self.assertEqual([3, 1, 2], [g.fitness for g in results])
+
+    def test_evolve_teaches_gene_pool_from_elites(self):
+        gene_pool = DistributionGenePool(RandomGenePool(
+            opcodes=[OpCode.Mov, OpCode.Dat], arg_range=(0, 10)))
+        archive = HallOfFame(3, gene_pool)
+        genomes = [create_dat_genome([x], x) for x in range(5)]
+
+        archive.evolve(genomes, None, {"gene_pool.elites": 2})
+        self.assertAlmostEqual(0.45, gene_pool.distributions[0][0][0])
+        self.assertAlmostEqual(0.55, gene_pool.distributions[0][0][1])
+
+        archive.evolve_population(create_population([2]), None, {})
+        self.assertAlmostEqual(0.405, gene_pool.distributions[0][0][0])
+
+    def test_evolve_population_replaces_worst_genomes_with_elites(self):
+        self.archive.update([create_dat_genome([7, 7], 50)])
+        population = create_population([1, 2, 3, 2], [4, 1, 9, 2])
+        results = self.archive.evolve_population(population, None,
+                                                 {"elitism.elites": 2})
+
+        self.assertEqual([4, 50, 9, 2], results.fitness.tolist())
+        self.assertEqual(create_dat_genome([7, 7], 50), results.genome(1))
+        self.assertEqual(population.genome(3), results.genome(3))
+        self.assertEqual([50, 9, 4],
+                         [g.fitness for g in self.archive.elites()])
@@ -6,8 +6,9 @@ from unittest import TestCase
 
 from pathos.multiprocessing import ProcessPool
 
-from evored.genome import Genome
+from evored.genome import Genome, PersistentGenome
 from evored.algorithm.mutation import HeapDownMutator
+from evored.tree import Node
 
 
 class HeapDownMutatorTest(TestCase):
@@ -68,3 +69,60 @@ class HeapDownMutatorTest(TestCase):
 
         results = self.mutator.evolve(genomes, self.pool, self.params)
         self.assertEqual(results, expected)
+
+    def test_heap_down_matches_for_persistent_genomes(self):
+        for items in [[12, 40, 32], [12, 40], [1, 2, 3, 4, 5, 6, 7]]:
+            genome = PersistentGenome(items)
+            expected = [x.item for x in self.mutator.mutate(Genome(items),
+                                                            self.params)]
+            output = self.mutator.mutate(genome, self.params)
+
+            self.assertEqual(expected, [x.item for x in output])
+            self.assertEqual(items, [x.item for x in genome])
+
+    def test_mutate_returns_genome_when_not_mutated(self):
+        genome = Genome([12, 40, 32])
+        output = self.mutator.mutate(genome, {"mutator.rate": 0.0})
+
+        self.assertIs(genome, output)
+        self.assertEqual([12, 40, 32], [x.item for x in output])
+
+    def test_heapify_orders_whole_tree(self):
+        params = {"mutator.rate": 1.0, "mutator.heapify": True}
+        genome = Genome([1, 2, 3, 4, 5, 6, 7])
+        output = self.mutator.mutate(genome, params)
+
+        self.assertEqual([7, 5, 6, 4, 2, 1, 3], [x.item for x in output])
+        for node in output:
+            for child in (node.left, node.right):
+                if child is not None:
+                    self.assertTrue(node.item >= child.item)
+
+    def test_heapify_sifts_at_most_the_given_levels(self):
+        params = {"mutator.rate": 1.0, "mutator.heapify": True,
+                  "mutator.sift_levels": 1}
+        genome = Genome([1, 2, 3, 4, 5, 6, 7])
+        output = self.mutator.mutate(genome, params)
+
+        self.assertEqual([7, 5, 1, 4, 2, 6, 3], [x.item for x in output])
+
+    def test_heapify_handles_irregular_trees(self):
+        params = {"mutator.rate": 1.0, "mutator.heapify": True}
+        genome = Genome([1, 2])
+        genome.root.left.right = Node(9, genome.root.left)
+        output = self.mutator.mutate(genome, params)
+
+        self.assertEqual([9, 2, 1], [x.item for x in output])
+        self.assertEqual(9, output.root.item)
+        self.assertEqual(1, output.root.left.right.item)
+
+    def test_heapify_matches_for_persistent_genomes(self):
+        params = {"mutator.rate": 1.0, "mutator.heapify": True}
+        for items in [[12, 40, 32], [12, 40], list(range(0, 20))]:
+            genome = PersistentGenome(items)
+            expected = [x.item for x in self.mutator.mutate(Genome(items),
+                                                            params)]
+            output = self.mutator.mutate(genome, params)
+
+            self.assertEqual(expected, [x.item for x in output])
+            self.assertEqual(items, [x.item for x in genome])
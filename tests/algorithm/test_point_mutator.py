@@ -0,0 +1,110 @@
+"""
+Contains unit tests for verifying that point mutation replaces individual
+fields of chromosomes.
+"""
+from unittest import TestCase
+
+from evored.algorithm.mutation import PointMutator
+from evored.gene_pool import RandomGenePool
+from evored.genome import PersistentGenome
+from evored.lang import OpCode, Modifier, AddressMode, default_modifier
+from tests import create_dat_genome, create_population
+
+
+class PointMutatorTest(TestCase):
+    """
+    Test suite for PointMutator.
+    """
+
+    def setUp(self):
+        self.mutator = PointMutator(RandomGenePool(
+            opcodes=[OpCode.Mov], modifiers=[Modifier.I],
+            addr_modes=[AddressMode.Direct], arg_range=(5000, 5001)))
+        self.params = {"mutator.rate": 1.0, "mutator.opcode_rate": 1.0,
+                       "mutator.modifier_rate": 0.0,
+                       "mutator.mode_rate": 0.0, "mutator.value_rate": 0.0}
+
+    def test_mutate_replaces_only_chosen_fields(self):
+        genome = create_dat_genome(range(0, 5), 12)
+        original = [node.item for node in genome]
+        output = self.mutator.mutate(genome, self.params)
+
+        self.assertIs(genome, output)
+        self.assertEqual(12, output.fitness)
+        for node, item in zip(output, original):
+            self.assertIsNot(item, node.item)
+            self.assertEqual(OpCode.Mov, node.item.ins.opcode)
+            self.assertEqual(Modifier.F, node.item.ins.modifier)
+            self.assertEqual(item.ins.arg_a, node.item.ins.arg_a)
+            self.assertEqual(item.ins.arg_b, node.item.ins.arg_b)
+
+    def test_mutate_leaves_genome_when_rates_are_zero(self):
+        params = dict(self.params, **{"mutator.opcode_rate": 0.0})
+        genome = create_dat_genome(range(0, 5))
+        original = [node.item for node in genome]
+
+        self.mutator.mutate(genome, params)
+        self.assertEqual(original, [node.item for node in genome])
+
+    def test_evolve_respects_genome_rate(self):
+        params = dict(self.params, **{"mutator.rate": 0.0})
+        genomes = [create_dat_genome(range(0, 3)) for _ in range(5)]
+        results = self.mutator.evolve(genomes, None, params)
+
+        for genome in results:
+            for node in genome:
+                self.assertEqual(OpCode.Dat, node.item.ins.opcode)
+
+    def test_evolve_creates_new_persistent_versions(self):
+        params = dict(self.params, **{"mutator.value_rate": 1.0})
+        genome = PersistentGenome.freeze(create_dat_genome(range(0, 3)))
+        result = self.mutator.evolve([genome], None, params)[0]
+
+        self.assertEqual([OpCode.Dat] * 3,
+                         [node.item.ins.opcode for node in genome])
+        for node in result:
+            self.assertEqual(OpCode.Mov, node.item.ins.opcode)
+            self.assertEqual(5000, node.item.ins.arg_a.value)
+            self.assertEqual(5000, node.item.ins.arg_b.value)
+
+    def test_evolve_population_replaces_fields_in_bulk(self):
+        params = dict(self.params, **{"mutator.mode_rate": 1.0})
+        population = create_population([3, 4], [1, 2])
+        result = self.mutator.evolve_population(population, None, params)
+
+        self.assertEqual([1, 2], result.fitness.tolist())
+        for before, after in zip(population, result):
+            for a, b in zip(before, after):
+                self.assertEqual(OpCode.Mov, b.item.ins.opcode)
+                self.assertEqual(AddressMode.Direct,
+                                 b.item.ins.arg_a.addr_mode)
+                self.assertEqual(a.item.ins.arg_b.value,
+                                 b.item.ins.arg_b.value)
+            self.assertEqual(OpCode.Dat, before.root.item.ins.opcode)
+
+    def test_evolve_population_respects_genome_rate(self):
+        params = dict(self.params, **{"mutator.rate": 0.0})
+        population = create_population([3, 4])
+        result = self.mutator.evolve_population(population, None, params)
+
+        self.assertEqual(population.instructions.tolist(),
+                         result.instructions.tolist())
+
+    def test_mutated_opcodes_are_canonical_in_canonical_pool(self):
+        mutator = PointMutator(RandomGenePool(opcodes=[OpCode.Jmp],
+                                              core_size=8000))
+        expected = default_modifier(OpCode.Jmp, AddressMode.Immediate,
+                                    AddressMode.Immediate)
+        genome = create_dat_genome(range(7999, 8002))
+        population = create_population([3])
+
+        for result in [mutator.mutate(genome, self.params),
+                       mutator.evolve_population(population, None,
+                                                 self.params).genome(0)]:
+            for node in result:
+                self.assertEqual(OpCode.Jmp, node.item.ins.opcode)
+                self.assertEqual(expected, node.item.ins.modifier)
+                self.assertEqual(AddressMode.Immediate,
+                                 node.item.ins.arg_b.addr_mode)
+        self.assertEqual([7999, 0, 1],
+                         [node.item.ins.arg_b.value for node in genome])
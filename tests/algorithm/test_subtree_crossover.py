@@ -0,0 +1,79 @@
+"""
+Contains unit tests to verify that subtree crossover exchanges branches
+within the configured limits.
+"""
+from unittest import TestCase
+
+from evored.algorithm.crossover import SubtreeCrossover
+from evored.genome import Genome, PersistentGenome
+from evored.tree import Tree
+
+
+class SubtreeCrossoverTest(TestCase):
+    """
+    Test suite for SubtreeCrossover.
+    """
+
+    def setUp(self):
+        self.crossover = SubtreeCrossover()
+        self.params = {}
+
+    def test_cross_exchanges_branches_and_keeps_fitness(self):
+        genome_a = Genome(list(range(0, 7)), 5)
+        genome_b = Genome(list(range(10, 13)), 7)
+
+        results = self.crossover.cross(genome_a, genome_b, self.params)
+        items_a = {node.item for node in results[0]}
+        items_b = {node.item for node in results[1]}
+
+        self.assertEqual(set(range(0, 7)) | set(range(10, 13)),
+                         items_a | items_b)
+        self.assertEqual(10, len(items_a) + len(items_b))
+        self.assertEqual([5, 7], [x.fitness for x in results])
+        for genome in results:
+            for node in genome:
+                if node is not genome.root:
+                    self.assertIn(node, [node.parent.left,
+                                         node.parent.right])
+            self.assertIsNone(genome.root.parent)
+
+    def test_cross_keeps_genomes_within_limits(self):
+        params = {"crossover.max_height": 4, "crossover.max_size": 9}
+        genomes = [Genome(list(range(x, x + 7))) for x in range(0, 80, 10)]
+
+        for _ in range(50):
+            for a, b in zip(genomes[::2], genomes[1::2]):
+                self.crossover.cross(a, b, params)
+
+        for genome in genomes:
+            self.assertTrue(genome.root.subtree_height() <= 4)
+            self.assertTrue(genome.root.subtree_size() <= 9)
+            self.assertEqual(genome.root.subtree_size(),
+                             len(list(genome)))
+
+    def test_cross_leaves_genomes_when_nothing_fits(self):
+        params = {"crossover.max_size": 1}
+        genome_a, genome_b = Genome([1, 2, 3]), Genome([4, 5])
+
+        self.crossover.cross(genome_a, genome_b, params)
+        self.assertEqual(Tree([1, 2, 3]), genome_a)
+        self.assertEqual(Tree([4, 5]), genome_b)
+
+    def test_full_parsimony_never_grows_genomes(self):
+        params = {"crossover.parsimony": 1.0}
+        genome_a, genome_b = Genome([1, 2, 3]), Genome([4, 5, 6])
+
+        for _ in range(20):
+            self.crossover.cross(genome_a, genome_b, params)
+            self.assertEqual(3, genome_a.root.subtree_size())
+            self.assertEqual(3, genome_b.root.subtree_size())
+
+    def test_cross_creates_new_persistent_versions(self):
+        genome_a = PersistentGenome(list(range(0, 7)), 5)
+        genome_b = PersistentGenome(list(range(10, 13)), 7)
+
+        results = self.crossover.cross(genome_a, genome_b, self.params)
+
+        self.assertEqual(10, len(results[0]) + len(results[1]))
+        self.assertEqual(list(range(0, 7)), [x.item for x in genome_a])
+        self.assertEqual([5, 7], [x.fitness for x in results])
@@ -8,8 +8,8 @@ from unittest import TestCase
 from pathos.multiprocessing import ProcessPool
 
 from evored.algorithm.crossover import UniformCrossover
-from evored.genome import Genome
-from tests import create_genomes
+from evored.genome import Genome, PersistentGenome
+from tests import create_genomes, create_population
 
 
 class UniformCrossoverTest(TestCase):
@@ -38,6 +38,47 @@ class UniformCrossoverTest(TestCase):
         results = self.crossover.cross(genome_a, genome_b, self.params)
         self.assertEqual(expected, results)
 
+    def test_cross_creates_new_persistent_versions(self):
+        genome_a = PersistentGenome([x for x in range(0, 10)], 5)
+        genome_b = PersistentGenome([x for x in range(20, 25)], 7)
+
+        results = self.crossover.cross(genome_a, genome_b, self.params)
+
+        self.assertEqual([20, 21, 22, 23, 24, 5, 6, 7, 8, 9],
+                         [x.item for x in results[0]])
+        self.assertEqual(list(range(0, 5)), [x.item for x in results[1]])
+        self.assertEqual(5, results[0].fitness)
+        self.assertEqual(list(range(0, 10)), [x.item for x in genome_a])
+        self.assertIs(genome_a.root.left.right.right,
+                      results[0].root.left.right.right)
+
+    def test_cross_records_lineage(self):
+        genome_a = Genome([x for x in range(0, 4)], 3)
+        genome_b = Genome([x for x in range(20, 22)], 9)
+        hashes = (hash(genome_a), hash(genome_b))
+
+        results = self.crossover.cross(genome_a, genome_b, self.params)
+
+        self.assertEqual(hashes, results[0].lineage.parents)
+        self.assertEqual((3, 9), results[0].lineage.scores)
+        self.assertEqual(0.5, results[0].lineage.fraction)
+        self.assertEqual(6, results[0].lineage.estimate())
+        self.assertEqual(hashes[::-1], results[1].lineage.parents)
+        self.assertEqual(0, results[1].lineage.fraction)
+        self.assertEqual(3, results[1].lineage.estimate())
+
+    def test_cross_records_persistent_lineage(self):
+        genome_a = PersistentGenome([x for x in range(0, 10)], 5)
+        genome_b = PersistentGenome([x for x in range(20, 25)], 7)
+
+        results = self.crossover.cross(genome_a, genome_b, self.params)
+
+        self.assertEqual((5, 7), results[0].lineage.scores)
+        self.assertEqual(0.5, results[0].lineage.fraction)
+        self.assertEqual(0, results[1].lineage.fraction)
+        self.assertIsNone(genome_a.lineage)
+        self.assertIs(results[1].lineage, results[1].thaw().lineage)
+
     def test_uniform_crossover_in_parallel(self):
         genomes = create_genomes(10)
         fitness_scores = [x.fitness for x in genomes]
@@ -50,3 +91,35 @@ class UniformCrossoverTest(TestCase):
         for i in range(0, len(genomes), 2):
             self.assertEqual(expected[i], results[i + 1])
             self.assertEqual(expected[i + 1], results[i])
+
+    def test_evolve_population_swaps_aligned_positions(self):
+        population = create_population([3, 5])
+        results = self.crossover.evolve_population(population, None,
+                                                   self.params)
+
+        self.assertEqual(2, len(results))
+        values = sorted([[node.item.ins.arg_b.value for node in genome]
+                         for genome in results])
+        self.assertEqual([[0, 1, 2, 1003, 1004], [1000, 1001, 1002]], values)
+
+    def test_evolve_population_keeps_genome_fitness(self):
+        population = create_population([4] * 10, list(range(10)))
+        results = self.crossover.evolve_population(population, None,
+                                                   self.params)
+
+        self.assertEqual(list(range(10)), sorted(results.fitness.tolist()))
+        self.assertEqual(population.sizes.tolist(), results.sizes.tolist())
+        for genome in results:
+            owners = {node.item.ins.arg_b.value // 1000 for node in genome}
+            self.assertEqual(1, len(owners))
+            self.assertNotEqual({genome.fitness}, owners)
+
+    def test_evolve_population_without_crossing_copies(self):
+        population = create_population([2, 3, 4], [1, 2, 3])
+        results = self.crossover.evolve_population(
+            population, None, {"crossover.rate": 0.0,
+                               "crossover.uniform_rate": 1.0})
+
+        self.assertEqual(sorted(population.to_genomes()),
+                         sorted(results.to_genomes()))
+        self.assertIsNot(population.instructions, results.instructions)
@@ -0,0 +1,124 @@
+"""
+Contains unit tests for verifying that benchmark warriors are loaded once and
+shared correctly between processes.
+"""
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from pathos.multiprocessing import ProcessPool
+
+from evored.fitness.library import BenchmarkLibrary
+from evored.fitness.writing import render_instruction, render_warrior
+from evored.genome import Warrior
+from evored.lang import OpCode, Modifier, AddressMode, Instruction, Argument
+
+
+def count_instructions(handle, path):
+    """
+    Attaches to a shared library in a worker process and counts the
+    instructions of one of its benchmarks.
+
+    :param handle: The handle of the shared library.
+    :param path: The path of the benchmark to count.
+    :return: The number of instructions and the first instruction.
+    """
+    library = BenchmarkLibrary.attach(handle)
+    try:
+        benchmark = library[path]
+        return len(benchmark), str(benchmark.instructions[0])
+    finally:
+        library.close()
+
+
+class BenchmarkLibraryTest(TestCase):
+    """
+    Test suite for BenchmarkLibrary.
+    """
+
+    DWARF = [Instruction(OpCode.Add, Modifier.AB,
+                         Argument(AddressMode.Immediate, 4),
+                         Argument(AddressMode.Direct, 3)),
+             Instruction(OpCode.Mov, Modifier.I,
+                         Argument(AddressMode.Direct, 2),
+                         Argument(AddressMode.B, 2)),
+             Instruction(OpCode.Jmp, Modifier.B,
+                         Argument(AddressMode.Direct, -2),
+                         Argument(AddressMode.Direct, 0)),
+             Instruction(OpCode.Dat, Modifier.F,
+                         Argument(AddressMode.Immediate, 0),
+                         Argument(AddressMode.Immediate, 0))]
+
+    IMP = [Instruction(OpCode.Mov, Modifier.I,
+                       Argument(AddressMode.Direct, 0),
+                       Argument(AddressMode.Direct, 1))]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ProcessPool(nodes=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        cls.pool.join()
+        cls.pool.clear()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+
+        table = {render_instruction(ins): ins
+                 for ins in BenchmarkLibraryTest.DWARF +
+                 BenchmarkLibraryTest.IMP}
+        for name, ins_list in [("dwarf.red", BenchmarkLibraryTest.DWARF),
+                               ("imp.red", BenchmarkLibraryTest.IMP)]:
+            path = os.path.join(self.directory, name)
+            with open(path, "w") as f:
+                f.write(render_warrior(Warrior(ins_list), name))
+            self.paths.append(path)
+
+        self.library = BenchmarkLibrary(
+            self.paths, lambda lines: [table[line] for line in lines
+                                       if not line.startswith(";")])
+
+    def tearDown(self):
+        self.library.close()
+        shutil.rmtree(self.directory)
+
+    def test_load_parses_and_hashes_files(self):
+        dwarf = self.library[self.paths[0]]
+
+        self.assertEqual(4, len(dwarf))
+        self.assertEqual("dwarf.red", dwarf.name)
+        self.assertEqual(64, len(dwarf.digest))
+        self.assertEqual(BenchmarkLibraryTest.DWARF, dwarf.instructions)
+        self.assertIs(dwarf, self.library.find(dwarf.digest))
+
+    def test_load_uses_redcode_parser_by_default(self):
+        library = BenchmarkLibrary(self.paths)
+
+        self.assertEqual(BenchmarkLibraryTest.DWARF,
+                         library[self.paths[0]].instructions)
+        self.assertEqual(self.library[self.paths[1]].digest,
+                         library[self.paths[1]].digest)
+
+    def test_attach_reads_shared_instructions(self):
+        handle = self.library.share()
+        attached = BenchmarkLibrary.attach(handle)
+
+        try:
+            for benchmark in self.library:
+                shared = attached[benchmark.path]
+                self.assertEqual(benchmark.digest, shared.digest)
+                self.assertEqual(benchmark.instructions, shared.instructions)
+        finally:
+            attached.close()
+
+    def test_workers_share_library(self):
+        handle = self.library.share()
+        results = self.pool.map(count_instructions, [handle, handle],
+                                self.paths)
+
+        self.assertEqual([4, 1], [count for count, _ in results])
+        self.assertEqual(str(BenchmarkLibraryTest.IMP[0]), results[1][1])
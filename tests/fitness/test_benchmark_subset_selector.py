@@ -0,0 +1,49 @@
+"""
+Contains unit tests for verifying that representative benchmark subsets are
+chosen and validated correctly.
+"""
+from random import randint
+from unittest import TestCase
+
+from evored.fitness.benchmarks import BenchmarkSubsetSelector, rank, spearman
+
+
+class BenchmarkSubsetSelectorTest(TestCase):
+    """
+    Test suite for BenchmarkSubsetSelector.
+    """
+
+    def setUp(self):
+        self.benchmarks = ["a.red", "b.red", "c.red", "d.red"]
+        self.selector = BenchmarkSubsetSelector(self.benchmarks, size=1,
+                                                revalidate=5)
+
+    def test_rank_averages_ties(self):
+        self.assertEqual([0.0, 2.5, 2.5, 1.0], rank([1, 9, 9, 4]))
+
+    def test_spearman_of_identical_and_reversed_orderings(self):
+        self.assertAlmostEqual(1.0, spearman([1, 2, 3, 4], [10, 20, 30, 40]))
+        self.assertAlmostEqual(-1.0, spearman([1, 2, 3, 4], [4, 3, 2, 1]))
+        self.assertEqual(0.0, spearman([1, 1, 1], [1, 2, 3]))
+
+    def test_full_set_is_used_until_subset_is_chosen(self):
+        self.assertEqual(self.benchmarks, self.selector.select(1))
+
+    def test_choose_prefers_benchmark_that_tracks_total(self):
+        matrix = []
+        for strength in range(20):
+            matrix.append([randint(0, 100), strength * 10, randint(0, 100),
+                           strength * 3])
+        self.selector.update(0, matrix)
+
+        self.assertEqual([1], self.selector.subset)
+        self.assertEqual(["b.red"], self.selector.select(1))
+        self.assertEqual(self.benchmarks, self.selector.select(5))
+
+    def test_update_reports_correlation_of_previous_subset(self):
+        matrix = [[x, x, 0, 0] for x in range(10)]
+        self.assertIsNone(self.selector.update(0, matrix))
+
+        rho = self.selector.update(5, matrix)
+        self.assertAlmostEqual(1.0, rho)
+        self.assertEqual([(5, rho)], self.selector.correlations)
@@ -0,0 +1,59 @@
+"""
+Contains unit tests for verifying that warrior scores are credited to the
+chromosomes they were realized from.
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from evored.fitness.credit import CreditAssigner
+from evored.fitness.evaluation import FitnessEvaluator
+from evored.population import WalkBatch
+from tests import create_population
+from tests.fitness.test_fitness_evaluator import LengthScoreProvider
+
+
+class CreditAssignerTest(TestCase):
+    """
+    Test suite for CreditAssigner.
+    """
+
+    def setUp(self):
+        self.population = create_population([1, 4])
+        self.walks = WalkBatch(np.array([0, 1, 1]), np.array([0, 1, 4, 6]),
+                               np.array([0, 1, 2, 4, 1, 3]))
+
+    def test_assign_credits_mean_of_visiting_walks(self):
+        credited = CreditAssigner().assign(self.population, self.walks,
+                                           [5, 6, 2])
+
+        self.assertEqual(5, credited)
+        self.assertEqual([5, 4, 6, 2, 6],
+                         self.population.chromosome_fitness.tolist())
+
+    def test_accumulate_spans_rounds_and_rate_blends(self):
+        self.population.chromosome_fitness[:] = 10
+        assigner = CreditAssigner(rate=0.5)
+        assigner.accumulate(self.population, self.walks, [5, 6, 2])
+        assigner.accumulate(self.population, self.walks, [5, 6, 2])
+
+        self.assertEqual(5, assigner.apply(self.population))
+        self.assertEqual([7.5, 7, 8, 6, 8],
+                         self.population.chromosome_fitness.tolist())
+        self.assertEqual(0, assigner.apply(self.population))
+
+    def test_unvisited_chromosomes_keep_fitness(self):
+        walks = WalkBatch(np.array([1]), np.array([0, 2]), np.array([1, 3]))
+        self.population.chromosome_fitness[:] = 1
+        CreditAssigner().assign(self.population, walks, [9])
+
+        self.assertEqual([1, 9, 1, 9, 1],
+                         self.population.chromosome_fitness.tolist())
+
+    def test_evaluator_credits_population(self):
+        evaluator = FitnessEvaluator(LengthScoreProvider(), CreditAssigner())
+        population = create_population([3, 7])
+        evaluator.evolve_population(population, None, {"fitness.walks": 50})
+
+        self.assertEqual([2, 2, 2], population.chromosome_fitness[:3].tolist())
+        self.assertEqual([3] * 7, population.chromosome_fitness[3:].tolist())
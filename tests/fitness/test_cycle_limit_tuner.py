@@ -0,0 +1,69 @@
+"""
+Contains unit tests for verifying that the cycle limit is tuned correctly
+from battle outcomes.
+"""
+from unittest import TestCase
+
+from evored.fitness.scoring import PmarsScoreProvider, ScoringException, \
+    ShardedPmarsScoreProvider
+from evored.fitness.tuning import CycleLimitTuner
+
+
+class CycleLimitTunerTest(TestCase):
+    """
+    Test suite for CycleLimitTuner.
+    """
+
+    def setUp(self):
+        self.tuner = CycleLimitTuner(max_cycles=10000, min_cycles=1000,
+                                     tolerance=0.05, shrink=0.5,
+                                     revalidate=100)
+
+    def test_limit_starts_at_maximum(self):
+        self.assertEqual(["-c", "10000"], self.tuner.options(0))
+
+    def test_limit_shrinks_while_ties_stay_within_tolerance(self):
+        self.tuner.record(0, 10, 100)
+        self.tuner.record(1, 12, 100)
+        self.assertEqual(0.1, self.tuner.baseline)
+        self.assertEqual(5000, self.tuner.limit)
+
+        self.tuner.record(2, 30, 100)
+        self.assertEqual(2500, self.tuner.limit)
+
+        self.tuner.finish()
+        self.assertEqual(5000, self.tuner.limit)
+
+    def test_limit_never_leaves_bounds(self):
+        for generation in range(20):
+            self.tuner.record(generation, 0, 100)
+        self.assertEqual(1000, self.tuner.limit)
+
+    def test_limit_is_restored_to_revalidate_baseline(self):
+        tuner = CycleLimitTuner(max_cycles=10000, shrink=0.5, revalidate=2)
+        tuner.record(0, 0, 100)
+        tuner.record(1, 0, 100)
+        tuner.finish()
+
+        self.assertEqual(10000, tuner.limit)
+        self.assertEqual([10000, 5000],
+                         [entry["limit"] for entry in tuner.history])
+
+    def test_provider_parses_results_of_two_warrior_battle(self):
+        provider = ShardedPmarsScoreProvider({"pmars.adaptive_cycles": True})
+        output = ["Imp by A. K. Dewdney scores 150",
+                  "Results: 20 5 25",
+                  "Dwarf by A. K. Dewdney scores 90"]
+
+        self.assertEqual([20, 5, 25], provider.parse_results(output))
+        self.assertEqual(["-c", str(CycleLimitTuner.DEFAULT_MAX_CYCLES)],
+                         provider.cycle_options({}))
+
+    def test_provider_rejects_adaptive_limit_without_one_on_one_battles(self):
+        self.assertRaises(ScoringException, PmarsScoreProvider,
+                          {"pmars.adaptive_cycles": True})
+
+    def test_provider_uses_fixed_limit_when_not_adaptive(self):
+        provider = PmarsScoreProvider({"pmars.max_cycles": 5000})
+        self.assertEqual(["-c", "5000"], provider.cmd[-2:])
+        self.assertEqual([], provider.cycle_options({}))
@@ -0,0 +1,74 @@
+"""
+Contains unit tests for verifying that genomes are scored by the expected
+fitness of their walks.
+"""
+from unittest import TestCase
+
+from evored.fitness.evaluation import ExpectedFitnessEvaluator
+from evored.fitness.scoring import ScoreProvider
+from evored.genome import PersistentGenome
+from tests import create_dat_genome
+
+
+class SummingScoreProvider(ScoreProvider):
+    """
+    A test implementation of ScoreProvider that scores each warrior by the
+    sum of its B-field values and records every warrior it scores.
+    """
+
+    def __init__(self):
+        self.scored = []
+
+    def calculate(self, warriors, file_prefix, params):
+        self.scored.extend(warriors)
+        return [sum(ins.arg_b.value for ins in w.ins_list) for w in warriors]
+
+
+class ExpectedFitnessEvaluatorTest(TestCase):
+    """
+    Test suite for ExpectedFitnessEvaluator.
+    """
+
+    def setUp(self):
+        self.provider = SummingScoreProvider()
+        self.evaluator = ExpectedFitnessEvaluator(self.provider)
+
+    def test_evaluate_weights_every_walk(self):
+        genome = create_dat_genome([1, 2, 3, 4, 5])
+        scores = self.evaluator.evaluate([genome], {})
+
+        self.assertEqual([0.25 * 7 + 0.25 * 8 + 0.5 * 4], scores)
+        self.assertEqual(3, len(self.provider.scored))
+
+    def test_evaluate_simulates_identical_warriors_once(self):
+        genomes = [create_dat_genome([1, 2, 2]), create_dat_genome([1, 2]),
+                   PersistentGenome.freeze(create_dat_genome([1, 2, 2]))]
+        scores = self.evaluator.evaluate(genomes, {})
+
+        self.assertEqual([3, 3, 3], scores)
+        self.assertEqual(1, len(self.provider.scored))
+
+    def test_evaluate_simulates_canonical_warriors_once(self):
+        genomes = [create_dat_genome([1, 2]), create_dat_genome([81, 2])]
+        scores = self.evaluator.evaluate(genomes, {"pmars.core_size": 80})
+
+        self.assertEqual([3, 3], scores)
+        self.assertEqual(1, len(self.provider.scored))
+
+    def test_evolve_replaces_fitness(self):
+        genome = create_dat_genome([1, 2, 3], 40)
+        self.evaluator.evolve([genome], None, {})
+
+        self.assertEqual(3.5, genome.fitness)
+        self.assertEqual(1, genome.evaluations)
+
+    def test_large_genomes_are_sampled_without_bias(self):
+        genome = create_dat_genome(range(0, 63))
+        exact = self.evaluator.evaluate([genome], {})[0]
+        params = {"fitness.max_walks": 4, "fitness.samples": 8}
+
+        estimates = [self.evaluator.evaluate([genome], params)[0]
+                     for _ in range(200)]
+        self.assertAlmostEqual(exact, sum(estimates) / len(estimates),
+                               delta=2)
+        self.assertTrue(len(self.provider.scored) < 32 + 200 * 12)
@@ -0,0 +1,72 @@
+"""
+Contains unit tests for verifying that warriors realized from genomes and
+populations are scored correctly.
+"""
+from unittest import TestCase
+
+from evored.fitness.evaluation import FitnessEvaluator
+from evored.fitness.scoring import ScoreProvider
+from tests import create_dat_genome, create_population
+
+
+class LengthScoreProvider(ScoreProvider):
+    """
+    A test implementation of ScoreProvider that scores each warrior by its
+    number of instructions.
+    """
+
+    def calculate(self, warriors, file_prefix, params):
+        return [len(w.ins_list) for w in warriors]
+
+
+class GenerationScoreProvider(ScoreProvider):
+    """
+    A test implementation of ScoreProvider that scores each warrior by the
+    generation it is simulated in.
+    """
+
+    def calculate(self, warriors, file_prefix, params):
+        return [params["sim.generation"]] * len(warriors)
+
+
+class FitnessEvaluatorTest(TestCase):
+    """
+    Test suite for FitnessEvaluator.
+    """
+
+    def setUp(self):
+        self.evaluator = FitnessEvaluator(LengthScoreProvider())
+
+    def test_evolve_replaces_fitness(self):
+        genomes = [create_dat_genome([1, 2], 30), create_dat_genome([1], 8)]
+        self.evaluator.evolve(genomes, None, {})
+
+        self.assertEqual([2, 1], [g.fitness for g in genomes])
+        self.assertEqual([1, 1], [g.evaluations for g in genomes])
+
+    def test_evolve_population_averages_walks(self):
+        population = create_population([1, 4, 0, 3], [9, 9, 9, 9])
+        result = self.evaluator.evolve_population(
+            population, None, {"fitness.walks": 200, "fitness.batch_size": 64})
+
+        self.assertIs(population, result)
+        self.assertEqual([200, 200, 0, 200], result.evaluations.tolist())
+        self.assertEqual([1, 0, 2], result.fitness[[0, 2, 3]].tolist())
+        self.assertAlmostEqual(2.5, result.fitness[1], delta=0.15)
+        self.assertEqual([0, 0], result.m2[[0, 3]].tolist())
+        self.assertAlmostEqual(50, result.m2[1], delta=5)
+
+    def test_generations_are_passed_to_provider(self):
+        evaluator = FitnessEvaluator(GenerationScoreProvider())
+        genomes = [create_dat_genome([1])]
+        population = create_population([1, 2])
+
+        self.assertEqual([0], evaluator.evaluate(genomes, {}))
+        for generation in range(3):
+            evaluator.evolve(genomes, None, {})
+            self.assertEqual(generation, genomes[0].fitness)
+        evaluator.evolve_population(population, None, {})
+        self.assertEqual([3, 3], population.fitness.tolist())
+
+        evaluator.evolve(genomes, None, {"sim.generation": 9})
+        self.assertEqual(9, genomes[0].fitness)
@@ -43,3 +43,27 @@ class FitnessableTest(TestCase):
 
         for i in range(1, len(objs)):
             self.assertTrue(objs[i].fitness >= objs[i - 1].fitness)
+
+    def test_add_score_keeps_running_mean_and_variance(self):
+        obj = TestFitness(1000)
+        scores = [4, 8, 15, 16, 23, 42]
+
+        for score in scores:
+            obj.add_score(score)
+
+        mean = sum(scores) / len(scores)
+        variance = sum((x - mean) ** 2 for x in scores) / (len(scores) - 1)
+
+        self.assertEqual(len(scores), obj.evaluations)
+        self.assertAlmostEqual(mean, obj.fitness)
+        self.assertAlmostEqual(variance, obj.variance)
+
+    def test_reset_score_discards_previous_scores(self):
+        obj = TestFitness()
+        obj.add_score(10)
+        obj.add_score(20)
+        obj.reset_score(5)
+
+        self.assertEqual(0, obj.evaluations)
+        self.assertEqual(5, obj.fitness)
+        self.assertEqual(0, obj.variance)
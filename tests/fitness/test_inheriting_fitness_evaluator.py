@@ -0,0 +1,79 @@
+"""
+Contains unit tests for verifying that offspring inherit estimated fitness
+in place of a fraction of simulations.
+"""
+from unittest import TestCase
+
+from evored.fitness.evaluation import InheritingFitnessEvaluator
+from evored.genome import Lineage
+from tests import create_dat_genome
+from tests.fitness.test_fitness_evaluator import LengthScoreProvider
+
+
+def create_offspring(length, estimate):
+    """
+    Creates a genome of the specified length whose lineage estimates the
+    specified fitness.
+
+    :param length: The number of chromosomes, i.e. its simulated score.
+    :param estimate: The fitness estimated from its parents.
+    :return: A new genome.
+    """
+    genome = create_dat_genome(list(range(length)))
+    genome.lineage = Lineage((1, 2), (estimate, estimate), 0.5)
+    return genome
+
+
+class InheritingFitnessEvaluatorTest(TestCase):
+    """
+    Test suite for InheritingFitnessEvaluator.
+    """
+
+    def setUp(self):
+        self.evaluator = InheritingFitnessEvaluator(LengthScoreProvider())
+        self.params = {"inheritance.fraction": 0.5,
+                       "inheritance.period": 3}
+
+    def test_evolve_simulates_genomes_without_lineage(self):
+        genomes = [create_dat_genome([1], 10), create_dat_genome([1, 2], 10)]
+        self.evaluator.evolve(genomes, None, self.params)
+
+        self.assertEqual([1, 2], [g.fitness for g in genomes])
+        self.assertEqual(0, self.evaluator.statistics.inherited)
+        self.assertEqual(2, self.evaluator.statistics.simulated)
+
+    def test_evolve_inherits_fraction_of_offspring(self):
+        genomes = [create_offspring(1, 4) for _ in range(10)] + \
+                  [create_dat_genome([1, 2])]
+        self.evaluator.evolve(genomes, None, self.params)
+
+        inherited = [g for g in genomes if g.evaluations == 0]
+        self.assertEqual(5, len(inherited))
+        self.assertEqual(5, self.evaluator.statistics.inherited)
+        self.assertEqual(6, self.evaluator.statistics.simulated)
+        self.assertEqual([1] * 5, [g.fitness for g in inherited])
+        self.assertEqual([None] * 11, [g.lineage for g in genomes])
+
+    def test_evolve_calibrates_bias_and_error(self):
+        genomes = [create_offspring(2, 5), create_offspring(1, 4)]
+        self.evaluator.evolve(genomes, None, {"inheritance.fraction": 0})
+
+        self.assertEqual(-3, self.evaluator.statistics.bias)
+        self.assertEqual(3, self.evaluator.statistics.error)
+        self.assertEqual(2, self.evaluator.statistics.calibrations)
+
+        genomes = [create_offspring(3, 1)]
+        self.evaluator.evolve(genomes, None, {"inheritance.fraction": 0,
+                                              "inheritance.smoothing": 0.5})
+        self.assertEqual(-1, self.evaluator.statistics.bias)
+        self.assertEqual(2, self.evaluator.statistics.error)
+
+    def test_evolve_simulates_everything_each_period(self):
+        for generation in range(1, 7):
+            genomes = [create_offspring(1, 4) for _ in range(4)]
+            self.evaluator.evolve(genomes, None, self.params)
+
+            expected = 0 if generation % 3 == 0 else 2
+            self.assertEqual(expected, self.evaluator.statistics.inherited)
+            self.assertEqual(4 - expected,
+                             self.evaluator.statistics.simulated)
@@ -0,0 +1,71 @@
+"""
+Contains unit tests for verifying that batches of battles are correctly
+divided into jobs and merged back together.
+"""
+from unittest import TestCase
+
+from evored.fitness.planning import MatchupPlanner
+from evored.genome import Warrior
+
+
+class MatchupPlannerTest(TestCase):
+    """
+    Test suite for MatchupPlanner.
+    """
+
+    def setUp(self):
+        self.planner = MatchupPlanner(workers=3, chunk_size=2)
+        self.warriors = [Warrior([0] * size) for size in [2, 8, 4]]
+        self.opponents = ["a.red", "b.red", "c.red"]
+
+    def test_plan_covers_every_battle_once(self):
+        jobs = self.planner.plan(self.warriors, self.opponents)
+        battles = sorted((job.index, x) for job in jobs for x in job.opponents)
+
+        expected = [(w, o) for w in range(3) for o in range(3)]
+        self.assertEqual(expected, battles)
+        for job in jobs:
+            self.assertLessEqual(len(job.opponents), 2)
+
+    def test_plan_orders_longest_jobs_first(self):
+        jobs = self.planner.plan(self.warriors, self.opponents)
+        costs = [job.cost for job in jobs]
+
+        self.assertEqual(sorted(costs, reverse=True), costs)
+        self.assertEqual(1, jobs[0].index)
+
+    def test_record_updates_opponent_durations(self):
+        jobs = self.planner.plan(self.warriors[:1], self.opponents[:1])
+        self.planner.record(jobs[0], self.opponents, 4.0)
+
+        self.assertEqual(2.0, self.planner.duration("a.red"))
+        self.assertEqual(2.0, self.planner.duration("b.red"))
+        self.assertEqual(6.0, self.planner.estimate(3, ["a.red"]))
+
+    def test_run_merges_scores_in_original_order(self):
+        def battle(index, opponent):
+            return index * 10 + self.opponents.index(opponent)
+
+        scores = self.planner.run(self.warriors, self.opponents, battle)
+        expected = [[w * 10 + o for o in range(3)] for w in range(3)]
+        self.assertEqual(expected, scores)
+
+    def test_plan_peers_covers_every_pair_once(self):
+        jobs = self.planner.plan_peers(self.warriors)
+        pairs = sorted((job.index, x) for job in jobs for x in job.opponents)
+
+        self.assertEqual([(0, 1), (0, 2), (1, 2)], pairs)
+
+    def test_run_peers_fills_both_scores_from_one_battle(self):
+        battles = []
+
+        def battle(index, other):
+            battles.append((index, other))
+            return index * 10 + other, other * 10 + index
+
+        scores = self.planner.run_peers(self.warriors, battle)
+        expected = [[0 if w == o else w * 10 + o for o in range(3)]
+                    for w in range(3)]
+
+        self.assertEqual(expected, scores)
+        self.assertEqual(3, len(battles))
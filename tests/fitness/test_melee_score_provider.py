@@ -0,0 +1,58 @@
+"""
+Contains unit tests for verifying that melee scoring groups warriors and
+combines their scores correctly.
+"""
+import shutil
+import tempfile
+from unittest import TestCase
+
+from evored.fitness.scoring import MeleePmarsScoreProvider
+from evored.genome import Warrior
+from evored.lang import OpCode, Modifier, AddressMode, Instruction, Argument
+
+
+class FixedMeleePmarsScoreProvider(MeleePmarsScoreProvider):
+    """
+    A test implementation of MeleePmarsScoreProvider that awards each warrior
+    a score equal to the number in its file name instead of running PMARS.
+    """
+
+    def simulate(self, file_paths, params):
+        return [int(path[path.rindex("_") + 1:-4]) for path in file_paths]
+
+
+class MeleePmarsScoreProviderTest(TestCase):
+    """
+    Test suite for MeleePmarsScoreProvider.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.params = {"sim.temp_dir": self.directory,
+                       "melee.group_size": 3,
+                       "melee.passes": 4}
+        self.provider = FixedMeleePmarsScoreProvider(self.params)
+
+    def tearDown(self):
+        self.provider.workspaces.close()
+        shutil.rmtree(self.directory)
+
+    def test_create_groups_covers_every_warrior_once(self):
+        groups = self.provider.create_groups(10, 3)
+        indices = sorted(x for group in groups for x in group)
+
+        self.assertEqual(list(range(10)), indices)
+        self.assertEqual(3, len(groups))
+        self.assertEqual(4, len(groups[-1]))
+
+    def test_calculate_averages_and_assigns_fitness(self):
+        ins = Instruction(OpCode.Dat, Modifier.Empty,
+                          Argument(AddressMode.Immediate, 0),
+                          Argument(AddressMode.Immediate, 0))
+        warriors = [Warrior([ins]) for _ in range(6)]
+
+        scores = self.provider.calculate(warriors, "melee", self.params)
+
+        self.assertEqual([float(x) for x in range(6)], scores)
+        for warrior, score in zip(warriors, scores):
+            self.assertEqual(score, warrior.fitness)
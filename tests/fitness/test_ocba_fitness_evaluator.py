@@ -0,0 +1,77 @@
+"""
+Contains unit tests for verifying that additional evaluations are allocated
+only where they affect selection.
+"""
+from random import gauss
+from unittest import TestCase
+
+from evored.fitness.evaluation import OcbaFitnessEvaluator
+from evored.fitness.scoring import ScoreProvider
+from tests import create_dat_genome
+
+
+class NoisyScoreProvider(ScoreProvider):
+    """
+    A test implementation of ScoreProvider that scores each warrior by the
+    B-field value of its first instruction plus Gaussian noise.
+    """
+
+    def __init__(self):
+        self.simulations = 0
+
+    def calculate(self, warriors, file_prefix, params):
+        self.simulations += len(warriors)
+        return [w.ins_list[0].arg_b.value + gauss(0, 5) for w in warriors]
+
+
+class OcbaFitnessEvaluatorTest(TestCase):
+    """
+    Test suite for OcbaFitnessEvaluator.
+    """
+
+    def setUp(self):
+        self.provider = NoisyScoreProvider()
+        self.evaluator = OcbaFitnessEvaluator(self.provider)
+
+    def test_allocate_favors_genomes_near_boundary(self):
+        genomes = [create_dat_genome([0]) for _ in range(4)]
+        for genome, scores in zip(genomes, [[100, 104], [52, 56], [48, 44],
+                                            [0, 4]]):
+            for score in scores:
+                genome.add_score(score)
+
+        allocation = self.evaluator.allocate(genomes, 2, 20)
+
+        self.assertEqual(20, sum(allocation.values()))
+        self.assertGreater(allocation.get(1, 0), allocation.get(0, 0))
+        self.assertGreater(allocation.get(2, 0), allocation.get(3, 0))
+
+    def test_allocate_returns_nothing_when_all_are_selected(self):
+        genomes = [create_dat_genome([x]) for x in range(4)]
+        self.assertEqual({}, self.evaluator.allocate(genomes, 4, 10))
+
+    def test_evolve_respects_budget(self):
+        genomes = [create_dat_genome([x * 10]) for x in range(10)]
+        params = {"ocba.budget": 15, "ocba.increment": 5}
+
+        self.evaluator.evolve(genomes, None, params)
+
+        self.assertEqual(25, self.provider.simulations)
+        self.assertEqual(25, sum(g.evaluations for g in genomes))
+        for genome in genomes:
+            self.assertGreaterEqual(genome.evaluations, 1)
+
+    def test_evaluate_uses_batches_when_batch_size_is_given(self):
+        batches = []
+
+        def calculate_many(warrior_batches, file_prefix, params):
+            batches.extend(len(batch) for batch in warrior_batches)
+            return [self.provider.calculate(batch, file_prefix, params)
+                    for batch in warrior_batches]
+
+        self.provider.calculate_many = calculate_many
+        genomes = [create_dat_genome([x]) for x in range(7)]
+        scores = self.evaluator.evaluate(genomes, {"fitness.batch_size": 3})
+
+        self.assertEqual([3, 3, 1], batches)
+        self.assertEqual(7, len(scores))
@@ -0,0 +1,55 @@
+"""
+Contains unit tests for verifying that warrior placements are pinned and
+reproducible.
+"""
+from unittest import TestCase
+
+from evored.fitness.scoring import PmarsScoreProvider
+from evored.fitness.seeding import SeedSchedule
+
+
+class SeedScheduleTest(TestCase):
+    """
+    Test suite for SeedSchedule.
+    """
+
+    def test_position_is_reproducible_from_base_seed(self):
+        a = SeedSchedule(42)
+        b = SeedSchedule(42)
+
+        for generation in range(20):
+            self.assertEqual(a.position(generation), b.position(generation))
+
+    def test_position_respects_minimum_distance(self):
+        schedule = SeedSchedule(7, core_size=300, min_distance=100)
+
+        for generation in range(100):
+            position = schedule.position(generation)
+            self.assertGreaterEqual(position, 100)
+            self.assertLessEqual(position, 200)
+
+    def test_position_is_recorded_in_history(self):
+        schedule = SeedSchedule(3)
+        positions = {x: schedule.position(x) for x in range(5)}
+        self.assertEqual(positions, schedule.history)
+
+    def test_options_pin_position_and_series(self):
+        schedule = SeedSchedule(11)
+        expected = ["-F", str(schedule.position(4)), "-f"]
+        self.assertEqual(expected, schedule.options(4))
+
+    def test_provider_adds_options_only_when_seeded(self):
+        plain = PmarsScoreProvider({})
+        seeded = PmarsScoreProvider({"pmars.seed": 11})
+        params = {"sim.generation": 4}
+
+        self.assertEqual([], plain.seed_options(params))
+        self.assertEqual(SeedSchedule(11).options(4),
+                         seeded.seed_options(params))
+
+    def test_provider_passes_min_distance(self):
+        provider = PmarsScoreProvider({"pmars.seed": 11,
+                                       "pmars.min_distance": 250})
+
+        self.assertEqual(["-d", "250"], provider.cmd[-2:])
+        self.assertEqual(250, provider.seeds.min_distance)
@@ -0,0 +1,63 @@
+"""
+Contains unit tests for verifying that warriors are correctly converted to
+Redcode source files.
+"""
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from evored.fitness.writing import WarriorWriter, render_instruction, \
+    render_warrior
+from evored.genome import Warrior
+from evored.lang import OpCode, Modifier, AddressMode, Instruction, Argument
+
+
+class WarriorWriterTest(TestCase):
+    """
+    Test suite for WarriorWriter.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.writer = WarriorWriter(self.directory)
+        self.warrior = Warrior([
+            Instruction(OpCode.Mov, Modifier.I,
+                        Argument(AddressMode.Direct, 0),
+                        Argument(AddressMode.Direct, 1)),
+            Instruction(OpCode.Dat, Modifier.Empty,
+                        Argument(AddressMode.Immediate, 4),
+                        Argument(AddressMode.Immediate, 0))
+        ])
+
+    def tearDown(self):
+        self.writer.close()
+        shutil.rmtree(self.directory)
+
+    def test_render_instruction_is_cached(self):
+        ins = self.warrior.ins_list[0]
+        self.assertEqual(str(ins), render_instruction(ins))
+        self.assertIs(render_instruction(ins), render_instruction(ins))
+
+    def test_render_warrior_matches_write(self):
+        file_path = os.path.join(self.directory, "single.RED")
+        self.warrior.write(file_path)
+
+        with open(file_path) as f:
+            self.assertEqual(render_warrior(self.warrior, file_path), f.read())
+
+    def test_paths_use_directory_and_prefix(self):
+        expected = [os.path.join(self.directory, "gen_0.RED"),
+                    os.path.join(self.directory, "gen_1.RED")]
+        self.assertEqual(expected, self.writer.paths(2, "gen"))
+
+    def test_submit_writes_batch_in_background(self):
+        warriors = [self.warrior for _ in range(5)]
+        file_paths = self.writer.paths(len(warriors), "batch")
+
+        self.writer.submit(warriors, file_paths).result()
+
+        for file_path in file_paths:
+            with open(file_path) as f:
+                self.assertEqual(render_warrior(self.warrior, file_path),
+                                 f.read())
@@ -0,0 +1,43 @@
+"""
+Contains unit tests for verifying that alias tables sample from the
+distribution they were built from.
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from evored.gene_pool import AliasTable
+
+
+class AliasTableTest(TestCase):
+    """
+    Test suite for AliasTable.
+    """
+
+    def test_columns_preserve_probabilities(self):
+        weights = [1, 2, 3, 4, 0]
+        table = AliasTable(weights)
+
+        implied = np.zeros(len(weights))
+        for column in range(len(table)):
+            implied[column] += table.probability[column]
+            implied[table.alias[column]] += 1 - table.probability[column]
+        np.testing.assert_allclose(np.array(weights) / 2, implied)
+
+    def test_sample_many_follows_weights(self):
+        table = AliasTable([1, 0, 3])
+        counts = np.bincount(table.sample_many(40000,
+                                               np.random.default_rng(3)),
+                             minlength=3)
+
+        self.assertEqual(0, counts[1])
+        self.assertAlmostEqual(0.75, counts[2] / 40000, delta=0.02)
+
+    def test_sample_never_draws_impossible_outcomes(self):
+        table = AliasTable([0, 5, 0])
+        self.assertEqual({1}, {table.sample() for _ in range(100)})
+
+    def test_invalid_weights_are_rejected(self):
+        self.assertRaises(ValueError, AliasTable, [])
+        self.assertRaises(ValueError, AliasTable, [0, 0])
+        self.assertRaises(ValueError, AliasTable, [1, -1])
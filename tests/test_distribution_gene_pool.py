@@ -0,0 +1,82 @@
+"""
+Contains unit tests for verifying that distribution gene pools learn from
+elite genomes.
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from evored.gene_pool import DistributionGenePool, RandomGenePool
+from evored.lang import OpCode, Modifier, AddressMode, pack_instruction, \
+    unpack_instruction
+from tests import create_dat_genome
+
+
+class DistributionGenePoolTest(TestCase):
+    """
+    Test suite for DistributionGenePool.
+    """
+
+    def setUp(self):
+        self.base = RandomGenePool(opcodes=[OpCode.Mov, OpCode.Add,
+                                            OpCode.Spl],
+                                   modifiers=[Modifier.I, Modifier.F],
+                                   addr_modes=[AddressMode.Direct,
+                                               AddressMode.Immediate],
+                                   arg_range=(0, 10))
+
+    def test_distributions_start_uniform(self):
+        pool = DistributionGenePool(self.base)
+        np.testing.assert_allclose([1 / 3] * 3, pool.distributions[0][0])
+        np.testing.assert_allclose([0.1] * 10, pool.distributions[0][3])
+
+    def test_update_moves_towards_elite(self):
+        pool = DistributionGenePool(self.base, learning_rate=0.5)
+        pool.update([create_dat_genome([1, 1, 1], opcodes=[
+            OpCode.Mov, OpCode.Mov, OpCode.Spl])])
+
+        np.testing.assert_allclose([1 / 6 + 1 / 3, 1 / 6, 1 / 6 + 1 / 6],
+                                   pool.distributions[0][0])
+        np.testing.assert_allclose([0.25, 0.75], pool.distributions[0][1])
+        self.assertAlmostEqual(0.55, pool.distributions[0][5][1])
+
+    def test_sampling_converges_with_floor(self):
+        pool = DistributionGenePool(self.base, learning_rate=0.5, floor=0.3)
+        for _ in range(30):
+            pool.update([create_dat_genome([0], opcodes=[OpCode.Add])])
+
+        opcodes = [pool.next_gene().opcode for _ in range(2000)]
+        self.assertAlmostEqual(0.8, opcodes.count(OpCode.Add) / 2000,
+                               delta=0.04)
+        self.assertIn(OpCode.Spl, opcodes)
+
+    def test_depths_learn_separately(self):
+        pool = DistributionGenePool(self.base, depths=2, learning_rate=1.0,
+                                    floor=0.0)
+        pool.update([create_dat_genome([0] * 4, opcodes=[
+            OpCode.Mov, OpCode.Spl, OpCode.Spl, OpCode.Spl])])
+
+        self.assertEqual(OpCode.Mov, pool.next_gene(0).opcode)
+        self.assertEqual(OpCode.Spl, pool.next_gene(5).opcode)
+
+        packed = pool.extract_packed(4, depths=[0, 1, 2, 0])
+        self.assertEqual([pack_instruction(pool.next_gene(d))[0]
+                          for d in [0, 1, 2, 0]], packed[:, 0].tolist())
+
+    def test_update_ignores_unknown_choices(self):
+        pool = DistributionGenePool(self.base, learning_rate=1.0)
+        pool.update([create_dat_genome([0])])
+
+        np.testing.assert_allclose([1 / 3] * 3, pool.distributions[0][0])
+        np.testing.assert_allclose([0, 1], pool.distributions[0][1])
+
+    def test_genes_are_canonical_with_core_size(self):
+        pool = DistributionGenePool(RandomGenePool(
+            opcodes=[OpCode.Dat], modifiers=[Modifier.Empty],
+            addr_modes=[AddressMode.Immediate], core_size=8))
+
+        genes = pool.extract(10) + [unpack_instruction(fields) for fields
+                                    in pool.extract_packed(10).tolist()]
+        for ins in genes:
+            self.assertEqual(ins.canonical(8), ins)
+            self.assertNotEqual(Modifier.Empty, ins.modifier)
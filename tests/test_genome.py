@@ -0,0 +1,47 @@
+"""
+Contains unit tests for verifying that genomes hash and compare by structure.
+"""
+from copy import copy
+from unittest import TestCase
+
+from evored.genome import Warrior, deduplicate
+from tests import create_dat_genome
+
+
+class GenomeTest(TestCase):
+    """
+    Test suite for Genome.
+    """
+
+    def test_hash_ignores_fitness(self):
+        genome = create_dat_genome([1, 2, 3])
+        before = hash(genome)
+
+        genome.fitness = 40
+        genome.root.item.fitness = 12
+        self.assertEqual(before, hash(genome))
+        self.assertEqual(before, hash(copy(genome)))
+
+    def test_equal_genomes_share_a_set_entry(self):
+        genomes = {create_dat_genome([1, 2, 3]), create_dat_genome([1, 2, 3]),
+                   create_dat_genome([3, 2, 1])}
+        self.assertEqual(2, len(genomes))
+
+    def test_deduplicate_keeps_first_of_each_structure(self):
+        first, second = create_dat_genome([1, 2]), create_dat_genome([1, 2, 3])
+        duplicate = create_dat_genome([1, 2])
+        duplicate.fitness = 99
+
+        self.assertEqual([first, second],
+                         deduplicate([first, second, duplicate]))
+        self.assertIs(first, deduplicate([first, duplicate])[0])
+
+    def test_deduplicate_compares_canonical_instructions(self):
+        first, same = create_dat_genome([1, 2]), create_dat_genome([8001, 2])
+
+        self.assertEqual([first, same], deduplicate([first, same]))
+        self.assertEqual([first], deduplicate([first, same], 8000))
+
+    def test_warriors_are_hashable(self):
+        warrior = create_dat_genome([1, 2]).realize()
+        self.assertEqual(hash(warrior), hash(Warrior(list(warrior.ins_list))))
@@ -0,0 +1,76 @@
+"""
+Contains unit tests for verifying that instructions are correctly reduced to
+canonical form and shared.
+"""
+import pickle
+from copy import copy
+from unittest import TestCase
+
+from evored.lang import OpCode, Modifier, AddressMode, Instruction, \
+    Argument, intern_instruction, pack_instruction, unpack_instruction
+
+
+class InstructionTest(TestCase):
+    """
+    Test suite for Instruction.
+    """
+
+    def test_canonical_reduces_values_modulo_core_size(self):
+        ins = Instruction(OpCode.Mov, Modifier.I,
+                          Argument(AddressMode.Direct, -1),
+                          Argument(AddressMode.B, 8003))
+        expected = Instruction(OpCode.Mov, Modifier.I,
+                               Argument(AddressMode.Direct, 7999),
+                               Argument(AddressMode.B, 3))
+
+        self.assertEqual(expected, ins.canonical(8000))
+        self.assertEqual(hash(expected), hash(ins.canonical(8000)))
+
+    def test_canonical_fills_implied_modifier(self):
+        def canonical(opcode, mode_a, mode_b):
+            return Instruction(opcode, Modifier.Empty, Argument(mode_a, 1),
+                               Argument(mode_b, 2)).canonical(8000).modifier
+
+        immediate, direct = AddressMode.Immediate, AddressMode.Direct
+        self.assertIs(Modifier.AB, canonical(OpCode.Mov, immediate, direct))
+        self.assertIs(Modifier.B, canonical(OpCode.Mov, direct, immediate))
+        self.assertIs(Modifier.I, canonical(OpCode.Mov, direct, direct))
+        self.assertIs(Modifier.F, canonical(OpCode.Add, direct, direct))
+        self.assertIs(Modifier.B, canonical(OpCode.Slt, direct, immediate))
+        self.assertIs(Modifier.B, canonical(OpCode.Djn, immediate, direct))
+        self.assertIs(Modifier.F, canonical(OpCode.Dat, immediate, direct))
+
+    def test_canonical_normalizes_ignored_modifiers(self):
+        jmp_a = Instruction(OpCode.Jmp, Modifier.X,
+                            Argument(AddressMode.Direct, 4),
+                            Argument(AddressMode.Direct, 0))
+        jmp_b = Instruction(OpCode.Jmp, Modifier.AB,
+                            Argument(AddressMode.Direct, 4),
+                            Argument(AddressMode.Direct, 0))
+
+        self.assertNotEqual(jmp_a, jmp_b)
+        self.assertEqual(jmp_a.canonical(8000), jmp_b.canonical(8000))
+
+    def test_canonical_keeps_meaningful_modifiers(self):
+        ins = Instruction(OpCode.Mov, Modifier.X,
+                          Argument(AddressMode.Direct, 4),
+                          Argument(AddressMode.Direct, 0))
+        self.assertIs(ins, ins.canonical(8000))
+
+    def test_instructions_are_immutable(self):
+        ins = Instruction(OpCode.Mov, Modifier.I,
+                          Argument(AddressMode.Direct, 0),
+                          Argument(AddressMode.Direct, 1))
+
+        self.assertRaises(AttributeError, setattr, ins, "opcode", OpCode.Add)
+        self.assertRaises(AttributeError, setattr, ins.arg_a, "value", 3)
+        self.assertIs(ins, copy(ins))
+
+    def test_intern_instruction_shares_equal_instructions(self):
+        fields = (OpCode.Add, Modifier.AB, Argument(AddressMode.Immediate, 4),
+                  Argument(AddressMode.Direct, 3))
+        first = intern_instruction(Instruction(*fields))
+
+        self.assertIs(first, intern_instruction(Instruction(*fields)))
+        self.assertIs(first, pickle.loads(pickle.dumps(first)))
+        self.assertIs(first, unpack_instruction(pack_instruction(first)))
@@ -1,9 +1,10 @@
 """
 Contains unit tests for verifying correctness of Node-related algorithms.
 """
+import pickle
 from unittest import TestCase
 
-from evored.tree import Node
+from evored.tree import Node, Tree
 
 
 class NodeTest(TestCase):
@@ -25,6 +26,14 @@ class NodeTest(TestCase):
         node.right = Node(42, parent=node)
         self.assertIs(node.right, node.choose_child())
     
+    def test_choose_child_returns_either_child_when_both_are_present(self):
+        node = Node(32)
+        node.left = Node(42, parent=node)
+        node.right = Node(52, parent=node)
+
+        chosen = {node.choose_child() for _ in range(100)}
+        self.assertEqual({node.left, node.right}, chosen)
+
     def test_has_left(self):
         node = Node(32)
         node.left = Node(100, parent=node)
@@ -98,3 +107,51 @@ class NodeTest(TestCase):
 
         self.assertIs(right, node.left)
         self.assertIs(left, node.right)
+
+    def test_subtree_hash_matches_for_identical_subtrees(self):
+        a, b = Tree([1, 2, 3, 4]), Tree([1, 2, 3, 4])
+
+        self.assertEqual(a.root.subtree_hash(), b.root.subtree_hash())
+        self.assertNotEqual(a.root.subtree_hash(),
+                            Tree([1, 2, 3, 5]).root.subtree_hash())
+
+    def test_subtree_hash_is_invalidated_up_the_parent_chain(self):
+        tree, other = Tree([1, 2, 3, 4, 5]), Tree([1, 2, 3, 4, 5])
+        before = tree.root.subtree_hash()
+        unchanged = tree.root.right.subtree_hash()
+
+        tree.root.left.left.swap_items(tree.root.left.right)
+        self.assertNotEqual(before, tree.root.subtree_hash())
+        self.assertEqual(unchanged, tree.root.right.subtree_hash())
+
+        tree.root.left.left.swap_items(tree.root.left.right)
+        self.assertEqual(before, tree.root.subtree_hash())
+
+        tree.root.left.swap_places(tree.root.right)
+        other.root.swap_children()
+        self.assertEqual(other.root.subtree_hash(), tree.root.subtree_hash())
+        self.assertNotEqual(before, tree.root.subtree_hash())
+
+    def test_subtree_size_and_height_follow_changes(self):
+        tree = Tree([1, 2, 3, 4, 5, 6])
+        self.assertEqual((6, 3), (tree.root.subtree_size(),
+                                  tree.root.subtree_height()))
+        self.assertEqual(2, tree.root.left.left.depth())
+
+        tree.root.left.left.left = Node(7, tree.root.left.left)
+        self.assertEqual((7, 4), (tree.root.subtree_size(),
+                                  tree.root.subtree_height()))
+        self.assertEqual((2, 2), (tree.root.right.subtree_size(),
+                                  tree.root.right.subtree_height()))
+
+        tree.root.left = None
+        self.assertEqual((3, 3), (tree.root.subtree_size(),
+                                  tree.root.subtree_height()))
+
+    def test_subtree_hash_is_not_pickled(self):
+        tree = Tree([1, 2, 3])
+        tree.root.subtree_hash()
+
+        restored = pickle.loads(pickle.dumps(tree))
+        self.assertIsNone(restored.root._hash)
+        self.assertEqual(hash(tree), hash(restored))
@@ -0,0 +1,78 @@
+"""
+Contains unit tests for verifying that directories of Redcode source are
+parsed once and cached by content.
+"""
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from pathos.multiprocessing import ProcessPool
+
+from evored.parsing import ParseCache, digest_source, load_directory
+
+
+class ParseCacheTest(TestCase):
+    """
+    Test suite for ParseCache.
+    """
+
+    SOURCES = {"imp.red": "MOV.I 0, 1\n",
+               "copy.red": "MOV.I 0, 1\n",
+               "dwarf.red": "start ADD #4, 3\nMOV 2, @2\nJMP start\n",
+               "broken.red": "FOO 1, 2\n",
+               "notes.txt": "Not Redcode.\n"}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ProcessPool(nodes=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        cls.pool.join()
+        cls.pool.clear()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        for name, source in ParseCacheTest.SOURCES.items():
+            with open(os.path.join(self.directory, name), "w") as f:
+                f.write(source)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_load_directory_parses_each_source_once(self):
+        cache = ParseCache()
+        parsed, failed = load_directory(self.directory, self.pool, cache)
+
+        self.assertEqual({self.path("imp.red"), self.path("copy.red"),
+                          self.path("dwarf.red")}, set(parsed))
+        self.assertEqual([self.path("broken.red")], list(failed))
+        self.assertEqual(parsed[self.path("imp.red")],
+                         parsed[self.path("copy.red")])
+        self.assertEqual(3, len(parsed[self.path("dwarf.red")]))
+        self.assertEqual(2, len(cache))
+
+    def test_load_directory_skips_cached_sources(self):
+        cache = ParseCache()
+        digest = digest_source(ParseCacheTest.SOURCES["dwarf.red"])
+        cache.put(digest, [])
+
+        parsed, _ = load_directory(self.directory, cache=cache)
+        self.assertEqual([], parsed[self.path("dwarf.red")])
+
+    def test_cache_persists_to_file(self):
+        path = self.path("cache.pickle")
+        cache = ParseCache(path)
+        load_directory(self.directory, cache=cache)
+        cache.save()
+
+        restored = ParseCache(path)
+        digest = digest_source(ParseCacheTest.SOURCES["imp.red"])
+        self.assertEqual(cache.get(digest), restored.get(digest))
+        self.assertEqual(len(cache), len(restored))
@@ -0,0 +1,68 @@
+"""
+Contains unit tests for verifying that persistent trees share structure
+between versions without ever changing.
+"""
+from copy import copy
+from unittest import TestCase
+
+from evored.genome import Genome, PersistentGenome
+from evored.tree import PersistentTree, Tree
+
+
+class PersistentTreeTest(TestCase):
+    """
+    Test suite for PersistentTree.
+    """
+
+    def test_build_matches_mutable_tree(self):
+        items = list(range(0, 20))
+        tree, persistent = Tree(items), PersistentTree(items)
+
+        self.assertEqual(items, [node.item for node in persistent])
+        self.assertEqual(tree, persistent)
+        self.assertEqual(hash(tree), hash(persistent))
+        self.assertEqual(20, len(persistent))
+
+    def test_with_items_copies_only_changed_paths(self):
+        tree = PersistentTree([1, 2, 3, 4, 5, 6, 7])
+        changed = tree.with_items({(0, 1): 50, (0, 0): 40})
+
+        self.assertEqual([1, 2, 3, 40, 50, 6, 7],
+                         [node.item for node in changed])
+        self.assertEqual([1, 2, 3, 4, 5, 6, 7], [node.item for node in tree])
+        self.assertIs(tree.root.right, changed.root.right)
+        self.assertIsNot(tree.root.left, changed.root.left)
+        self.assertNotEqual(hash(tree), hash(changed))
+
+    def test_replace_grafts_subtree(self):
+        tree = PersistentTree([1, 2, 3])
+        graft = PersistentTree([8, 9])
+        changed = tree.replace((1,), graft.root)
+
+        self.assertEqual([1, 2, 8, 9], [node.item for node in changed])
+        self.assertIs(graft.root, changed.root.right)
+        self.assertRaises(ValueError, tree.replace, (0, 0), graft.root)
+
+    def test_nodes_record_height(self):
+        tree = PersistentTree(list(range(0, 8)))
+        self.assertEqual(4, tree.root.height)
+        self.assertEqual(2, tree.root.right.height)
+        self.assertEqual(1, tree.node_at((1, 1)).height)
+
+    def test_choose_path_reaches_every_node(self):
+        tree = PersistentTree([1, 2, 3, 4, 5])
+        paths = {tree.choose_path() for _ in range(500)}
+        self.assertEqual({path for path, _ in tree.paths()}, paths)
+
+    def test_nodes_cannot_be_modified(self):
+        tree = PersistentTree([1, 2])
+        self.assertRaises(AttributeError, setattr, tree.root, "item", 3)
+
+    def test_genome_copies_share_nodes_and_score(self):
+        genome = PersistentGenome.freeze(Genome([1, 2, 3], 12))
+        copied = copy(genome)
+
+        self.assertIs(genome.root, copied.root)
+        self.assertEqual(12, copied.fitness)
+        self.assertEqual(genome, copied)
+        self.assertEqual(Genome([1, 2, 3], 12), copied.thaw())
@@ -0,0 +1,183 @@
+"""
+Contains unit tests for verifying that populations pack, unpack, and evolve
+genomes correctly.
+"""
+from unittest import TestCase
+
+import numpy as np
+
+from evored.algorithm import EvolvingAlgorithm
+from evored.algorithm.crossover import NoCrossover
+from evored.algorithm.mutation import NoMutator
+from evored.algorithm.selection import NoSelector, ReplacementSelector, \
+    RouletteSelector, TournamentSelector
+from evored.gene_pool import RandomGenePool
+from evored.genome import Chromosome
+from evored.lang import OpCode, Modifier, AddressMode
+from evored.population import HAS_LEFT, HAS_RIGHT, Population
+from evored.tree import Node
+from tests import create_dat_genome, create_population
+
+
+class PopulationTest(TestCase):
+    """
+    Test suite for Population.
+    """
+
+    def setUp(self):
+        self.genomes = [create_dat_genome(range(x, x + x + 1), x * 10)
+                        for x in range(1, 6)]
+        for genome in self.genomes:
+            for node in genome:
+                node.item.fitness = node.item.ins.arg_b.value / 10
+        self.population = Population.from_genomes(self.genomes)
+
+    def test_from_genomes_round_trips(self):
+        self.assertEqual(5, len(self.population))
+        self.assertEqual(self.genomes, self.population.to_genomes())
+        self.assertEqual([g.fitness for g in self.genomes],
+                         [g.fitness for g in self.population])
+        self.assertEqual([n.item.fitness for n in self.genomes[2]],
+                         [n.item.fitness for n in self.population[2]])
+
+    def test_from_genomes_keeps_irregular_shapes(self):
+        genome = create_dat_genome([1], 1)
+        genome.root.right = Node(Chromosome(genome.root.item.ins),
+                                 genome.root)
+        genome.root.right.left = Node(Chromosome(genome.root.item.ins),
+                                      genome.root.right)
+
+        population = Population.from_genomes([genome])
+        self.assertEqual([HAS_RIGHT, HAS_LEFT, 0],
+                         population.shapes.tolist())
+        self.assertEqual(genome, population.genome(0))
+
+    def test_genome_is_a_copy(self):
+        genome = self.population.genome(0)
+        genome.fitness = 99
+        self.assertEqual(10, self.population.fitness[0])
+
+    def test_take_repeats_and_reorders(self):
+        taken = self.population.take([4, 0, 0])
+        self.assertEqual([self.genomes[4], self.genomes[0], self.genomes[0]],
+                         taken.to_genomes())
+        self.assertEqual([6, 2, 2], taken.sizes.tolist())
+
+    def test_concatenate_appends_in_order(self):
+        combined = Population.concatenate([self.population.take([1]),
+                                           self.population.take([3, 2])])
+        self.assertEqual([self.genomes[1], self.genomes[3], self.genomes[2]],
+                         combined.to_genomes())
+
+    def test_generate_builds_complete_trees(self):
+        pool = RandomGenePool(opcodes=[OpCode.Add], modifiers=[Modifier.AB],
+                              addr_modes=[AddressMode.Direct],
+                              arg_range=(0, 4))
+        population = Population.generate(3, 6, pool,
+                                         np.random.default_rng(1))
+
+        self.assertEqual([6, 6, 6], population.sizes.tolist())
+        for genome in population:
+            nodes = list(genome)
+            self.assertEqual(6, len(nodes))
+            self.assertEqual([nodes[1], nodes[2]],
+                             [nodes[0].left, nodes[0].right])
+            self.assertEqual(nodes[5], nodes[2].left)
+            for node in nodes:
+                self.assertEqual(OpCode.Add, node.item.ins.opcode)
+                self.assertTrue(0 <= node.item.ins.arg_a.value < 4)
+
+
+class PopulationEvolutionTest(TestCase):
+    """
+    Test suite for running evolving algorithms against a population.
+    """
+
+    def setUp(self):
+        self.genomes = [create_dat_genome([x, x + 1], x) for x in range(1, 9)]
+        self.population = Population.from_genomes(self.genomes)
+
+    def test_no_ops_return_population(self):
+        for algorithm in [NoCrossover(), NoMutator(), NoSelector()]:
+            self.assertIs(self.population,
+                          algorithm.evolve_population(self.population, None,
+                                                      {}))
+
+    def test_replacement_selector_duplicates_upper_half(self):
+        results = ReplacementSelector().evolve_population(self.population,
+                                                          None, {})
+        self.assertEqual([8, 8, 7, 7, 6, 6, 5, 5], results.fitness.tolist())
+        self.assertEqual(self.genomes[7], results.genome(1))
+
+    def test_replacement_selector_trims_odd_population(self):
+        results = ReplacementSelector().evolve_population(
+            self.population.take(range(7)), None, {})
+        self.assertEqual([7, 7, 6, 6, 5, 5, 4], results.fitness.tolist())
+
+    def test_roulette_selector_ignores_zero_fitness(self):
+        population = Population.from_genomes([create_dat_genome([1], 0),
+                                              create_dat_genome([2], 5)])
+        results = RouletteSelector().evolve_population(population, None, {})
+        self.assertEqual([5, 5], results.fitness.tolist())
+
+    def test_tournament_selector_picks_best_of_all(self):
+        params = {"selector.tournament_size": len(self.population)}
+        results = TournamentSelector().evolve_population(self.population,
+                                                         None, params)
+        self.assertEqual([8] * 8, results.fitness.tolist())
+
+    def test_tournament_selector_allows_whole_population(self):
+        population = create_population([1] * 200, list(range(200)))
+        params = {"selector.tournament_size": len(population)}
+        results = TournamentSelector().evolve_population(population, None,
+                                                         params)
+        self.assertEqual([199] * 200, results.fitness.tolist())
+
+    def test_tournament_selector_never_picks_worst(self):
+        params = {"selector.tournament_size": 2}
+        results = TournamentSelector().evolve_population(self.population,
+                                                         None, params)
+        self.assertEqual(8, len(results))
+        self.assertNotIn(1, results.fitness.tolist())
+
+    def test_default_evolve_population_uses_evolve(self):
+        class Reverser(EvolvingAlgorithm):
+            def evolve(self, genomes, pool, params):
+                return genomes[::-1]
+
+        results = Reverser().evolve_population(self.population, None, {})
+        self.assertEqual(self.genomes[::-1], results.to_genomes())
+
+
+class PopulationWalkTest(TestCase):
+    """
+    Test suite for realizing warriors from a population.
+    """
+
+    def setUp(self):
+        self.population = create_population([1, 4, 0, 3])
+
+    def test_children_follow_breadth_first_order(self):
+        left, right = self.population.children()
+        self.assertEqual([-1, 2, 4, -1, -1, 6, -1, -1], left.tolist())
+        self.assertEqual([-1, 3, -1, -1, -1, 7, -1, -1], right.tolist())
+
+    def test_realize_walks_every_non_empty_genome(self):
+        walks = self.population.realize(3, np.random.default_rng(4))
+
+        self.assertEqual([0, 0, 0, 1, 1, 1, 3, 3, 3], walks.genomes.tolist())
+        self.assertEqual([1, 1, 1], walks.lengths[:3].tolist())
+        self.assertEqual([2, 2, 2], walks.lengths[6:].tolist())
+
+        genome = self.population.genome(1)
+        expected = {tuple(x.ins for x in walk)
+                    for _, walk in genome.enumerate_walks()}
+        for warrior in walks.warriors(self.population)[3:6]:
+            self.assertIn(tuple(warrior.ins_list), expected)
+
+    def test_realize_takes_both_branches(self):
+        walks = self.population.realize(100, np.random.default_rng(5))
+        lengths = walks.lengths[100:200].tolist()
+
+        self.assertEqual({2, 3}, set(lengths))
+        self.assertAlmostEqual(0.5, lengths.count(3) / 100, delta=0.15)
@@ -8,7 +8,8 @@ from unittest import TestCase
 from copy import copy
 
 from evored.gene_pool import RandomGenePool
-from evored.lang import OpCode, Modifier, AddressMode, Instruction, Argument
+from evored.lang import OpCode, Modifier, AddressMode, Instruction, Argument, \
+    unpack_instruction
 
 
 class RandomGenePoolTest(TestCase):
@@ -60,3 +61,32 @@ class RandomGenePoolTest(TestCase):
         self.assertEqual(len(expected), len(results))
         for e, r in zip_longest(expected, results):
             self.assertEqual(e, r)
+
+    def test_next_gene_is_canonical_when_core_size_is_given(self):
+        pool = RandomGenePool(opcodes=[OpCode.Jmp], modifiers=[Modifier.Empty],
+                              addr_modes=[AddressMode.Direct],
+                              arg_range=(-20, -10), core_size=100)
+        gene = pool.next_gene()
+
+        self.assertIs(Modifier.B, gene.modifier)
+        self.assertTrue(80 <= gene.arg_a.value < 90)
+        self.assertEqual(gene, gene.canonical(100))
+
+    def test_arguments_are_drawn_from_core_by_default(self):
+        self.assertEqual((0, 55), RandomGenePool(core_size=55).arg_range)
+        self.assertEqual(RandomGenePool.DEFAULT_ARG_RANGE,
+                         RandomGenePool().arg_range)
+
+    def test_extract_packed_draws_canonical_rows(self):
+        pool = RandomGenePool(opcodes=[OpCode.Dat, OpCode.Add],
+                              modifiers=[Modifier.Empty],
+                              addr_modes=[AddressMode.Immediate],
+                              arg_range=(-20, 20), core_size=8)
+        packed = pool.extract_packed(50)
+
+        self.assertEqual((50, 6), packed.shape)
+        for fields in packed.tolist():
+            ins = unpack_instruction(fields)
+            self.assertEqual(ins.canonical(8), ins)
+            self.assertTrue(0 <= ins.arg_a.value < 8)
+            self.assertNotEqual(Modifier.Empty, ins.modifier)
@@ -0,0 +1,142 @@
+"""
+Contains unit tests for verifying that Redcode source is correctly parsed
+into instructions.
+"""
+from unittest import TestCase
+
+from evored.lang import OpCode, Modifier, AddressMode, Instruction, Argument
+from evored.parsing import ParsingException, evaluate_expression, \
+    iter_instructions, parse_assembly, parse_instruction, parse_load_file, \
+    seed_population
+
+
+class RedcodeParserTest(TestCase):
+    """
+    Test suite for the Redcode parser.
+    """
+
+    DWARF = """;redcode-94
+;name Dwarf
+        ORG     start
+step    EQU     4
+start   ADD.AB  #step, bomb
+        MOV.I   bomb, @bomb
+        JMP     start
+bomb:   DAT     #0
+        END     start
+"""
+
+    def test_parse_instruction_reads_load_format(self):
+        ins = parse_instruction("MOV.I   $     0, $     1   ; imp")
+
+        self.assertEqual(Instruction(OpCode.Mov, Modifier.I,
+                                     Argument(AddressMode.Direct, 0),
+                                     Argument(AddressMode.Direct, 1)), ins)
+        self.assertIsNone(parse_instruction("; only a comment"))
+
+    def test_parse_instruction_completes_single_operands(self):
+        dat = parse_instruction("DAT #5")
+        jmp = parse_instruction("JMP -1")
+
+        self.assertEqual(Argument(AddressMode.Immediate, 0), dat.arg_a)
+        self.assertEqual(Argument(AddressMode.Immediate, 5), dat.arg_b)
+        self.assertEqual(Argument(AddressMode.Direct, -1), jmp.arg_a)
+        self.assertEqual(Argument(AddressMode.Direct, 0), jmp.arg_b)
+        self.assertIs(Modifier.Empty, jmp.modifier)
+
+    def test_parse_instruction_rejects_unknown_operation(self):
+        self.assertRaises(ParsingException, parse_instruction, "FOO 1, 2")
+        self.assertRaises(ParsingException, parse_instruction, "MOV.Q 1, 2")
+
+    def test_rendered_instructions_parse_back(self):
+        ins_list = [Instruction(OpCode.Spl, Modifier.Empty,
+                                Argument(AddressMode.APredecrement, 3),
+                                Argument(AddressMode.BPostincrement, -7)),
+                    Instruction(OpCode.Seq, Modifier.X,
+                                Argument(AddressMode.A, 1),
+                                Argument(AddressMode.B, 2))]
+
+        self.assertEqual(ins_list, parse_load_file(map(str, ins_list)))
+
+    def test_iter_instructions_stops_at_end(self):
+        lines = iter(["MOV 0, 1", "END", "JMP 0"])
+
+        self.assertEqual(1, len(list(iter_instructions(lines))))
+        self.assertEqual(["JMP 0"], list(lines))
+
+    def test_evaluate_expression_respects_precedence(self):
+        self.assertEqual(7, evaluate_expression("1 + 2 * 3"))
+        self.assertEqual(-9, evaluate_expression("-(1 + 2) * 3"))
+        self.assertEqual(-3, evaluate_expression("-7 / 2"))
+        self.assertEqual(5, evaluate_expression("x % 6", {"X": 11}))
+        self.assertRaises(ParsingException, evaluate_expression, "(1 + 2")
+        self.assertRaises(ParsingException, evaluate_expression, "y + 1")
+
+    def test_parse_assembly_resolves_labels_and_constants(self):
+        ins_list = parse_assembly(RedcodeParserTest.DWARF.splitlines())
+
+        self.assertEqual(4, len(ins_list))
+        self.assertEqual(Argument(AddressMode.Immediate, 4),
+                         ins_list[0].arg_a)
+        self.assertEqual(Argument(AddressMode.Direct, 3), ins_list[0].arg_b)
+        self.assertEqual(Argument(AddressMode.B, 2), ins_list[1].arg_b)
+        self.assertEqual(Argument(AddressMode.Direct, -2), ins_list[2].arg_a)
+        self.assertEqual(OpCode.Dat, ins_list[3].opcode)
+
+    def test_parse_assembly_rotates_to_org_label(self):
+        ins_list = parse_assembly(["        ORG  start",
+                                   "bomb    DAT  #0",
+                                   "start   ADD  #4, bomb",
+                                   "        MOV  bomb, @bomb",
+                                   "        JMP  start"])
+
+        self.assertEqual([OpCode.Add, OpCode.Mov, OpCode.Jmp, OpCode.Dat],
+                         [ins.opcode for ins in ins_list])
+        self.assertEqual(Argument(AddressMode.Immediate, 4),
+                         ins_list[0].arg_a)
+        self.assertEqual(Argument(AddressMode.Direct, 3), ins_list[0].arg_b)
+        self.assertEqual(Argument(AddressMode.Direct, 2), ins_list[1].arg_a)
+        self.assertEqual(Argument(AddressMode.B, 2), ins_list[1].arg_b)
+        self.assertEqual(Argument(AddressMode.Direct, -2), ins_list[2].arg_a)
+
+    def test_parse_assembly_rotates_to_end_label(self):
+        ins_list = parse_assembly(["ptr     DAT  #0, #5",
+                                   "top     JMP  top, 100",
+                                   "        END  top + 0"])
+
+        self.assertEqual([OpCode.Jmp, OpCode.Dat],
+                         [ins.opcode for ins in ins_list])
+        self.assertEqual(Argument(AddressMode.Direct, 0), ins_list[0].arg_a)
+        self.assertEqual(Argument(AddressMode.Direct, 100), ins_list[0].arg_b)
+        self.assertEqual(Argument(AddressMode.Immediate, 5),
+                         ins_list[1].arg_b)
+
+    def test_parse_assembly_rejects_start_outside_warrior(self):
+        self.assertRaises(ParsingException, parse_assembly,
+                          ["ORG 2", "DAT #0, #0"])
+
+    def test_iter_instructions_rejects_non_zero_start(self):
+        self.assertEqual(1, len(list(iter_instructions(["ORG 0",
+                                                        "DAT #0, #0"]))))
+        self.assertRaises(ParsingException, list,
+                          iter_instructions(["DAT #0, #0", "JMP 0",
+                                             "END 1"]))
+
+    def test_parse_load_file_rotates_to_start(self):
+        ins_list = parse_load_file(["DAT #0, #0", "JMP $-1, $0", "END 1"])
+        self.assertEqual([OpCode.Jmp, OpCode.Dat],
+                         [ins.opcode for ins in ins_list])
+        self.assertEqual(Argument(AddressMode.Direct, 1), ins_list[0].arg_a)
+
+    def test_parse_assembly_rejects_macros(self):
+        self.assertRaises(ParsingException, parse_assembly,
+                          ["i FOR 3", "DAT 0", "ROF"])
+
+    def test_seeded_genomes_reproduce_warriors(self):
+        imp = parse_assembly(["MOV.I 0, 1"])
+        dwarf = parse_assembly(RedcodeParserTest.DWARF.splitlines())
+        genomes = seed_population([imp, dwarf], 5)
+
+        self.assertEqual(5, len(genomes))
+        self.assertEqual(dwarf, genomes[1].realize().ins_list)
+        self.assertEqual(imp, genomes[4].realize().ins_list)
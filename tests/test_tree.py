@@ -39,6 +39,40 @@ class TreeTest(TestCase):
         tree = Tree([1])
         self.assertIs(tree.root, tree.choose_node())
 
+    def test_choose_node_reaches_every_node_evenly(self):
+        tree = Tree(list(range(0, 7)))
+        counts = [0] * 7
+        for _ in range(7000):
+            counts[tree.choose_node().item] += 1
+
+        for count in counts:
+            self.assertTrue(800 < count < 1200)
+
+    def test_choose_node_follows_changes(self):
+        tree = Tree([1, 2, 3])
+        tree.choose_node()
+        tree.root.left = None
+
+        self.assertEqual({1, 3}, {tree.choose_node().item
+                                  for _ in range(100)})
+
+    def test_enumerate_walks_gives_probabilities(self):
+        tree = Tree([1, 2, 3, 4])
+
+        self.assertEqual([(0.5, [1, 2, 4]), (0.5, [1, 3])],
+                         tree.enumerate_walks())
+        self.assertIsNone(tree.enumerate_walks(limit=1))
+        self.assertEqual([], Tree().enumerate_walks())
+
+    def test_sample_walks_weights_sum_to_one(self):
+        tree = Tree(list(range(0, 31)))
+        walks = tree.sample_walks(6)
+
+        self.assertAlmostEqual(1.0, sum(weight for weight, _ in walks))
+        self.assertTrue(6 <= len(walks) <= 8)
+        for _, items in walks:
+            self.assertEqual(5, len(items))
+
     def test_copy(self):
         tree = Tree([1, 2, 3, 4, 5])
         cloned = copy(tree)
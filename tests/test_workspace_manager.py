@@ -0,0 +1,81 @@
+"""
+Contains unit tests for verifying that scratch workspaces are created,
+recycled, and removed correctly.
+"""
+import gc
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from evored.utils import WorkspaceManager
+
+
+class WorkspaceManagerTest(TestCase):
+    """
+    Test suite for WorkspaceManager.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.manager = WorkspaceManager(self.root)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.root)
+
+    def test_acquire_returns_absolute_directory(self):
+        path = self.manager.acquire()
+        self.assertTrue(os.path.isabs(path))
+        self.assertTrue(os.path.isdir(path))
+        self.assertEqual(self.root, os.path.dirname(path))
+
+    def test_released_workspace_is_reused(self):
+        with self.manager.workspace() as first:
+            pass
+        with self.manager.workspace() as second:
+            pass
+
+        self.assertEqual(first, second)
+        self.assertEqual(1, len(self.manager))
+
+    def test_release_with_clear_removes_contents(self):
+        with self.manager.workspace(clear=True) as path:
+            open(os.path.join(path, "warrior.RED"), "w").close()
+        self.assertEqual([], os.listdir(path))
+
+    def test_release_rejects_unknown_workspace(self):
+        self.assertRaises(ValueError, self.manager.release, self.root)
+
+    def test_close_removes_all_workspaces(self):
+        paths = [self.manager.acquire() for _ in range(3)]
+        self.manager.close()
+
+        for path in paths:
+            self.assertFalse(os.path.exists(path))
+
+    def test_release_after_close_does_nothing(self):
+        path = self.manager.acquire()
+        self.manager.close()
+        self.manager.release(path, clear=True)
+        self.assertFalse(os.path.exists(path))
+
+    def test_workspaces_are_removed_when_manager_is_collected(self):
+        manager = WorkspaceManager(self.root)
+        path = manager.acquire()
+        del manager
+        gc.collect()
+        self.assertFalse(os.path.exists(path))
+
+    def test_concurrent_workspaces_are_distinct(self):
+        def hold(_):
+            with self.manager.workspace() as path:
+                marker = os.path.join(path, "marker")
+                with open(marker, "w") as f:
+                    f.write(path)
+                with open(marker) as f:
+                    return f.read() == path
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertTrue(all(executor.map(hold, range(16))))